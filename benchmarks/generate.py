@@ -0,0 +1,182 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''Write synthetic JSBSim FDMs of any size for benchmarking.
+
+    python -m benchmarks.generate OUTPUT.xml --markers 10000
+'''
+
+import argparse
+import os
+
+ENGINE_FILE = 'bench_engine'
+FIXED_MARKERS = 4  # metrics reference points and the CG
+THRUSTER_FILE = 'bench_prop'
+# Share of the markers given to each kind of element, an engine counts
+# twice as it comes with a thruster
+SHARES = {
+    'pointmasses': 0.4,
+    'contacts': 0.2,
+    'forces': 0.2,
+    'engines': 0.05,
+    'tanks': 0.1,
+}
+
+
+def scaled_counts(markers):
+    '''Split markers plotted locations between element kinds.'''
+    markers = max(markers - FIXED_MARKERS, 0)
+    counts = {kind: int(markers * share) for kind, share in SHARES.items()}
+    # Whatever rounding left over goes to the point masses
+    counts['pointmasses'] += markers - sum(counts.values()) - counts['engines']
+    # Sections the importer skips, so skipping them is measured too
+    counts['functions'] = markers
+    return counts
+
+
+def location(index, name=None):
+    name = f' name="{name}"' if name else ''
+    return (
+        f'<location{name} unit="IN"><x> {index * 0.5:.2f} </x>'
+        f'<y> {index % 7 - 3:.1f} </y><z> {index % 5 - 2:.1f} </z></location>'
+    )
+
+
+def generate_elements(pointmasses, contacts, forces, engines, tanks, functions):
+    yield '<?xml version="1.0"?>'
+    yield '<fdm_config name="benchmark" version="2.0" release="BETA">'
+    yield '<metrics>'
+    yield '<wingarea unit="FT2"> 174 </wingarea>'
+    for index, name in enumerate(('AERORP', 'EYEPOINT', 'VRP')):
+        yield location(index, name)
+    yield '</metrics>'
+    yield '<mass_balance>'
+    yield '<emptywt unit="LBS"> 1500 </emptywt>'
+    yield location(0, 'CG')
+    for index in range(pointmasses):
+        yield (
+            f'<pointmass name="PAYLOAD {index}">'
+            f'<weight unit="LBS"> {index % 200 + 1} </weight>'
+            f'{location(index, "POINTMASS")}</pointmass>'
+        )
+    yield '</mass_balance>'
+    yield '<ground_reactions>'
+    for index in range(contacts):
+        yield (
+            f'<contact type="{"BOGEY" if index % 4 else "STRUCTURE"}" '
+            f'name="CONTACT {index}">{location(index)}'
+            '<static_friction> 0.8 </static_friction></contact>'
+        )
+    yield '</ground_reactions>'
+    yield '<propulsion>'
+    for index in range(engines):
+        yield (
+            f'<engine file="{ENGINE_FILE}">{location(index)}'
+            f'<orient unit="DEG"><pitch> {index % 5} </pitch></orient>'
+            f'<feed> {index % max(tanks, 1)} </feed>'
+            f'<thruster file="{THRUSTER_FILE}">{location(index + 1)}'
+            '</thruster></engine>'
+        )
+    for index in range(tanks):
+        yield (
+            f'<tank type="FUEL" number="{index}">{location(index)}'
+            '<capacity unit="LBS"> 150 </capacity>'
+            '<contents unit="LBS"> 100 </contents></tank>'
+        )
+    yield '</propulsion>'
+    yield '<external_reactions>'
+    for index in range(forces):
+        yield (
+            f'<force name="FORCE {index}" frame="BODY">{location(index)}'
+            '<direction><x> 1 </x><y> 0 </y><z> 0 </z></direction></force>'
+        )
+    yield '</external_reactions>'
+    yield '<aerodynamics><axis name="LIFT">'
+    for index in range(functions):
+        yield (
+            f'<function name="aero/coefficient/CL{index}"><product>'
+            '<property>aero/qbar-psf</property><table>'
+            '<independentVar>aero/alpha-rad</independentVar>'
+            '<tableData> -0.1 -0.2\n 0.0 0.3\n 0.2 1.1 </tableData>'
+            '</table></product></function>'
+        )
+    yield '</axis></aerodynamics>'
+    yield '</fdm_config>'
+
+
+def generate_fdm(
+    filepath,
+    pointmasses=0,
+    contacts=0,
+    forces=0,
+    engines=0,
+    tanks=0,
+    functions=0
+):
+    '''Write an FDM to filepath, with its engine files in Engines/ beside it.
+
+    Return the number of plotted locations the FDM holds.
+    '''
+    directory = os.path.join(os.path.dirname(filepath), 'Engines')
+    os.makedirs(directory, exist_ok=True)
+    components = {
+        ENGINE_FILE: '<piston_engine name="Benchmark"><displacement unit="IN3">'
+                     ' 320 </displacement></piston_engine>\n',
+        THRUSTER_FILE: '<propeller name="Benchmark"><diameter unit="IN"> 75'
+                       ' </diameter><numblades> 2 </numblades></propeller>\n',
+    }
+    for name, component in components.items():
+        with open(
+            os.path.join(directory, f'{name}.xml'), 'w', encoding='utf-8'
+        ) as file:
+            file.write(component)
+    with open(filepath, 'w', encoding='utf-8') as file:
+        for element in generate_elements(
+            pointmasses, contacts, forces, engines, tanks, functions
+        ):
+            file.write(element)
+            file.write('\n')
+    return FIXED_MARKERS + pointmasses + contacts + forces + 2 * engines + tanks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output', help='FDM file to write')
+    parser.add_argument(
+        '--markers',
+        type=int,
+        default=1000,
+        help='total plotted locations, split between all element kinds'
+    )
+    for kind in SHARES:
+        parser.add_argument(
+            f'--{kind}',
+            type=int,
+            help=f'exact number of {kind}, overriding --markers'
+        )
+    args = parser.parse_args()
+    counts = scaled_counts(args.markers)
+    for kind in SHARES:
+        if getattr(args, kind) is not None:
+            counts[kind] = getattr(args, kind)
+    markers = generate_fdm(args.output, **counts)
+    print(f'Wrote {args.output} with {markers} markers')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+'''Benchmark parsing and plotting of synthetic FDMs, from 10 to 100k markers.
+
+Run from the repository root, inside Blender:
+
+    blender -b --factory-startup --python benchmarks/run.py -- --repeat 3
+
+Results are written as JSON. The run fails when a size is slower than the
+committed baseline by more than the threshold. A run with another
+--repeat, --display-mode or --fast-import than the baseline's is not
+compared. Timings depend on the machine, so refresh the baseline with
+--update-baseline on the machine that runs the comparison.
+'''
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import bpy
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# pylint: disable=wrong-import-position
+from benchmarks.generate import generate_fdm, scaled_counts  # noqa: E402
+from io_scene_jsbsim import JSBSim  # noqa: E402
+from io_scene_jsbsim.fdm import SECTIONS, load_fdm  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+SIZES = (10, 100, 1000, 10000, 100000)
+# Compared against the baseline, lower is better
+METRICS = ('parse_ms', 'plot_ms')
+# Below this, differences are timer noise rather than regressions
+MIN_DELTA_MS = 2.0
+# Run parameters a baseline is only comparable under
+PARAMETERS = ('repeat', 'display_mode', 'fast_import')
+SETTINGS = {
+    'plot_scale': 0.25,
+    'plot_names': False,
+    'plot_axes': False,
+    'thrs_auto_parent': True,
+    'display_mode': 'EMPTIES',
+    **{f'include_{tag}': True for tag in SECTIONS},
+}
+
+
+def get_max_rss_mb():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return max_rss / (1 << 20 if sys.platform == 'darwin' else 1 << 10)
+
+
+def benchmark(filepath, markers, repeat, settings):
+    '''Return the best parse and plot timings of filepath over repeat runs.'''
+    tags = set(SECTIONS)
+    # Memory is traced in a run of its own, tracing slows parsing down
+    tracemalloc.start()
+    load_fdm(filepath, tags)
+    parse_peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    runs = []
+    for _ in range(max(repeat, 1)):
+        bpy.ops.wm.read_factory_settings(use_empty=True)
+        start = time.perf_counter()
+        fdm, _ = load_fdm(filepath, tags)
+        parse_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        importer = JSBSim(filepath, fdm=fdm, **settings)
+        plot_ms = (time.perf_counter() - start) * 1000
+        runs.append((parse_ms + plot_ms, parse_ms, plot_ms, importer.profile))
+    _, parse_ms, plot_ms, profile = min(runs, key=lambda run: run[0])
+    bpy.ops.wm.read_factory_settings(use_empty=True)
+    return {
+        'markers': markers,
+        'objects': profile.counters['objects'],
+        'file_bytes': os.path.getsize(filepath),
+        'parse_ms': parse_ms,
+        'plot_ms': plot_ms,
+        'parse_markers_per_s': markers / parse_ms * 1000,
+        'plot_markers_per_s': markers / plot_ms * 1000,
+        'parse_peak_mb': parse_peak / (1 << 20),
+        'max_rss_mb': get_max_rss_mb(),
+        'phases_ms': profile.timings,
+    }
+
+
+def run(sizes, repeat, display_mode, fast_import=False):
+    settings = dict(SETTINGS, display_mode=display_mode, fast_import=fast_import)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            filepath = os.path.join(directory, f'benchmark_{size}.xml')
+            markers = generate_fdm(filepath, **scaled_counts(size))
+            results[str(size)] = result = benchmark(
+                filepath, markers, repeat, settings
+            )
+            print(
+                f'{markers:>7} markers: parse {result["parse_ms"]:10.1f} ms, '
+                f'plot {result["plot_ms"]:10.1f} ms, '
+                f'parse peak {result["parse_peak_mb"]:8.1f} MB'
+            )
+    return {
+        'blender': bpy.app.version_string,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'display_mode': display_mode,
+        'fast_import': fast_import,
+        'results': results,
+    }
+
+
+def find_regressions(report, baseline, threshold):
+    '''Return the slowdowns over the baseline, which must use the same run.
+
+    Raises ValueError when the run parameters differ from the baseline's.
+    '''
+    mismatches = [
+        f'{name} {report[name]!r}, baseline {baseline.get(name)!r}'
+        for name in PARAMETERS
+        if report[name] != baseline.get(name)
+    ]
+    if mismatches:
+        raise ValueError(f'Not comparable: {"; ".join(mismatches)}')
+    regressions = []
+    for size, result in report['results'].items():
+        expected = baseline['results'].get(size)
+        if expected is None:
+            continue
+        for metric in METRICS:
+            limit = max(
+                expected[metric] * (1 + threshold),
+                expected[metric] + MIN_DELTA_MS
+            )
+            if result[metric] > limit:
+                regressions.append(
+                    f'{size} markers: {metric} {result[metric]:.1f} ms, '
+                    f'baseline {expected[metric]:.1f} ms'
+                )
+    return regressions
+
+
+def main():
+    # Blender's own arguments come before '--'
+    argv = sys.argv[sys.argv.index('--') + 1:] if '--' in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--display-mode',
+        choices=('EMPTIES', 'POINT_CLOUD'),
+        default='EMPTIES',
+        help='compare against a baseline recorded in the same mode'
+    )
+    parser.add_argument(
+        '--fast-import',
+        action='store_true',
+        help='plot with the batched fast import'
+    )
+    parser.add_argument(
+        '--output',
+        default=os.path.join(ROOT, 'benchmarks', 'results.json')
+    )
+    parser.add_argument(
+        '--baseline',
+        default=os.path.join(ROOT, 'benchmarks', 'baseline.json')
+    )
+    parser.add_argument(
+        '--threshold',
+        type=float,
+        default=0.25,
+        help='allowed slowdown over the baseline, 0.25 being 25%%'
+    )
+    parser.add_argument(
+        '--update-baseline',
+        action='store_true',
+        help='write the results as the new baseline instead of comparing'
+    )
+    args = parser.parse_args(argv)
+    report = run(args.sizes, args.repeat, args.display_mode, args.fast_import)
+    with open(args.output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+    print(f'Results written to {args.output}')
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+        print(f'Baseline written to {args.baseline}')
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, nothing to compare')
+        return 0
+    with open(args.baseline, encoding='utf-8') as file:
+        baseline = json.load(file)
+    try:
+        regressions = find_regressions(report, baseline, args.threshold)
+    except ValueError as error:
+        print(f'{error}. Rerun with the baseline\'s parameters, or record a new '
+              'baseline with --update-baseline')
+        return 2
+    for regression in regressions:
+        print(f'Regression: {regression}')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
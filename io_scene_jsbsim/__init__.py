@@ -16,28 +16,140 @@
 #
 # ##### END GPL LICENSE BLOCK #####
 
-from bpy.utils import register_class, unregister_class
-from bpy.props import StringProperty, FloatProperty, BoolProperty
-from bpy.types import Operator, TOPBAR_MT_file_import
+from os import path
+import time
+import bpy
+from bpy.utils import register_class, unregister_class, extension_path_user
+from bpy.props import (
+    StringProperty,
+    FloatProperty,
+    BoolProperty,
+    EnumProperty,
+    IntProperty,
+    CollectionProperty
+)
+from bpy.types import (
+    AddonPreferences,
+    Operator,
+    OperatorFileListElement,
+    TOPBAR_MT_file_import
+)
 from bpy_extras.io_utils import ImportHelper
 
-from .jsbsim import JSBSim
+from .aerodynamics import AERODYNAMICS
+from .cache import ParseCache
+from .comparison import IGNORED_SETTINGS, Comparison
+from .fdm import SECTIONS, Profile, get_parsed_tags, parse_fdm_files
+from .jsbsim import POINT_CLOUD_THRESHOLD, JSBSim
+from .sources import (
+    READ_ERRORS,
+    close_archives,
+    find_archive_fdm_files,
+    find_fdm_files,
+    is_archive,
+    is_xml
+)
+from .validation import get_report_lines
+from . import export, flightlog, lazysections, livereload, loadedcg, markerpanel
 
+# Seconds of import work per timer tick of a modal import, about one frame
+MODAL_TIME_BUDGET = 0.016
+MODAL_TIMER_STEP = 0.001
 
-class ImportJSBSim(Operator, ImportHelper):
-    bl_idname = 'import_scene.jsbsim'
-    bl_label = 'Import JSBSim'
-    bl_description = 'Import and visualize JSBSim FDM aircraft XML metrics in Blender'
-    bl_options = {'REGISTER', 'UNDO', 'PRESET'}
 
+def get_parse_cache(context, enabled_only=True):
+    '''Return the parse cache configured in the preferences, or None.'''
+    addon = context.preferences.addons.get(__package__)
+    if addon is None:
+        return None
+    preferences = addon.preferences
+    if enabled_only and not preferences.use_parse_cache:
+        return None
+    try:
+        directory = extension_path_user(__package__, path='parse_cache', create=True)
+    except (ValueError, OSError) as error:
+        print('JSBSim warning: Parse cache unavailable [', error, ']')
+        return None
+    return ParseCache(directory, preferences.parse_cache_size * 1024 * 1024)
+
+
+class ClearParseCache(Operator):
+    bl_idname = 'preferences.jsbsim_clear_parse_cache'
+    bl_label = 'Clear Parse Cache'
+    bl_description = 'Remove every cached parsed FDM from disk'
+
+    def execute(self, context):
+        cache = get_parse_cache(context, enabled_only=False)
+        if cache is None:
+            return {'CANCELLED'}
+        cache.clear()
+        self.report({'INFO'}, 'JSBSim parse cache cleared')
+        return {'FINISHED'}
+
+
+class JSBSimPreferences(AddonPreferences):
+    bl_idname = __package__
+
+    use_parse_cache: BoolProperty(
+        name='Cache parsed FDMs',                                           # noqa: F722
+        description='Keep parsed FDMs on disk so unchanged files are not '  # noqa: F722
+                    'parsed again on the next import',                      # noqa: F722
+        default=True
+    )  # type: ignore
+
+    parse_cache_size: IntProperty(
+        name='Cache size limit (MB)',                                       # noqa: F722
+        description='Least recently used entries are removed past this '    # noqa: F722
+                    'size',                                                 # noqa: F821
+        default=256,
+        min=1,
+        max=65536
+    )  # type: ignore
+
+    def draw(self, _context):
+        layout = self.layout
+        layout.use_property_split = True
+        layout.prop(self, 'use_parse_cache')
+        row = layout.row()
+        row.active = self.use_parse_cache
+        row.prop(self, 'parse_cache_size')
+        layout.operator(ClearParseCache.bl_idname, icon='TRASH')
+
+
+class JSBSimImportHelper(ImportHelper):
+    '''Settings and steps of the import operators.
+
+    Blender can't register a subclass of a registered operator, so both
+    operators take them from this mixin.
+    '''
     filename_ext = '.xml'
     filter_glob: StringProperty(
-        default='*.xml',        # noqa: F722
-        options={'HIDDEN'}      # noqa: F821
+        default='*.xml;*.xml.gz;*.zip',     # noqa: F722
+        options={'HIDDEN'}                  # noqa: F821
+    )  # type: ignore
+
+    files: CollectionProperty(
+        type=OperatorFileListElement,
+        options={'HIDDEN', 'SKIP_SAVE'}     # noqa: F821
+    )  # type: ignore
+
+    directory: StringProperty(
+        subtype='DIR_PATH',                 # noqa: F821
+        options={'HIDDEN', 'SKIP_SAVE'}     # noqa: F821
     )  # type: ignore
 
     jsb_instance = None
     filepath = ''
+    # State of the import in progress
+    import_job = None
+    importers = ()
+    failed = 0
+    batch_size = 0
+    elapsed_start_batch = 0.0
+    timer = None
+    # Create all objects in one batched pass, see ImportJSBSimFast
+    fast_import = False
+    performance_props = ('lazy_sections', 'use_modal')
 
     # Per import settings
     plot_scale: FloatProperty(
@@ -60,6 +172,31 @@ class ImportJSBSim(Operator, ImportHelper):
         default=False
     )  # type: ignore
 
+    display_mode: EnumProperty(
+        name='Display',                                                  # noqa: F821
+        description='How plotted locations are turned into objects',    # noqa: F722
+        items=(
+            (
+                'AUTO',                                                  # noqa: F821
+                'Automatic',                                             # noqa: F821
+                'Point clouds for sections with more than '             # noqa: F722
+                f'{POINT_CLOUD_THRESHOLD} locations, empties otherwise'  # noqa: F722
+            ),
+            (
+                'EMPTIES',                                               # noqa: F821
+                'Empties',                                               # noqa: F821
+                'One empty object per location'                          # noqa: F722
+            ),
+            (
+                'POINT_CLOUD',                                           # noqa: F821
+                'Point Clouds',                                          # noqa: F722
+                'One instanced point cloud mesh per section, '          # noqa: F722
+                'for very large FDMs'                                    # noqa: F722
+            ),
+        ),
+        default='AUTO'                                                   # noqa: F821
+    )  # type: ignore
+
     thrs_auto_parent: BoolProperty(
         name='Thrusters',                                               # noqa: F821
         description='Automatically parent Thrusters to their Engines',  # noqa: F722
@@ -96,6 +233,75 @@ class ImportJSBSim(Operator, ImportHelper):
         default=True
     )  # type: ignore
 
+    include_aerodynamics: BoolProperty(
+        name='Aerodynamics',                                                # noqa: F821
+        description='Draw the aerodynamic coefficient tables, 1D tables '   # noqa: F722
+                    'as curves and 2D and 3D tables as surfaces',           # noqa: F722
+        default=False
+    )  # type: ignore
+
+    live_reload: BoolProperty(
+        name='Watch file',                                                  # noqa: F722
+        description='Keep the imported objects up to date when the file '   # noqa: F722
+                    'is saved, changing only the edited sections',          # noqa: F722
+        default=False
+    )  # type: ignore
+
+    lazy_sections: BoolProperty(
+        name='Create when shown',                                           # noqa: F722
+        description='Import the sections hidden and only create their '     # noqa: F722
+                    'objects once a section collection is shown',           # noqa: F722
+        default=False
+    )  # type: ignore
+
+    validate: BoolProperty(
+        name='Check locations',                                             # noqa: F722
+        description='Flag locations duplicated within a section and '       # noqa: F722
+                    'outliers far from all others, like a unit mistake',    # noqa: F722
+        default=False
+    )  # type: ignore
+
+    validate_tolerance: FloatProperty(
+        name='Tolerance',                                                   # noqa: F821
+        description='Distance in meters under which two locations of a '    # noqa: F722
+                    'section are duplicates',                               # noqa: F722
+        default=0.001,
+        min=0.0,
+        precision=4
+    )  # type: ignore
+
+    use_modal: BoolProperty(
+        name='Show progress',                                               # noqa: F722
+        description='Import bit by bit with a progress bar, keeping '       # noqa: F722
+                    'Blender responsive. Press Esc to cancel the import',   # noqa: F722
+        default=True
+    )  # type: ignore
+
+    batch_recursive: BoolProperty(
+        name='Search subdirectories',                                       # noqa: F722
+        description='When importing a directory, also import FDMs found '   # noqa: F722
+                    'in its subdirectories',                                # noqa: F722
+        default=False
+    )  # type: ignore
+
+    compare: BoolProperty(
+        name='Compare variants',                                            # noqa: F722
+        description='Import the selected FDMs as variants of an aircraft '  # noqa: F722
+                    'into one collection. Markers the same in all of '   # noqa: F722
+                    'them are created once and shared, only the markers '   # noqa: F722
+                    'that differ are created per variant',                  # noqa: F722
+        default=False
+    )  # type: ignore
+
+    compare_tolerance: FloatProperty(
+        name='Tolerance',                                                   # noqa: F821
+        description='Distance in meters under which a location is the '     # noqa: F722
+                    'same in two variants',                                 # noqa: F722
+        default=0.001,
+        min=0.0,
+        precision=4
+    )  # type: ignore
+
     def draw(self, _context):
         layout = self.layout
         layout.use_property_split = True
@@ -112,18 +318,13 @@ class ImportJSBSim(Operator, ImportHelper):
             (
                 'JSBSim_FDM_import_include',
                 'Include',
-                [
-                    'include_metrics',
-                    'include_mass_balance',
-                    'include_ground_reactions',
-                    'include_external_reactions',
-                    'include_propulsion'
-                ]
+                [f'include_{tag}' for tag in (*SECTIONS, AERODYNAMICS)]
             ),
             (
                 'JSBSim_FDM_import_plot_objects',
                 'Plotted Objects',
                 [
+                    'display_mode',
                     'plot_scale',
                     'plot_names',
                     'plot_axes'
@@ -133,43 +334,343 @@ class ImportJSBSim(Operator, ImportHelper):
                 'JSBSim_FDM_import_parenting',
                 'Parenting',
                 ['thrs_auto_parent']
+            ),
+            (
+                'JSBSim_FDM_import_live_reload',
+                'Live Reload',
+                ['live_reload']
+            ),
+            (
+                'JSBSim_FDM_import_validation',
+                'Validation',
+                ['validate', 'validate_tolerance']
+            ),
+            (
+                'JSBSim_FDM_import_batch',
+                'Batch',
+                ['batch_recursive', 'compare', 'compare_tolerance']
+            ),
+            (
+                'JSBSim_FDM_import_performance',
+                'Performance',
+                self.performance_props
             )
         ]
 
         for panel_id, label, props in panels:
             draw_props_panel(panel_id, label, props)
 
-    def execute(self, _context):
-        if not self.filepath or not self.filepath.lower().endswith('.xml'):
-            self.report({'ERROR'}, 'Please select a valid XML file')
+    def get_filepaths(self):
+        '''Return the FDM files to import: a directory, a selection or one file.
+
+        Selected zip archives are replaced by the FDM files they contain.
+        '''
+        if self.filepath and path.isdir(self.filepath):
+            return find_fdm_files(self.filepath, self.batch_recursive)
+        selected = [
+            path.join(self.directory, file.name) for file in self.files if file.name
+        ]
+        if len(selected) < 2:
+            selected = [self.filepath] if self.filepath else []
+        filepaths = []
+        for filepath in selected:
+            if is_archive(filepath):
+                filepaths.extend(find_archive_fdm_files(filepath))
+            elif is_xml(filepath):
+                filepaths.append(filepath)
+        return filepaths
+
+    def execute(self, context):
+        try:
+            filepaths = self.get_filepaths()
+        except READ_ERRORS as error:
+            close_archives()
+            self.report({'ERROR'}, f'Could not read {self.filepath}: {error}')
+            return {'CANCELLED'}
+        if not filepaths:
+            close_archives()
+            self.report({'ERROR'}, 'Please select a valid XML or zip file')
             return {'CANCELLED'}
         settings = {
             'plot_scale': self.plot_scale,
             'plot_names': self.plot_names,
             'plot_axes': self.plot_axes,
             'thrs_auto_parent': self.thrs_auto_parent,
+            'display_mode': self.display_mode,
+            'live_reload': self.live_reload,
+            'fast_import': self.fast_import,
+            'lazy_sections': self.lazy_sections,
+            'validate': self.validate,
+            'validate_tolerance': self.validate_tolerance,
             'include_metrics': self.include_metrics,
             'include_mass_balance': self.include_mass_balance,
             'include_ground_reactions': self.include_ground_reactions,
             'include_external_reactions': self.include_external_reactions,
-            'include_propulsion': self.include_propulsion
+            'include_propulsion': self.include_propulsion,
+            'include_aerodynamics': self.include_aerodynamics
         }
-        self.jsb_instance = JSBSim(self.filepath, **settings)  # init import operator
+        self.import_job = self.import_steps(
+            filepaths, settings, get_parse_cache(context)
+        )
+        # A fast import runs in one go, and background mode has no event
+        # loop to drive a modal import
+        if (
+            self.use_modal and not self.fast_import
+            and context.window and not bpy.app.background
+        ):
+            return self.start_modal(context)
+        for _ in self.import_job:
+            pass
+        return self.report_import()
+
+    def import_steps(self, filepaths, settings, cache):
+        '''Import filepaths one after another, yielding the share done.'''
+        try:
+            yield from self.import_files(filepaths, settings, cache)
+        finally:
+            # Kept open for all of their members, until the import ends
+            close_archives()
+
+    def import_files(self, filepaths, settings, cache):
+        self.importers = []
+        self.failed = 0
+        self.batch_size = len(filepaths)
+        self.elapsed_start_batch = time.perf_counter()
+        if len(filepaths) == 1:
+            yield from self.plot_steps(
+                JSBSim(filepaths[0], cache=cache, deferred=True, **settings), 0
+            )
+            return
+        if self.compare:
+            yield from self.compare_files(filepaths, settings, cache)
+            return
+        tags = get_parsed_tags(settings)
+        for index, result in self.parse_files(filepaths, tags, cache):
+            yield from self.plot_steps(
+                JSBSim(result.filepath, fdm=result.fdm, deferred=True, **settings),
+                index
+            )
+            print(
+                f'Batch: {result.filepath} '
+                f'{"loaded from cache" if result.cache_hit else "parsed"} '
+                f'in {result.elapsed_ms:.3f} ms, '
+                f'plotted in {self.jsb_instance.elapsed_import_ms:.3f} ms'
+            )
+
+    def parse_files(self, filepaths, tags, cache):
+        '''Yield the index and result of every file parsed, reporting failures.'''
+        for index, result in enumerate(parse_fdm_files(filepaths, tags, cache)):
+            if result.error is not None:
+                self.failed += 1
+                self.report(
+                    {'WARNING'},
+                    f'Failed to import {result.filepath}: {result.error}'
+                )
+                continue
+            yield index, result
+
+    def compare_files(self, filepaths, settings, cache):
+        '''Parse filepaths, then import them as the variants of a comparison.
+
+        Parsing is the first half of the progress, plotting the second.
+        '''
+        settings = {**settings, **IGNORED_SETTINGS}
+        tags = get_parsed_tags(settings)
+        variants = []
+        for index, result in self.parse_files(filepaths, tags, cache):
+            variants.append((result.filepath, result.fdm))
+            yield (index + 1) / self.batch_size / 2
+        if not variants:
+            return
+        comparison = Comparison(
+            variants, self.compare_tolerance, deferred=True, **settings
+        )
+        self.importers.append(comparison)
+        for progress in comparison.plot_steps():
+            yield 0.5 + progress / 2
+        comparison.finish_import()
+        self.jsb_instance = comparison
+
+    def plot_steps(self, importer, index):
+        '''Plot one parsed FDM, the index-th of the batch.'''
+        self.importers.append(importer)
+        for progress in importer.plot_steps():
+            yield (index + progress) / self.batch_size
+        importer.finish_import()
+        self.jsb_instance = importer
+
+    def report_import(self):
+        if self.batch_size == 1:
+            self.report({'INFO'}, self.jsb_instance.get_summary())
+            self.report_issues(self.jsb_instance, detailed=True)
+            return {'FINISHED'}
+        if self.compare:
+            return self.report_comparison()
+        elapsed_batch_ms = (time.perf_counter() - self.elapsed_start_batch) * 1000
+        profile = Profile()
+        for importer in self.importers:
+            profile.merge(importer.profile)
+        for importer in self.importers:
+            self.report_issues(importer)
+        imported = self.batch_size - self.failed
+        self.report(
+            {'WARNING'} if self.failed else {'INFO'},
+            f'Imported {imported} of {self.batch_size} JSBSim FDMs '
+            f'in {elapsed_batch_ms:.3f} ms ({profile.summary()})'
+        )
+        return {'FINISHED'} if imported else {'CANCELLED'}
+
+    def report_comparison(self):
+        if self.jsb_instance is None:
+            self.report({'ERROR'}, f'None of the {self.batch_size} FDMs could be read')
+            return {'CANCELLED'}
+        self.report(
+            {'WARNING'} if self.failed else {'INFO'},
+            self.jsb_instance.get_summary()
+        )
         return {'FINISHED'}
 
+    def report_issues(self, importer, detailed=False):
+        if not importer.issues:
+            return
+        self.report(
+            {'WARNING'},
+            f'{importer.filename}: {len(importer.issues)} duplicate or outlier '
+            'locations'
+        )
+        if detailed:
+            for line in get_report_lines(importer.issues):
+                self.report({'WARNING'}, line)
+
+    def start_modal(self, context):
+        window_manager = context.window_manager
+        self.timer = window_manager.event_timer_add(
+            MODAL_TIMER_STEP, window=context.window
+        )
+        window_manager.progress_begin(0.0, 1.0)
+        self.set_status(context, 0.0)
+        window_manager.modal_handler_add(self)
+        return {'RUNNING_MODAL'}
+
+    def set_status(self, context, progress):
+        subject = (
+            'JSBSim FDM' if self.batch_size == 1
+            else f'{self.batch_size} JSBSim FDMs'
+        )
+        context.workspace.status_text_set(
+            f'Importing {subject}: {progress:.0%} (Esc to cancel)'
+        )
+
+    def end_modal(self, context):
+        window_manager = context.window_manager
+        window_manager.event_timer_remove(self.timer)
+        window_manager.progress_end()
+        context.workspace.status_text_set(None)
+
+    def cancel_import(self, context):
+        '''Stop importing and remove the collections created so far.'''
+        self.import_job.close()
+        for importer in self.importers:
+            importer.remove()
+        self.end_modal(context)
+
+    def modal(self, context, event):
+        if event.type == 'ESC':
+            self.cancel_import(context)
+            self.report({'WARNING'}, 'JSBSim import cancelled')
+            return {'CANCELLED'}
+        if event.type != 'TIMER':
+            return {'PASS_THROUGH'}
+        # A slice of the import per tick, so the UI keeps redrawing
+        deadline = time.perf_counter() + MODAL_TIME_BUDGET
+        progress = None
+        try:
+            while time.perf_counter() < deadline:
+                progress = next(self.import_job)
+        except StopIteration:
+            self.end_modal(context)
+            return self.report_import()
+        except Exception:
+            self.cancel_import(context)
+            raise
+        context.window_manager.progress_update(progress)
+        self.set_status(context, progress)
+        return {'RUNNING_MODAL'}
+
+
+class ImportJSBSim(Operator, JSBSimImportHelper):
+    bl_idname = 'import_scene.jsbsim'
+    bl_label = 'Import JSBSim'
+    bl_description = 'Import and visualize JSBSim FDM aircraft XML metrics in Blender'
+    bl_options = {'REGISTER', 'UNDO', 'PRESET'}
+
+
+class ImportJSBSimFast(Operator, JSBSimImportHelper):
+    '''Import in one batched pass, without an undo step.
+
+    Registered without 'UNDO', so Blender keeps no copy of the created
+    objects in the undo history. The import can't be undone.
+    '''
+    bl_idname = 'import_scene.jsbsim_fast'
+    bl_label = 'Import JSBSim (Fast)'
+    bl_description = (
+        'Import large FDMs in one batched pass, without progress, '
+        'cancelling or an undo step'
+    )
+    bl_options = {'REGISTER', 'PRESET'}
+
+    fast_import = True
+    performance_props = ('lazy_sections',)
+
+    def execute(self, context):
+        result = super().execute(context)
+        if 'FINISHED' in result:
+            self.report(
+                {'WARNING'},
+                'Fast import: no undo step was recorded, Ctrl+Z can\'t undo '
+                'this import'
+            )
+        return result
+
 
 def menu_func_import(self, _context):
     self.layout.operator(
         ImportJSBSim.bl_idname,
-        text='JSBSim Flight Dynamics Model (.xml)'
+        text='JSBSim Flight Dynamics Model (.xml, .zip, folder)'
+    )
+    self.layout.operator(
+        ImportJSBSimFast.bl_idname,
+        text='JSBSim Flight Dynamics Model, fast, no undo (.xml, .zip, folder)'
     )
 
 
+classes = (
+    ClearParseCache,
+    JSBSimPreferences,
+    ImportJSBSim,
+    ImportJSBSimFast,
+)
+
+
 def register():
-    register_class(ImportJSBSim)
+    for cls in classes:
+        register_class(cls)
     TOPBAR_MT_file_import.append(menu_func_import)
+    livereload.register()
+    loadedcg.register()
+    markerpanel.register()
+    lazysections.register()
+    flightlog.register()
+    export.register()
 
 
 def unregister():
-    unregister_class(ImportJSBSim)
+    export.unregister()
+    flightlog.unregister()
+    lazysections.unregister()
+    markerpanel.unregister()
+    loadedcg.unregister()
+    livereload.unregister()
+    for cls in reversed(classes):
+        unregister_class(cls)
     TOPBAR_MT_file_import.remove(menu_func_import)
@@ -0,0 +1,129 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import numpy as np
+
+AERODYNAMICS = 'aerodynamics'
+LOOKUPS = ('row', 'column', 'table')
+
+
+class Table:
+    '''A <table> of the aerodynamics, its breakpoints and values as arrays.
+
+    rows holds the row breakpoints and values the looked up values: one per
+    row for a 1D table, (rows, columns) for a 2D table. A 3D table has one
+    2D table per breakpoint, with columns and values as lists of slices.
+    '''
+    __slots__ = (
+        'name', 'function', 'axis', 'variables', 'rows', 'columns',
+        'breakpoints', 'values'
+    )
+
+    def __init__(self, name, function, axis, variables):
+        self.name = name
+        self.function = function
+        self.axis = axis
+        self.variables = variables  # by lookup, e.g. {'row': 'aero/alpha-rad'}
+        self.rows = None
+        self.columns = None
+        self.breakpoints = None
+        self.values = None
+
+    @property
+    def dimensions(self):
+        return len(self.variables)
+
+
+def get_numbers(table_data):
+    '''Return the numbers of a <tableData> and how many are on its first line.'''
+    text = ''.join(table_data.itertext())
+    first_line = next((line for line in text.splitlines() if line.strip()), '')
+    # A single conversion of every number, in C
+    return np.array(text.split(), dtype=np.float64), len(first_line.split())
+
+
+def parse_2d(table_data):
+    '''Return the rows, columns and (rows, columns) values of a 2D table.'''
+    numbers, column_count = get_numbers(table_data)
+    grid = numbers[column_count:].reshape(-1, column_count + 1)
+    if grid.shape[0] == 0:
+        raise ValueError('Empty tableData')
+    return grid[:, 0], numbers[:column_count], grid[:, 1:]
+
+
+def parse_table(element, name, function, axis):
+    '''Return the Table of a <table> element, ValueError if malformed.'''
+    variables = {}
+    for variable in element.findall('independentVar'):
+        variables[variable.get('lookup', 'row')] = variable.text.strip()
+    if not variables or set(variables) - set(LOOKUPS):
+        raise ValueError(f'Unsupported lookups: {", ".join(variables)}')
+    table = Table(name, function, axis, variables)
+    table_datas = element.findall('tableData')
+    if not table_datas:
+        raise ValueError('Missing tableData')
+    if table.dimensions == 1:
+        numbers, _ = get_numbers(table_datas[0])
+        pairs = numbers.reshape(-1, 2)
+        if pairs.size == 0:
+            raise ValueError('Empty tableData')
+        table.rows, table.values = pairs[:, 0], pairs[:, 1]
+    elif table.dimensions == 2:
+        table.rows, table.columns, table.values = parse_2d(table_datas[0])
+    else:
+        table.breakpoints = np.array(
+            [table_data.get('breakPoint') for table_data in table_datas],
+            dtype=np.float64
+        )
+        slices = [parse_2d(table_data) for table_data in table_datas]
+        table.rows, table.columns, table.values = (list(part) for part in zip(*slices))
+    return table
+
+
+def iter_tables(element, axis=None, function=None):
+    '''Yield every <table> under element with its function and axis names.'''
+    for child in element:
+        if child.tag == 'axis':
+            yield from iter_tables(child, child.get('name'), function)
+        elif child.tag == 'function':
+            yield from iter_tables(child, axis, child.get('name'))
+        elif child.tag == 'table':
+            yield child, function, axis
+        else:
+            yield from iter_tables(child, axis, function)
+
+
+def parse_aerodynamics(aerodynamics):
+    '''Return the tables of an <aerodynamics> element.
+
+    Tables are named after their name attribute or their function, repeats
+    numbered in document order. Malformed tables are left out with a
+    warning.
+    '''
+    tables = []
+    seen = {}
+    for element, function, axis in iter_tables(aerodynamics):
+        name = element.get('name') or function or 'table'
+        count = seen[name] = seen.get(name, 0) + 1
+        if count > 1:
+            name = f'{name} #{count}'
+        try:
+            tables.append(parse_table(element, name, function, axis))
+        except (AttributeError, TypeError, ValueError) as error:
+            print('JSBSim warning: Unreadable table [', name, error, ']')
+    return tables
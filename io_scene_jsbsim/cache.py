@@ -0,0 +1,172 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from contextlib import contextmanager
+import hashlib
+import json
+import os
+import pickle
+
+from .sources import open_source, stat_source
+
+# Bump when the pickled FDM model changes shape, old entries are then ignored
+CACHE_VERSION = 5
+INDEX_NAME = 'index.json'
+ENTRY_SUFFIX = '.fdm.pickle'
+
+
+class ParseCache:
+    '''On-disk cache of parsed FDM models, evicting least recently used entries.
+
+    Entries are keyed by the content hash of the FDM file plus the parsed
+    sections. An index of path, mtime and size to content hash lets an
+    unchanged file skip hashing as well as parsing.
+    '''
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, INDEX_NAME)
+        self.index = None
+        self.index_changed = False
+        self.index_deferred = False
+
+    def load_index(self):
+        if self.index is None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as stream:
+                    self.index = json.load(stream)
+            except (OSError, ValueError):
+                self.index = {}
+        return self.index
+
+    def save_index(self):
+        '''Write the index if it changed, once per stored or loaded entry.'''
+        if not self.index_changed or self.index_deferred:
+            return
+        temp_path = f'{self.index_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as stream:
+            json.dump(self.index, stream)
+        os.replace(temp_path, self.index_path)
+        self.index_changed = False
+
+    @contextmanager
+    def deferred_index(self):
+        '''Write the index once, when a batch of loads and stores is done.'''
+        self.index_deferred = True
+        try:
+            yield self
+        finally:
+            self.index_deferred = False
+            try:
+                self.save_index()
+            except OSError as error:
+                print('JSBSim warning: Parse cache index not written [', error, ']')
+
+    def get_content_hash(self, filepath):
+        filepath = os.path.abspath(filepath)
+        mtime_ns, size = stat_source(filepath)
+        index = self.load_index()
+        known = index.get(filepath)
+        if known and known[:2] == [mtime_ns, size]:
+            return known[2]
+        digest = hashlib.blake2b(digest_size=16)
+        with open_source(filepath) as stream:
+            for chunk in iter(lambda: stream.read(1 << 20), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        index[filepath] = [mtime_ns, size, content_hash]
+        self.index_changed = True
+        return content_hash
+
+    def get_entry_path(self, filepath, tags):
+        key = '-'.join(sorted(tags))
+        tags_hash = hashlib.blake2b(key.encode(), digest_size=4).hexdigest()
+        return os.path.join(
+            self.directory,
+            f'{self.get_content_hash(filepath)}-{tags_hash}-v{CACHE_VERSION}'
+            f'{ENTRY_SUFFIX}'
+        )
+
+    def load(self, filepath, tags):
+        '''Return the cached FDM model for filepath, or None on a miss.'''
+        entry_path = self.get_entry_path(filepath, tags)
+        try:
+            with open(entry_path, 'rb') as stream:
+                fdm = pickle.load(stream)
+        # A missing, truncated or stale entry fails in many ways, all misses
+        except Exception:  # pylint: disable=broad-exception-caught
+            return None
+        os.utime(entry_path)  # mark as recently used
+        self.save_index()  # e.g. a file touched but not changed
+        return fdm
+
+    def store(self, filepath, tags, fdm):
+        entry_path = self.get_entry_path(filepath, tags)
+        temp_path = f'{entry_path}.tmp'
+        with open(temp_path, 'wb') as stream:
+            pickle.dump(fdm, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, entry_path)
+        self.evict()
+        self.save_index()
+
+    def get_entries(self):
+        entries = []
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(ENTRY_SUFFIX):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return entries
+
+    def evict(self):
+        '''Remove least recently used entries until under max_bytes.
+
+        Files whose content hash no longer has any entry are dropped from
+        the index too, so that it doesn't grow with every file ever read.
+        '''
+        entries = sorted(self.get_entries())
+        total_bytes = sum(size for _, size, _ in entries)
+        evicted = 0
+        for _, size, entry_path in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            os.remove(entry_path)
+            total_bytes -= size
+            evicted += 1
+        if not evicted:
+            return
+        content_hashes = {
+            os.path.basename(entry_path).split('-', 1)[0]
+            for _, _, entry_path in entries[evicted:]
+        }
+        index = self.load_index()
+        for filepath, known in list(index.items()):
+            if known[2] not in content_hashes:
+                del index[filepath]
+                self.index_changed = True
+
+    def clear(self):
+        for _, _, entry_path in self.get_entries():
+            os.remove(entry_path)
+        self.index = {}
+        self.index_changed = True
+        self.save_index()
+
+    def get_size(self):
+        return sum(size for _, size, _ in self.get_entries())
@@ -0,0 +1,252 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from os import path
+import time
+import bpy
+import numpy as np
+
+from .fdm import FDM, SECTIONS, get_loaded_cg
+from .jsbsim import PLOT_STEP, JSBSim, find_layer_collection
+from .loadedcg import TOTAL_WEIGHT_PROPERTY
+from .variants import (
+    DIFFERENCE_PROPERTY,
+    VARIANTS_PROPERTY,
+    diff_section,
+    get_variant_names
+)
+
+COMMON_COLLECTION = 'Common'
+# Settings of a single import that a comparison doesn't apply
+IGNORED_SETTINGS = {
+    'include_aerodynamics': False,
+    'live_reload': False,
+    'lazy_sections': False,
+    'validate': False,
+}
+# Color tag of the collections holding the markers that differ
+DIFFERENCE_COLOR = 'COLOR_01'
+
+
+class Comparison(JSBSim):
+    '''Import variants of an FDM into one collection, sharing what they agree on.
+
+    Markers the same in every variant are created once, in a Common
+    collection each variant shows through a collection instance. Only the
+    markers that differ are created per variant, flagged with what differs,
+    so the objects grow with the differences rather than with the variants.
+    '''
+    action = 'Compared'
+
+    def __init__(self, variants, tolerance=0.001, **settings):
+        # (filepath, FDM) of each variant, parsed beforehand
+        self.variants = variants
+        self.filepaths = [filepath for filepath, _ in variants]
+        self.names = get_variant_names(
+            self.filepaths,
+            (COMMON_COLLECTION, *(name for name, _ in SECTIONS.values()))
+        )
+        self.tolerance = tolerance
+        super().__init__(self.filepaths[0], fdm=FDM(self.names[0], {}), **settings)
+        for _, fdm in variants:
+            self.profile.merge(fdm.profile)
+
+    def read_source_stat(self):
+        return None  # nothing is exported back from a comparison
+
+    def store_source(self):
+        self.collection[VARIANTS_PROPERTY] = [
+            path.abspath(filepath) for filepath in self.filepaths
+        ]
+
+    def get_root_collection_and_id(self):
+        # Numbered apart from the single imports of the first variant
+        self.filename = f'{self.names[0]} +{len(self.names) - 1}'
+        return super().get_root_collection_and_id()
+
+    def get_summary(self):
+        counters = self.profile.counters
+        return (
+            f'{self.action} {len(self.names)} JSBSim FDMs: '
+            f'{counters.get("shared", 0)} markers shared, '
+            f'{counters.get("differing", 0)} differing, '
+            f'{counters.get("objects", 0)} objects '
+            f'in {self.profile.timings["total"]:.1f} ms ({self.profile.summary()})'
+        )
+
+    def finish_import(self):
+        super().finish_import()
+        self.variants = None  # drop the parsed models once plotted
+
+    def flag(self, plotted_object, text):
+        '''Highlight a marker that differs between variants.'''
+        plotted_object[DIFFERENCE_PROPERTY] = text
+        plotted_object.show_name = True
+        plotted_object.show_in_front = True
+
+    def diff(self):
+        '''Return (name, collection name, section, row, difference) per marker.
+
+        Shared markers go to the sections of the Common collection with no
+        difference, the others to the sections of their variant.
+        '''
+        common = self.get_collection(COMMON_COLLECTION)
+        for name in self.names:
+            self.get_collection(name)
+        markers = []
+        for tag, (collection_name, _) in SECTIONS.items():
+            if tag not in self.get_plotted_tags():
+                continue
+            sections = [fdm.sections.get(tag) for _, fdm in self.variants]
+            if all(section is None for section in sections):
+                print('JSBSim warning: Missing tag [', tag, ']')
+                continue
+            shared, differences = diff_section(sections, self.tolerance)
+            self.profile.count('shared', len(shared))
+            if len(shared):
+                self.get_collection(collection_name, common)
+                items = sections[0].items
+                markers += [
+                    (items[row].label, collection_name, sections[0], row, None)
+                    for row in shared.tolist()
+                ]
+            for name, section, section_differences in zip(
+                self.names, sections, differences
+            ):
+                if not section_differences:
+                    continue
+                variant_collection_name = f'{collection_name} - {name}'
+                self.get_collection(
+                    variant_collection_name, self.collections[name]
+                ).color_tag = DIFFERENCE_COLOR
+                markers += [
+                    (
+                        f'{section.items[row].label} - {name}',
+                        variant_collection_name,
+                        section,
+                        row,
+                        text
+                    )
+                    for row, text in section_differences.items()
+                ]
+                self.profile.count('differing', len(section_differences))
+        return markers
+
+    def plot_steps(self):
+        with self.profile.phase('diff'):
+            markers = self.diff()
+        start = time.perf_counter()
+        # Created in name order, see JSBSim.plot_batched()
+        markers.sort(key=lambda marker: f'{marker[0]} - {self.unique_id}'.lower())
+        # By section and row, a thruster is shared or not along with its engine
+        plotted_objects = {}
+        for index, (name, collection_name, section, row, text) in enumerate(
+            markers, 1
+        ):
+            item = section.items[row]
+            plotted_object = self.plot(
+                name,
+                (section.coords[row] / self.unit_scale_length).tolist(),
+                collection_name,
+                item.mesh_type,
+                item.rotation,
+                item.display_size
+            )
+            self.set_properties(plotted_object, item, section, created=True)
+            plotted_objects[id(section), row] = plotted_object
+            if text is not None:
+                self.flag(plotted_object, text)
+            if not index % PLOT_STEP:
+                self.link_pending_objects()
+                self.profile.add('create_objects', (time.perf_counter() - start) * 1000)
+                yield index / len(markers)
+                start = time.perf_counter()
+        if self.thrs_auto_parent:
+            for _, _, section, row, _ in markers:
+                parent = section.items[row].parent
+                if parent is not None:
+                    self.set_object_parent(
+                        obj=plotted_objects[id(section), row],
+                        parent_obj=plotted_objects[id(section), parent],
+                        keep_global_transform=True
+                    )
+        self.plot_instances()
+        self.plot_loaded_cgs()
+        self.link_pending_objects()
+        self.profile.add('create_objects', (time.perf_counter() - start) * 1000)
+        if self.fast_import:
+            bpy.context.scene.collection.children.link(self.collection)
+        # Only ever seen through the instances of the variants
+        find_layer_collection(
+            bpy.context.view_layer.layer_collection,
+            self.collections[COMMON_COLLECTION]
+        ).exclude = True
+        yield 1.0
+
+    def plot_instances(self):
+        '''Show the Common collection in every variant, as an instance.'''
+        common = self.collections[COMMON_COLLECTION]
+        for name in self.names:
+            instance = bpy.data.objects.new(
+                f'{COMMON_COLLECTION} - {name} - {self.unique_id}', None
+            )
+            instance.instance_type = 'COLLECTION'
+            instance.instance_collection = common
+            instance.empty_display_size = self.plot_scale
+            self.pending_objects.setdefault(name, []).append(instance)
+
+    def plot_loaded_cgs(self):
+        '''Mark the loaded CG of the variants, in Common if they all agree.'''
+        if 'mass_balance' not in self.get_plotted_tags():
+            return
+        loaded_cgs = [get_loaded_cg(fdm.sections) for _, fdm in self.variants]
+        known = [loaded_cg for loaded_cg in loaded_cgs if loaded_cg is not None]
+        if not known:
+            return
+        locations = np.array([location for location, _ in known])
+        totals = np.array([total for _, total in known])
+        spread = np.linalg.norm(locations - locations[0], axis=1).max()
+        texts = []
+        if len(known) < len(loaded_cgs):
+            texts.append(f'in {len(known)} of {len(loaded_cgs)} variants')
+        if not np.allclose(totals, totals[0]):
+            texts.append('values differ')
+        if spread > self.tolerance:
+            texts.append(f'moved up to {spread * 1000:.1f} mm')
+        if not texts:
+            self.plot_loaded_cg_marker('LOADED CG', COMMON_COLLECTION, *known[0])
+            return
+        for name, loaded_cg in zip(self.names, loaded_cgs):
+            if loaded_cg is not None:
+                self.flag(
+                    self.plot_loaded_cg_marker(
+                        f'LOADED CG - {name}', name, *loaded_cg
+                    ),
+                    ', '.join(texts)
+                )
+
+    def plot_loaded_cg_marker(self, name, collection_name, location, total_weight):
+        # Not a tracked marker, it would follow the masses of every variant
+        marker = self.plot(
+            name,
+            (location / self.unit_scale_length).tolist(),
+            collection_name,
+            'PLAIN_AXES'
+        )
+        marker[TOTAL_WEIGHT_PROPERTY] = total_weight
+        return marker
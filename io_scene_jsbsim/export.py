@@ -0,0 +1,256 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+import time
+import xml.etree.ElementTree as ET
+import bpy
+from bpy.props import StringProperty
+from bpy.types import Operator, TOPBAR_MT_file_export
+from bpy.utils import register_class, unregister_class
+from bpy_extras.io_utils import ExportHelper
+import numpy as np
+
+from .fdm import Profile, parse_fdm
+from .loadedcg import get_position
+from .markerindex import FIELD_PREFIX, SECTION_PROPERTY, find_import
+from .sources import get_source_stat, split_archive_path
+from .variants import VARIANTS_PROPERTY
+from .xmledit import MOVED_TOLERANCE, write_edits
+
+# Number of a marker's <location> in its section, in document order
+LOCATION_PROPERTY = 'jsbsim_location'
+# Root collection property keeping each section's coordinates in meters
+# by location number, as they were when the file was first exported. It
+# is dropped whenever the import's file is read again
+LOCATIONS_PROPERTY = 'jsbsim_locations'
+
+
+def get_markers(collection):
+    '''Return the (location number, object) of an import's markers by section.'''
+    markers = {}
+    for child in collection.children_recursive:
+        for obj in child.objects:
+            tag = obj.get(SECTION_PROPERTY)
+            number = obj.get(LOCATION_PROPERTY)
+            if tag is not None and number is not None:
+                markers.setdefault(tag, []).append((number, obj))
+    return markers
+
+
+def get_edits(markers, locations, unit_scale_length, names=None):
+    '''Return where the moved markers are, in meters, and how many are lost.
+
+    locations holds the coordinates of each section by location number,
+    compared with the markers a section at a time. With names, a marker is
+    also checked to still be the item at its location. A marker whose
+    location is gone or holds another item is lost, not written over it.
+    '''
+    edits = {}
+    lost = 0
+    for tag, tagged in markers.items():
+        coords = locations.get(tag, np.empty((0, 3)))
+        numbers = np.array([number for number, _ in tagged], dtype=np.int64)
+        positions = np.array(
+            [get_position(obj) for _, obj in tagged], dtype=np.float64
+        ).reshape(-1, 3) * unit_scale_length
+        found = numbers < len(coords)
+        found[found] = ~np.isnan(coords[numbers[found], 0])
+        offsets = np.abs(positions[found] - coords[numbers[found]]).max(axis=1)
+        lost += int((~found).sum())
+        for index in np.flatnonzero(found)[offsets > MOVED_TOLERANCE].tolist():
+            number = int(numbers[index])
+            if names is not None and (
+                tagged[index][1].get(f'{FIELD_PREFIX}name') != names[tag][number]
+            ):
+                lost += 1
+                continue
+            edits.setdefault(tag, {})[number] = tuple(positions[index])
+    return edits, lost
+
+
+def is_source_unchanged(collection):
+    '''Tell if the import's file is still the one its markers were read from.'''
+    try:
+        source_stat = get_source_stat(collection['jsbsim_source'])
+    except OSError:
+        return False
+    return source_stat == collection.get('jsbsim_stat')
+
+
+def get_stored_locations(collection, tags):
+    '''Return the locations stored by an earlier export, None if not all are.'''
+    stored = collection.get(LOCATIONS_PROPERTY)
+    if stored is None or not set(tags) <= set(stored.keys()):
+        return None
+    return {tag: np.array(stored[tag]).reshape(-1, 3) for tag in tags}
+
+
+def read_locations(source, tags):
+    '''Return the locations of the sections in tags and their item names.'''
+    locations = {}
+    names = {}
+    for tag, section in parse_fdm(source, tags).sections.items():
+        rows, locations[tag] = section.get_locations()
+        names[tag] = [section.items[row].name if row >= 0 else None for row in rows]
+    return locations, names
+
+
+def store_locations(collection, locations, edits):
+    '''Keep the locations of an import's file, with the edits written to it.
+
+    Later exports compare the markers with them instead of reading the
+    file again, as long as it is unchanged.
+    '''
+    if LOCATIONS_PROPERTY not in collection:
+        collection[LOCATIONS_PROPERTY] = {}
+    stored = collection[LOCATIONS_PROPERTY]
+    for tag, coords in locations.items():
+        moved = edits.get(tag)
+        if moved:
+            coords = coords.copy()
+            coords[list(moved)] = list(moved.values())
+        stored[tag] = coords.ravel().tolist()
+
+
+def get_default_filepath(source):
+    '''Return the file an import of source is exported to by default.
+
+    That is source itself for a plain XML file, so edits go back where they
+    came from. Gzipped files and archive members are exported next to them.
+    '''
+    archive, member = split_archive_path(source)
+    if member is not None:
+        source = os.path.join(os.path.dirname(archive), os.path.basename(member))
+    return source.removesuffix('.gz')
+
+
+class ExportJSBSim(Operator, ExportHelper):
+    bl_idname = 'export_scene.jsbsim'
+    bl_label = 'Export JSBSim'
+    bl_description = (
+        'Write the imported FDM back to XML, with the locations of the '
+        'markers moved in Blender'
+    )
+    bl_options = {'REGISTER'}
+
+    filename_ext = '.xml'
+    filter_glob: StringProperty(
+        default='*.xml',                    # noqa: F722
+        options={'HIDDEN'}                  # noqa: F821
+    )  # type: ignore
+
+    filepath = ''
+
+    target: StringProperty(
+        name='Import',                                                      # noqa: F821
+        description='Collection of the imported FDM to export, the only '   # noqa: F722
+                    'import in the file when empty'                         # noqa: F722
+    )  # type: ignore
+
+    def draw(self, _context):
+        layout = self.layout
+        layout.use_property_split = True
+        layout.prop_search(self, 'target', bpy.data, 'collections')
+
+    def invoke(self, context, event):
+        collection = find_import(self.target)
+        if collection is not None and 'jsbsim_source' in collection:
+            self.filepath = get_default_filepath(collection['jsbsim_source'])
+        return super().invoke(context, event)
+
+    def execute(self, context):
+        start = time.perf_counter()
+        collection = find_import(self.target)
+        if collection is None:
+            self.report({'ERROR'}, 'Pick the imported FDM to export')
+            return {'CANCELLED'}
+        if VARIANTS_PROPERTY in collection:
+            self.report(
+                {'ERROR'},
+                f'{collection.name} compares several files, import the one '
+                'to export on its own'
+            )
+            return {'CANCELLED'}
+        source = collection.get('jsbsim_source')
+        if source is None:
+            self.report({'ERROR'}, f'Import {collection.name} again to export it')
+            return {'CANCELLED'}
+        profile = Profile()
+        with profile.phase('markers'):
+            markers = get_markers(collection)
+            unchanged = is_source_unchanged(collection)
+            locations = get_stored_locations(collection, markers) if unchanged else None
+        parsed = locations is None
+        names = None
+        try:
+            if parsed:
+                with profile.phase('parse'):
+                    locations, names = read_locations(source, set(markers))
+                if unchanged:
+                    names = None  # the markers were read from this very file
+            with profile.phase('compare'):
+                edits, lost = get_edits(
+                    markers,
+                    locations,
+                    context.scene.unit_settings.scale_length,
+                    names
+                )
+            with profile.phase('write'):
+                editor = write_edits(source, self.filepath, edits)
+        except (OSError, ET.ParseError, ValueError) as error:
+            self.report({'ERROR'}, f'Could not export {collection.name}: {error}')
+            return {'CANCELLED'}
+        lost += len(editor.missing)
+        in_place = os.path.abspath(self.filepath) == source
+        if unchanged and (parsed or in_place):
+            store_locations(collection, locations, edits if in_place else {})
+            if in_place:
+                collection['jsbsim_stat'] = get_source_stat(source)
+        profile.add('total', (time.perf_counter() - start) * 1000)
+        if lost:
+            self.report(
+                {'WARNING'},
+                f'{lost} markers no longer match a location of {source}, '
+                'reload it to export them'
+            )
+        self.report(
+            {'INFO'},
+            f'Exported {collection.name} to {self.filepath}: '
+            f'{sum(map(len, edits.values()))} locations moved, '
+            f'{editor.changed} numbers rewritten in {profile.timings["total"]:.1f} ms '
+            f'({profile.summary()})'
+        )
+        return {'FINISHED'}
+
+
+def menu_func_export(self, _context):
+    self.layout.operator(
+        ExportJSBSim.bl_idname,
+        text='JSBSim Flight Dynamics Model (.xml)'
+    )
+
+
+def register():
+    register_class(ExportJSBSim)
+    TOPBAR_MT_file_export.append(menu_func_export)
+
+
+def unregister():
+    TOPBAR_MT_file_export.remove(menu_func_export)
+    unregister_class(ExportJSBSim)
@@ -0,0 +1,906 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from collections import namedtuple
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import json
+import math
+import os
+import time
+import xml.etree.ElementTree as ET
+import numpy as np
+
+from .aerodynamics import AERODYNAMICS, parse_aerodynamics
+from .sources import close_archives, open_source, stat_source
+from .xmlstream import SectionFilter
+
+
+class Profile:
+    '''Per-phase timings in milliseconds and counters of an import.
+
+    Phases that run more than once, like reading and parsing chunks of the
+    same file, add up.
+    '''
+    __slots__ = ('timings', 'counters')
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+
+    def add(self, phase, elapsed_ms):
+        self.timings[phase] = self.timings.get(phase, 0.0) + elapsed_ms
+
+    def count(self, counter, amount=1):
+        self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    @contextmanager
+    def phase(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, (time.perf_counter() - start) * 1000)
+
+    def merge(self, other):
+        for phase, elapsed_ms in other.timings.items():
+            self.add(phase, elapsed_ms)
+        for counter, amount in other.counters.items():
+            self.count(counter, amount)
+        return self
+
+    def as_dict(self):
+        return {'timings_ms': dict(self.timings), 'counters': dict(self.counters)}
+
+    def summary(self, limit=3):
+        '''Return the slowest phases as a short human readable string.'''
+        slowest = sorted(
+            (item for item in self.timings.items() if item[0] != 'total'),
+            key=lambda item: item[1],
+            reverse=True
+        )[:limit]
+        return ', '.join(
+            f'{phase} {elapsed_ms:.1f} ms' for phase, elapsed_ms in slowest
+        )
+
+
+def read_sections(source, tags, profile=None, unchanged=None):
+    '''Parse only the top-level sections in tags out of an FDM file.
+
+    Elements are only ever built for those sections, the rest of the
+    document never reaches the XML parser. Return the elements and a hash
+    of each section's bytes, both by tag. Sections whose hash matches the
+    one given in unchanged are hashed but not parsed.
+    '''
+    parser = ET.XMLParser()
+    read_s = parse_s = 0.0
+    with open_source(source) as stream:
+        section_filter = SectionFilter(stream, tags, unchanged=unchanged)
+        # Reading and filtering interleave with parsing, so both are
+        # accumulated chunk by chunk
+        start = time.perf_counter()
+        for chunk in section_filter:
+            fed = time.perf_counter()
+            parser.feed(chunk)
+            read_s += fed - start
+            start = time.perf_counter()
+            parse_s += start - fed
+        read_s += time.perf_counter() - start
+        bytes_read = stream.tell()
+    start = time.perf_counter()
+    sections = {}
+    for element in parser.close():
+        sections.setdefault(element.tag, element)
+    parse_s += time.perf_counter() - start
+    if profile is not None:
+        profile.add('read', read_s * 1000)
+        profile.add('xml_parse', parse_s * 1000)
+        profile.count('bytes_read', bytes_read)
+    return sections, section_filter.digests
+
+
+ParseResult = namedtuple(
+    'ParseResult',
+    ('filepath', 'fdm', 'elapsed_ms', 'error', 'cache_hit'),
+    defaults=(False,)
+)
+Component = namedtuple('Component', ('kind', 'name', 'diameter'))
+LENGTH_SCALES = {
+    'IN': 0.0254,
+    'FT': 0.3048,
+    'M': 1.0,
+}
+WEIGHT_SCALES = {
+    'LBS': 0.45359237,
+    'KG': 1.0,
+}
+ANGLE_SCALES = {
+    'RAD': 1.0,
+    'DEG': math.pi / 180,
+}
+# Where engine and thruster files are looked up, relative to the FDM
+COMPONENT_DIRECTORIES = ('Engines', 'engines', 'engine', '')
+
+
+def get_orient(element):
+    '''Return the (roll, pitch, yaw) of an <orient> child in radians.'''
+    orient = element.find('orient')
+    if orient is None:
+        return 0.0, 0.0, 0.0
+    unit = orient.get('unit', 'RAD')
+    if unit not in ANGLE_SCALES:
+        raise ValueError(f'Unsupported unit: {unit}')
+    scale = ANGLE_SCALES[unit]
+    return tuple(
+        float(orient.findtext(angle, '0')) * scale
+        for angle in ('roll', 'pitch', 'yaw')
+    )
+
+
+def get_weight(element):
+    '''Return the weight of an element in kilograms, None if not known.'''
+    if element is None:
+        return None
+    unit = element.get('unit', 'LBS')
+    if unit not in WEIGHT_SCALES:
+        print('JSBSim warning: Unsupported weight unit [', unit, ']')
+        return None
+    try:
+        return float(element.text) * WEIGHT_SCALES[unit]
+    except (TypeError, ValueError):
+        return None
+
+
+def get_length(element, default_unit='FT'):
+    '''Return the length of an element in meters, None if not known.'''
+    if element is None:
+        return None
+    unit = element.get('unit', default_unit)
+    if unit not in LENGTH_SCALES:
+        print('JSBSim warning: Unsupported length unit [', unit, ']')
+        return None
+    try:
+        return float(element.text) * LENGTH_SCALES[unit]
+    except (TypeError, ValueError):
+        print('JSBSim warning: Invalid length [', element.tag, element.text, ']')
+        return None
+
+
+def to_number(text, number_type=float):
+    '''Return text as a number_type, None if it isn't one.'''
+    try:
+        return number_type(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def orientation_euler(orient):
+    '''Return the YXZ Euler turning a marker's +Y axis onto the thrust axis.
+
+    X points aft in the structural frame, so no orientation means the
+    marker points forward along -X.
+    '''
+    roll, pitch, yaw = orient
+    return pitch, roll, math.pi / 2 - yaw
+
+
+class Item:
+    '''A plotted location of an FDM section, row indexes its Section.coords.'''
+    __slots__ = ('name', 'row')
+    mesh_type = 'SPHERE'
+    parent = None
+    rotation = None  # YXZ Euler, None keeps the default orientation
+    display_size = None  # in meters, None keeps the default size
+    weight_kg = None  # counted in the loaded CG when known
+    capacity_kg = None
+
+    def __init__(self, name):
+        self.name = name
+        self.row = -1
+
+    @property
+    def label(self):
+        return self.name
+
+    @property
+    def key(self):
+        '''Identify the item across edits of the values shown in its label.'''
+        return self.label
+
+    @property
+    def fields(self):
+        '''Return the item's typed values by field name, None when unknown.'''
+        return {'name': self.name}
+
+
+class EmptyWeight(Item):
+    '''The CG location, where the aircraft's empty weight applies.'''
+    __slots__ = ('weight_kg',)
+
+    def __init__(self, name, weight_kg):
+        super().__init__(name)
+        self.weight_kg = weight_kg
+
+
+class PointMass(Item):
+    __slots__ = ('location_name', 'weight', 'weight_unit', 'weight_kg')
+
+    def __init__(self, name, location_name, weight, weight_unit, weight_kg=None):
+        super().__init__(name)
+        self.location_name = location_name
+        self.weight = weight
+        self.weight_unit = weight_unit
+        self.weight_kg = weight_kg
+
+    @property
+    def label(self):
+        return (
+            f'{self.name} ({self.location_name} - '
+            f'{self.weight} {self.weight_unit})'
+        )
+
+    @property
+    def key(self):
+        return f'{self.name} ({self.location_name})'
+
+    @property
+    def fields(self):
+        return {
+            'name': self.name,
+            'location_name': self.location_name,
+            'weight': to_number(self.weight),
+            'weight_unit': self.weight_unit,
+        }
+
+
+class Contact(Item):
+    __slots__ = ('type',)
+
+    def __init__(self, name, contact_type):
+        super().__init__(name)
+        self.type = contact_type
+
+    @property
+    def label(self):
+        return f'{self.name} ({self.type})'
+
+    @property
+    def fields(self):
+        return {'name': self.name, 'type': self.type}
+
+
+class Force(Item):
+    __slots__ = ('frame',)
+
+    def __init__(self, name, frame):
+        super().__init__(name)
+        self.frame = frame
+
+    @property
+    def label(self):
+        return f'{self.name} ({self.frame})'
+
+    @property
+    def fields(self):
+        return {'name': self.name, 'frame': self.frame}
+
+
+class Engine(Item):
+    __slots__ = ('missing_location', 'orient', 'component')
+    mesh_type = 'CONE'
+
+    def __init__(self, name, orient, missing_location=False):
+        super().__init__(name)
+        self.missing_location = missing_location
+        self.orient = orient
+        self.component = None  # resolved engine file, if found
+
+    @property
+    def label(self):
+        if self.missing_location:
+            return f'ENGINE - {self.name} (missing location)'
+        return f'ENGINE - {self.name}'
+
+    @property
+    def rotation(self):
+        return orientation_euler(self.orient)
+
+    @property
+    def fields(self):
+        return {
+            'name': self.name,
+            'type': self.component.kind if self.component else None,
+        }
+
+
+class Thruster(Item):
+    __slots__ = ('parent', 'orient', 'component')
+
+    def __init__(self, name, parent, orient):
+        super().__init__(name)
+        self.parent = parent  # row of the engine driving this thruster
+        self.orient = orient
+        self.component = None  # resolved thruster file, if found
+
+    @property
+    def label(self):
+        return f'THRUSTER - {self.name}'
+
+    @property
+    def diameter(self):
+        return self.component.diameter if self.component else None
+
+    @property
+    def mesh_type(self):
+        # A known propeller is drawn as its disc, facing the thrust axis
+        return 'SPHERE' if self.diameter is None else 'CIRCLE'
+
+    @property
+    def rotation(self):
+        return None if self.diameter is None else orientation_euler(self.orient)
+
+    @property
+    def display_size(self):
+        return None if self.diameter is None else self.diameter / 2
+
+    @property
+    def fields(self):
+        return {
+            'name': self.name,
+            'type': self.component.kind if self.component else None,
+            'diameter': self.diameter,
+        }
+
+
+class Tank(Item):
+    __slots__ = (
+        'number', 'type', 'capacity', 'capacity_unit', 'capacity_kg', 'weight_kg'
+    )
+    mesh_type = 'CUBE'
+
+    def __init__(
+        self,
+        number,
+        tank_type,
+        capacity,
+        capacity_unit,
+        capacity_kg=None,
+        contents_kg=None
+    ):
+        super().__init__('TANK')
+        self.number = number
+        self.type = tank_type
+        self.capacity = capacity
+        self.capacity_unit = capacity_unit
+        self.capacity_kg = capacity_kg
+        self.weight_kg = contents_kg  # the fuel loaded, not the capacity
+
+    @property
+    def label(self):
+        return (
+            f'TANK ({self.number} - {self.type} - '
+            f'{self.capacity} {self.capacity_unit})'
+        )
+
+    @property
+    def key(self):
+        return f'TANK ({self.number})'
+
+    @property
+    def fields(self):
+        return {
+            'name': self.name,
+            'number': to_number(self.number, int),
+            'type': self.type,
+            'capacity': to_number(self.capacity),
+            'capacity_unit': self.capacity_unit,
+        }
+
+
+class Section:
+    '''The plotted items of one FDM section and their coordinates.
+
+    Coordinates are gathered as raw text while parsing, then converted to
+    meters in one vectorized pass into a contiguous (n, 3) float array.
+    sources numbers the <location> of each item, -1 for none.
+    '''
+    __slots__ = ('tag', 'items', 'coords', 'units', 'sources')
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.items = []
+        self.coords = []
+        self.units = []
+        self.sources = []  # the <location> elements until converted
+
+    def add(self, item, location=None):
+        '''Append item, placed at a <location> element or at the origin.'''
+        item.row = len(self.items)
+        if location is None:
+            self.coords.extend(('0', '0', '0'))
+            self.units.append('M')
+        else:
+            self.coords += (
+                location.find('x').text,
+                location.find('y').text,
+                location.find('z').text
+            )
+            self.units.append(location.get('unit'))
+        self.sources.append(location)
+        self.items.append(item)
+        return item
+
+    def get_keys(self):
+        '''Return a key per item, numbering repeats in document order.'''
+        seen = {}
+        keys = []
+        for item in self.items:
+            count = seen[item.key] = seen.get(item.key, 0) + 1
+            keys.append(item.key if count == 1 else f'{item.key} #{count}')
+        return keys
+
+    def get_weights(self):
+        '''Return the weight of every item in kilograms, NaN where unknown.'''
+        return np.array(
+            [
+                np.nan if item.weight_kg is None else item.weight_kg
+                for item in self.items
+            ],
+            dtype=np.float64
+        )
+
+    def convert(self, element):
+        '''Convert coordinates to meters, and number the locations of element.
+
+        Every <location> under element is numbered in document order, the
+        order an export finds them in again.
+        '''
+        numbers = {
+            location: number
+            for number, location in enumerate(element.iter('location'))
+        }
+        self.sources = np.array(
+            [numbers.get(location, -1) for location in self.sources], dtype=np.int64
+        )
+        units = np.array(self.units)
+        scales = np.empty(len(units))
+        for unit in set(self.units):
+            if unit not in LENGTH_SCALES:
+                raise ValueError(f'Unsupported unit: {unit}')
+            scales[units == unit] = LENGTH_SCALES[unit]
+        coords = np.array(self.coords, dtype=np.float64).reshape(-1, 3)
+        self.coords = coords * scales[:, np.newaxis]
+        return self
+
+    def get_locations(self):
+        '''Return the row and coordinates of each location number.
+
+        Numbers of locations without an item get row -1 and NaN coordinates.
+        '''
+        rows = np.full(np.max(self.sources, initial=-1) + 1, -1)
+        located = np.flatnonzero(self.sources >= 0)
+        rows[self.sources[located]] = located
+        coords = self.coords[rows]
+        coords[rows < 0] = np.nan
+        return rows, coords
+
+    @classmethod
+    def from_stored(cls, tag, items, coords, sources=None):
+        '''Rebuild a converted section from dump_items() and flat coords.'''
+        section = cls(tag)
+        section.items = load_items(items)
+        section.coords = np.array(coords, dtype=np.float64).reshape(-1, 3)
+        section.units = None
+        section.sources = np.array(
+            [-1] * len(section.items) if sources is None else sources,
+            dtype=np.int64
+        )
+        return section
+
+
+def get_slots(item_type):
+    return [
+        slot
+        for cls in reversed(item_type.__mro__)
+        for slot in cls.__dict__.get('__slots__', ())
+    ]
+
+
+# Item types a stored section may contain, see Section.dump_items()
+ITEM_TYPES = {
+    item_type.__name__: item_type
+    for item_type in (
+        Item, EmptyWeight, PointMass, Contact, Force, Engine, Thruster, Tank
+    )
+}
+
+
+def dump_items(items):
+    '''Return items as JSON, one [type name, *slot values] list per item.'''
+    return json.dumps([
+        [type(item).__name__, *(getattr(item, slot) for slot in get_slots(type(item)))]
+        for item in items
+    ])
+
+
+def load_items(text):
+    '''Rebuild the items of dump_items(), only ever as ITEM_TYPES.'''
+    items = []
+    for type_name, *values in json.loads(text):
+        item_type = ITEM_TYPES[type_name]
+        item = item_type.__new__(item_type)
+        for slot, value in zip(get_slots(item_type), values):
+            if isinstance(value, list):
+                # JSON turned the component and orient tuples into lists
+                value = Component(*value) if slot == 'component' else tuple(value)
+            setattr(item, slot, value)
+        items.append(item)
+    return items
+
+
+class FDM:
+    __slots__ = ('name', 'sections', 'digests', 'profile', 'tables')
+
+    def __init__(self, name, sections, digests=None, profile=None, tables=None):
+        self.name = name
+        self.sections = sections
+        self.digests = {} if digests is None else digests
+        self.profile = Profile() if profile is None else profile
+        self.tables = tables  # None when the aerodynamics weren't parsed
+
+
+def parse_metrics(metrics):
+    section = Section('metrics')
+    for location in metrics.findall('location'):
+        section.add(Item(location.get('name')), location)
+    return section
+
+
+def parse_mass_balance(mass_balances):
+    section = Section('mass_balance')
+    empty_weight = get_weight(mass_balances.find('emptywt'))
+    for location in mass_balances.findall('location'):
+        location_name = location.get('name')
+        if location_name == 'CG' and empty_weight is not None:
+            section.add(EmptyWeight(location_name, empty_weight), location)
+        else:
+            section.add(Item(location_name), location)
+    for pointmass in mass_balances.findall('pointmass'):
+        pointmass_name = pointmass.get('name')
+        weight = pointmass.find('weight')
+        weight_kg = get_weight(weight)
+        for location in pointmass.findall('location'):
+            section.add(
+                PointMass(
+                    pointmass_name,
+                    location.get('name'),
+                    weight.text.strip(),
+                    weight.get('unit'),
+                    weight_kg
+                ),
+                location
+            )
+    return section
+
+
+def parse_ground_reactions(ground_reactions):
+    section = Section('ground_reactions')
+    for contact in ground_reactions.findall('contact'):
+        contact_name = contact.get('name')
+        contact_type = contact.get('type')
+        for location in contact.findall('location'):
+            section.add(Contact(contact_name, contact_type), location)
+    return section
+
+
+def parse_external_reactions(external_reactions):
+    section = Section('external_reactions')
+    for force in external_reactions.findall('force'):
+        force_name = force.get('name')
+        force_frame = force.get('frame')
+        for location in force.findall('location'):
+            section.add(Force(force_name, force_frame), location)
+    return section
+
+
+def parse_propulsion(propulsions):
+    section = Section('propulsion')
+    # Engines
+    for engine in propulsions.findall('engine'):
+        engine_file = engine.get('file')
+        locations = engine.findall('location')
+        engine_row = None
+        engine_orient = get_orient(engine)
+        for location in locations:
+            engine_row = section.add(Engine(engine_file, engine_orient), location).row
+        if not locations:
+            engine_row = section.add(
+                Engine(engine_file, engine_orient, missing_location=True)
+            ).row
+        # Engine thrusters
+        thruster = engine.find('thruster')
+        for location in thruster.findall('location'):
+            section.add(
+                Thruster(thruster.get('file'), engine_row, get_orient(thruster)),
+                location
+            )
+    # Fuel tanks
+    for tank in propulsions.findall('tank'):
+        tank_type = tank.get('type')
+        tank_number = tank.get('number')
+        capacity = tank.find('capacity')
+        capacity_kg = get_weight(capacity)
+        contents_kg = get_weight(tank.find('contents'))
+        for location in tank.findall('location'):
+            section.add(
+                Tank(
+                    tank_number,
+                    tank_type,
+                    capacity.text.strip(),
+                    capacity.get('unit'),
+                    capacity_kg,
+                    contents_kg
+                ),
+                location
+            )
+    return section
+
+
+def get_loaded_cg(sections):
+    '''Return the loaded CG in meters and the total weight in kilograms.
+
+    The empty weight at the CG location, the point masses and the fuel in
+    the tanks are summed in one weighted pass. None without any weight.
+    '''
+    weighted = [
+        sections[tag] for tag in ('mass_balance', 'propulsion') if tag in sections
+    ]
+    if not weighted:
+        return None
+    weights = np.concatenate([section.get_weights() for section in weighted])
+    coords = np.concatenate([section.coords for section in weighted])
+    known = ~np.isnan(weights)
+    total = weights[known].sum()
+    if total <= 0.0:
+        return None
+    return weights[known] @ coords[known] / total, float(total)
+
+
+# Section tag -> (collection name, parser), in plotting order
+SECTIONS = {
+    'metrics': ('Metrics', parse_metrics),
+    'mass_balance': ('Mass Balance', parse_mass_balance),
+    'ground_reactions': ('Ground Reactions', parse_ground_reactions),
+    'external_reactions': ('External Reactions', parse_external_reactions),
+    'propulsion': ('Propulsion', parse_propulsion),
+}
+
+
+def get_parsed_tags(settings):
+    '''Return the top-level tags to parse for the include_* import settings.'''
+    return {
+        tag for tag in (*SECTIONS, AERODYNAMICS) if settings.get(f'include_{tag}')
+    }
+
+
+def parse_fdm(filepath, tags, unchanged=None):
+    '''Parse the sections in tags of an FDM file into an FDM model.
+
+    Locations are converted to meters. Nothing here depends on bpy, so this
+    can run in a worker process, be cached or be benchmarked on its own.
+    Sections still matching their digest in unchanged are left out of the
+    model, but digests holds every section found.
+    '''
+    profile = Profile()
+    elements, digests = read_sections(filepath, tags, profile, unchanged)
+    sections = {}
+    for tag, (_, parser) in SECTIONS.items():
+        if tag not in elements:
+            continue
+        with profile.phase(f'parse_{tag}'):
+            section = parser(elements[tag])
+        with profile.phase('convert'):
+            sections[tag] = section.convert(elements[tag])
+        profile.count('items', len(section.items))
+    tables = None
+    if AERODYNAMICS in elements:
+        with profile.phase('parse_aerodynamics'):
+            tables = parse_aerodynamics(elements[AERODYNAMICS])
+        profile.count('tables', len(tables))
+    return FDM(
+        os.path.basename(filepath).split('.xml')[0],
+        sections,
+        digests,
+        profile,
+        tables
+    )
+
+
+@lru_cache(maxsize=256)
+def read_component(filepath, mtime_ns, size):
+    '''Parse an engine or thruster file, cached for the whole process.
+
+    mtime_ns and size are only part of the cache key, so an edited file is
+    parsed again.
+    '''
+    del mtime_ns, size
+    try:
+        with open_source(filepath) as stream:
+            root = ET.parse(stream).getroot()
+    except ET.ParseError as error:
+        print('JSBSim warning: Unreadable component [', filepath, error, ']')
+        return None
+    # A missing or unreadable diameter falls back to a sphere marker
+    diameter = get_length(root.find('diameter'))
+    return Component(root.tag, root.get('name'), diameter)
+
+
+def find_component(directory, file):
+    '''Find and read the engine or thruster file named file, or None.'''
+    for subdirectory in COMPONENT_DIRECTORIES:
+        filepath = os.path.join(directory, subdirectory, f'{file}.xml')
+        try:
+            mtime_ns, size = stat_source(filepath)
+        except OSError:
+            continue
+        return read_component(filepath, mtime_ns, size)
+    print('JSBSim warning: Missing component file [', file, ']')
+    return None
+
+
+def resolve_components(fdm, filepath):
+    '''Attach the engine and thruster files referenced by fdm, if found.
+
+    This runs after the parse cache, so edited component files are always
+    picked up, and in the importing process, so each one is read only once.
+    '''
+    propulsion = fdm.sections.get('propulsion')
+    if propulsion is None:
+        return fdm
+    start = time.perf_counter()
+    directory = os.path.dirname(filepath)
+    components = {}
+    for item in propulsion.items:
+        if isinstance(item, (Engine, Thruster)) and item.name:
+            if item.name not in components:
+                components[item.name] = find_component(directory, item.name)
+            item.component = components[item.name]
+    fdm.profile.add('components', (time.perf_counter() - start) * 1000)
+    return fdm
+
+
+def store_in_cache(cache, filepath, tags, fdm):
+    '''Store a parsed FDM, only warning if the cache can't be written.'''
+    with fdm.profile.phase('cache_store'):
+        try:
+            cache.store(filepath, tags, fdm)
+        except OSError as error:
+            print('JSBSim warning: Parse cache not written [', error, ']')
+
+
+def load_fdm(filepath, tags, cache=None):
+    '''Return (fdm, cache_hit), only parsing filepath on a cache miss.'''
+    if cache is not None:
+        start = time.perf_counter()
+        try:
+            fdm = cache.load(filepath, tags)
+        except OSError:
+            fdm = None  # reported when parsing, if the file is the cause
+        if fdm is not None:
+            # Timings of the original parse don't describe this import
+            fdm.profile = Profile()
+            fdm.profile.add('cache_load', (time.perf_counter() - start) * 1000)
+            return resolve_components(fdm, filepath), True
+    fdm = parse_fdm(filepath, tags)
+    if cache is not None:
+        store_in_cache(cache, filepath, tags, fdm)
+    return resolve_components(fdm, filepath), False
+
+
+def timed_parse_fdm(filepath, tags):
+    start = time.perf_counter()
+    fdm = parse_fdm(filepath, tags)
+    return ParseResult(filepath, fdm, (time.perf_counter() - start) * 1000, None)
+
+
+def parse_fdm_files(filepaths, tags, cache=None, max_workers=None):
+    '''Parse FDM files in a process pool, yielding a ParseResult per file.
+
+    Results are yielded in the order of filepaths. Files found in cache are
+    not sent to the pool, and a file that fails to parse yields its error
+    instead of aborting the rest.
+    '''
+    # The cache index is written once, at the end of the batch
+    with nullcontext() if cache is None else cache.deferred_index():
+        cached = {}
+        if cache is not None:
+            for filepath in filepaths:
+                start = time.perf_counter()
+                try:
+                    fdm = cache.load(filepath, tags)
+                except OSError:
+                    continue  # reported when parsing
+                if fdm is not None:
+                    fdm.profile = Profile()
+                    fdm.profile.add('cache_load', (time.perf_counter() - start) * 1000)
+                    cached[filepath] = ParseResult(
+                        filepath,
+                        fdm,
+                        (time.perf_counter() - start) * 1000,
+                        None,
+                        cache_hit=True
+                    )
+        parsed = parse_in_pool(
+            [filepath for filepath in filepaths if filepath not in cached],
+            tags,
+            max_workers
+        )
+        for filepath in filepaths:
+            result = cached.get(filepath) or next(parsed, None)
+            if result.error is None:
+                if cache is not None and not result.cache_hit:
+                    store_in_cache(cache, filepath, tags, result.fdm)
+                resolve_components(result.fdm, filepath)
+            yield result
+
+
+def parse_in_pool(filepaths, tags, max_workers=None):
+    '''Yield a ParseResult per file, parsed by worker processes.
+
+    If worker processes can't be used, the remaining files are parsed in
+    this process.
+    '''
+    def parse_here(filepath):
+        try:
+            return timed_parse_fdm(filepath, tags)
+        except Exception as error:  # pylint: disable=broad-exception-caught
+            return ParseResult(filepath, None, 0.0, error)
+
+    if not filepaths:
+        return
+    try:
+        # Forked workers inherit the open archives, whose file offset they
+        # would all share: each worker opens its own instead
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=close_archives
+        )
+    except (OSError, NotImplementedError) as error:
+        print('JSBSim warning: Parsing in this process [', error, ']')
+        yield from map(parse_here, filepaths)
+        return
+    with executor:
+        futures = [
+            executor.submit(timed_parse_fdm, filepath, tags)
+            for filepath in filepaths
+        ]
+        try:
+            for index, (filepath, future) in enumerate(zip(filepaths, futures)):
+                try:
+                    yield future.result()
+                except BrokenProcessPool as error:
+                    print('JSBSim warning: Parsing in this process [', error, ']')
+                    yield from map(parse_here, filepaths[index:])
+                    return
+                except Exception as error:  # pylint: disable=broad-exception-caught
+                    yield ParseResult(filepath, None, 0.0, error)
+        finally:
+            # Closed early, e.g. a cancelled import: don't parse the rest
+            for future in futures:
+                future.cancel()
@@ -0,0 +1,339 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import math
+import time
+import bpy
+from bpy.props import BoolProperty, FloatProperty, StringProperty
+from bpy.types import Operator, TOPBAR_MT_file_import
+from bpy.utils import register_class, unregister_class
+from bpy_extras.io_utils import ImportHelper
+from mathutils import Matrix, Vector
+import numpy as np
+
+from .fdm import Profile
+from .loadedcg import FLIGHT_PROPERTY, MARKER_PROPERTY
+from .markerindex import find_import
+from .telemetry import (
+    attitude_to_world,
+    decimate,
+    geodetic_to_local,
+    get_angles,
+    get_lengths,
+    read_columns
+)
+
+# Location of the flight empty's origin in the import, the loaded CG
+PIVOT_PROPERTY = 'jsbsim_pivot'
+# Keyframe.interpolation as the number foreach_set takes
+LINEAR_INTERPOLATION = 1
+
+
+def get_flight(collection):
+    '''Return the empty a flight log animates an import with, or None.'''
+    return next(
+        (obj for obj in collection.objects if obj.get(FLIGHT_PROPERTY)), None
+    )
+
+
+def attach_to_flight(collection):
+    '''Parent the objects of an import that have no parent to its flight.
+
+    They keep their location in the import, relative to the pivot.
+    '''
+    flight = get_flight(collection)
+    if flight is None:
+        return
+    parent_inverse = Matrix.Translation(-Vector(flight[PIVOT_PROPERTY]))
+    for child in (collection, *collection.children_recursive):
+        for obj in child.objects:
+            if obj.parent is None and obj != flight:
+                obj.parent = flight
+                obj.matrix_parent_inverse = parent_inverse
+
+
+def new_flight(collection):
+    '''Add the empty carrying an import, pivoting on its loaded CG.
+
+    JSBSim logs where the CG is, so the import is moved by its CG.
+    '''
+    marker = next(
+        (obj for obj in collection.objects if obj.get(MARKER_PROPERTY)), None
+    )
+    unique_id = collection.get('jsbsim_id', collection.name.removeprefix('JSBSim - '))
+    flight = bpy.data.objects.new(f'FLIGHT - {unique_id}', None)
+    flight.empty_display_type = 'ARROWS'
+    flight.rotation_mode = 'QUATERNION'
+    flight[FLIGHT_PROPERTY] = True
+    flight[PIVOT_PROPERTY] = list(marker.location) if marker else [0.0, 0.0, 0.0]
+    collection.objects.link(flight)
+    attach_to_flight(collection)
+    return flight
+
+
+def is_partial(columns):
+    return any(columns) and not all(columns)
+
+
+def set_keyframes(action, data_path, frames, values):
+    '''Replace the fcurves of data_path by a linear keyframe per row of values.
+
+    Keyframes are added and filled in bulk, never one by one.
+    '''
+    for index in range(values.shape[1]):
+        fcurve = action.fcurves.find(data_path, index=index)
+        if fcurve is not None:
+            action.fcurves.remove(fcurve)
+        fcurve = action.fcurves.new(
+            data_path, index=index, action_group='Object Transforms'
+        )
+        keyframe_points = fcurve.keyframe_points
+        keyframe_points.add(len(frames))
+        coordinates = np.empty((len(frames), 2), dtype=np.float32)
+        coordinates[:, 0] = frames
+        coordinates[:, 1] = values[:, index]
+        keyframe_points.foreach_set('co', coordinates.ravel())
+        keyframe_points.foreach_set(
+            'interpolation', np.full(len(frames), LINEAR_INTERPOLATION, np.int32)
+        )
+        fcurve.update()
+    return len(frames) * values.shape[1]
+
+
+class ImportFlightLog(Operator, ImportHelper):
+    bl_idname = 'import_anim.jsbsim_flight_log'
+    bl_label = 'Import JSBSim Flight Log'
+    bl_description = 'Animate an imported FDM with a JSBSim CSV output log'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filename_ext = '.csv'
+    filter_glob: StringProperty(
+        default='*.csv;*.txt',              # noqa: F722
+        options={'HIDDEN'}                  # noqa: F821
+    )  # type: ignore
+
+    target: StringProperty(
+        name='Import',                                                      # noqa: F821
+        description='Collection of the imported FDM to animate, the only '  # noqa: F722
+                    'import in the file when empty'                         # noqa: F722
+    )  # type: ignore
+
+    time_column: StringProperty(
+        name='Time',                                            # noqa: F821
+        description='Column of the simulation time in seconds',  # noqa: F722
+        default='Time'                                          # noqa: F821
+    )  # type: ignore
+
+    latitude_column: StringProperty(
+        name='Latitude',                                                    # noqa: F821
+        description='Column of the geodetic latitude. Leave the position '  # noqa: F722
+                    'columns empty to only animate the attitude',           # noqa: F722
+        default='Latitude Geod (deg)'                                       # noqa: F722
+    )  # type: ignore
+
+    longitude_column: StringProperty(
+        name='Longitude',                                       # noqa: F821
+        description='Column of the longitude',                  # noqa: F722
+        default='Longitude (deg)'                               # noqa: F821
+    )  # type: ignore
+
+    altitude_column: StringProperty(
+        name='Altitude',                                        # noqa: F821
+        description='Column of the altitude above sea level',   # noqa: F722
+        default='Altitude ASL (ft)'                             # noqa: F722
+    )  # type: ignore
+
+    roll_column: StringProperty(
+        name='Roll',                                                        # noqa: F821
+        description='Column of the roll angle. Leave the attitude '         # noqa: F722
+                    'columns empty to only animate the position',           # noqa: F722
+        default='Phi (deg)'                                                 # noqa: F821
+    )  # type: ignore
+
+    pitch_column: StringProperty(
+        name='Pitch',                                           # noqa: F821
+        description='Column of the pitch angle',                # noqa: F722
+        default='Theta (deg)'                                   # noqa: F821
+    )  # type: ignore
+
+    yaw_column: StringProperty(
+        name='Yaw',                                             # noqa: F821
+        description='Column of the heading',                    # noqa: F722
+        default='Psi (deg)'                                     # noqa: F821
+    )  # type: ignore
+
+    use_decimate: BoolProperty(
+        name='Decimate',                                                    # noqa: F821
+        description='Only keep the keyframes needed to follow the log '     # noqa: F722
+                    'within the tolerances below',                          # noqa: F722
+        default=True
+    )  # type: ignore
+
+    location_tolerance: FloatProperty(
+        name='Location',                                                    # noqa: F821
+        description='Largest distance in meters the animation may be off',  # noqa: F722
+        default=0.01,
+        min=0.0,
+        precision=3
+    )  # type: ignore
+
+    rotation_tolerance: FloatProperty(
+        name='Rotation',                                                    # noqa: F821
+        description='Largest angle in degrees the animation may be off',    # noqa: F722
+        default=0.1,
+        min=0.0,
+        precision=3
+    )  # type: ignore
+
+    def draw(self, _context):
+        layout = self.layout
+        layout.use_property_split = True
+        layout.prop_search(self, 'target', bpy.data, 'collections')
+        panels = [
+            (
+                'JSBSim_flight_log_columns',
+                'Columns',
+                [
+                    'time_column',
+                    'latitude_column',
+                    'longitude_column',
+                    'altitude_column',
+                    'roll_column',
+                    'pitch_column',
+                    'yaw_column'
+                ]
+            ),
+            (
+                'JSBSim_flight_log_decimate',
+                'Decimation',
+                ['use_decimate', 'location_tolerance', 'rotation_tolerance']
+            )
+        ]
+        for panel_id, label, props in panels:
+            header, body = layout.panel(panel_id, default_closed=False)
+            header.label(text=label)
+            if body:
+                for prop in props:
+                    body.prop(self, prop)
+
+    def execute(self, context):
+        start = time.perf_counter()
+        collection = find_import(self.target)
+        if collection is None:
+            self.report({'ERROR'}, 'Pick the imported FDM to animate')
+            return {'CANCELLED'}
+        position_columns = [
+            self.latitude_column, self.longitude_column, self.altitude_column
+        ]
+        attitude_columns = [self.roll_column, self.pitch_column, self.yaw_column]
+        if is_partial(position_columns) or is_partial(attitude_columns):
+            self.report({'ERROR'}, 'Give all three columns of a group, or none')
+            return {'CANCELLED'}
+        if not any(position_columns + attitude_columns):
+            self.report({'ERROR'}, 'Give the position or attitude columns')
+            return {'CANCELLED'}
+        columns = [
+            self.time_column,
+            *(column for column in position_columns if column),
+            *(column for column in attitude_columns if column)
+        ]
+        profile = Profile()
+        try:
+            with profile.phase('read'):
+                data = read_columns(self.filepath, columns)
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, f'Could not read {self.filepath}: {error}')
+            return {'CANCELLED'}
+        if not data.size:
+            self.report({'ERROR'}, f'No rows in {self.filepath}')
+            return {'CANCELLED'}
+        keyframes = self.animate(context.scene, collection, data, profile)
+        profile.add('total', (time.perf_counter() - start) * 1000)
+        self.report(
+            {'INFO'},
+            f'Animated {get_flight(collection).name}: {len(data)} rows, '
+            f'{keyframes} keyframes in {profile.timings["total"]:.1f} ms '
+            f'({profile.summary()})'
+        )
+        return {'FINISHED'}
+
+    def animate(self, scene, collection, data, profile):
+        '''Keyframe the import's flight empty, return the keyframe count.'''
+        times = data[:, 0]
+        fps = scene.render.fps / scene.render.fps_base
+        unit_scale_length = scene.unit_settings.scale_length
+        flight = get_flight(collection) or new_flight(collection)
+        animation_data = flight.animation_data_create()
+        if animation_data.action is None:
+            animation_data.action = bpy.data.actions.new(f'{flight.name} Action')
+        paths = []
+        column = 1
+        if self.latitude_column:
+            with profile.phase('convert'):
+                latitude, longitude = get_angles(
+                    data[:, 1:3], [self.latitude_column, self.longitude_column]
+                ).T
+                altitude = get_lengths(data[:, 3], [self.altitude_column])
+                locations = geodetic_to_local(latitude, longitude, altitude)
+            paths.append((
+                'location',
+                locations / unit_scale_length,
+                self.location_tolerance / unit_scale_length
+            ))
+            column = 4
+        if self.roll_column:
+            with profile.phase('convert'):
+                attitude = get_angles(
+                    data[:, column:column + 3],
+                    [self.roll_column, self.pitch_column, self.yaw_column]
+                )
+                quaternions = attitude_to_world(*attitude.T)
+            # A quaternion component is off by about half the angle
+            tolerance = math.radians(self.rotation_tolerance) / 2
+            paths.append(('rotation_quaternion', quaternions, tolerance))
+        keyframes = 0
+        for data_path, values, tolerance in paths:
+            with profile.phase('decimate'):
+                kept = decimate(times, values, tolerance if self.use_decimate else 0.0)
+            frames = scene.frame_start + (times[kept] - times[0]) * fps
+            with profile.phase('keyframes'):
+                keyframes += set_keyframes(
+                    animation_data.action, data_path, frames, values[kept]
+                )
+        scene.frame_end = max(
+            scene.frame_end,
+            math.ceil(scene.frame_start + (times[-1] - times[0]) * fps)
+        )
+        return keyframes
+
+
+def menu_func_import(self, _context):
+    self.layout.operator(
+        ImportFlightLog.bl_idname,
+        text='JSBSim Flight Log (.csv)'
+    )
+
+
+def register():
+    register_class(ImportFlightLog)
+    TOPBAR_MT_file_import.append(menu_func_import)
+
+
+def unregister():
+    TOPBAR_MT_file_import.remove(menu_func_import)
+    unregister_class(ImportFlightLog)
@@ -0,0 +1,45 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+
+
+def get_handlers(on_depsgraph_update, on_file_change):
+    '''Pair each handler list with the callback it gets.
+
+    on_file_change runs when a file is loaded and on undo and redo, when
+    session data held on to may no longer match bpy.data.
+    '''
+    return (
+        (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+        (bpy.app.handlers.load_post, on_file_change),
+        (bpy.app.handlers.undo_post, on_file_change),
+        (bpy.app.handlers.redo_post, on_file_change),
+    )
+
+
+def add_handlers(handlers):
+    for handler_list, handler in handlers:
+        if handler not in handler_list:
+            handler_list.append(handler)
+
+
+def remove_handlers(handlers):
+    for handler_list, handler in handlers:
+        if handler in handler_list:
+            handler_list.remove(handler)
@@ -17,12 +17,82 @@
 # ##### END GPL LICENSE BLOCK #####
 
 from os import path
+import re
 import time
-import xml.etree.ElementTree as ET
 import bpy
+from mathutils import Vector
 
+from .aerodynamics import AERODYNAMICS
+from .sources import get_source_stat
+from .export import LOCATION_PROPERTY, LOCATIONS_PROPERTY
+from .flightlog import attach_to_flight
+from .fdm import (
+    SECTIONS,
+    Profile,
+    Section,
+    dump_items,
+    get_loaded_cg,
+    get_parsed_tags,
+    load_fdm
+)
+from .loadedcg import (
+    CAPACITY_PROPERTY,
+    MARKER_PROPERTY,
+    TOTAL_WEIGHT_PROPERTY,
+    WEIGHT_PROPERTY
+)
+from .markerindex import FIELD_PREFIX, SECTION_PROPERTY
+from . import markerindex
+from .pointcloud import new_point_cloud, new_point_cloud_mesh, set_strings
+from .tableobjects import get_table_corners, new_table_object
+from .validation import ISSUE_PROPERTY, find_issues
+
+# Sections with more locations are drawn as point clouds in 'AUTO' mode
+POINT_CLOUD_THRESHOLD = 1000
+# Locations plotted between two progress updates of a stepped import
+PLOT_STEP = 64
+# Root collection property keeping the sections not plotted until shown
+LAZY_PROPERTY = 'jsbsim_lazy_sections'
+TABLES_COLLECTION = 'Aerodynamics'
+SETTINGS = (
+    'plot_scale',
+    'plot_names',
+    'plot_axes',
+    'thrs_auto_parent',
+    'include_metrics',
+    'include_mass_balance',
+    'include_ground_reactions',
+    'include_external_reactions',
+    'include_propulsion',
+    'include_aerodynamics',
+    'display_mode',
+)
+
+
+def load_stored_section(collection, tag):
+    '''Rebuild a section stored on an import's root collection.'''
+    stored = collection[LAZY_PROPERTY][tag]
+    return Section.from_stored(
+        tag, stored['items'], stored['coords'], stored.get('sources')
+    )
+
+
+def find_layer_collection(layer_collection, collection):
+    '''Return the layer collection of collection under layer_collection.'''
+    if layer_collection.collection == collection:
+        return layer_collection
+    for child in layer_collection.children:
+        found = find_layer_collection(child, collection)
+        if found is not None:
+            return found
+    return None
+
+
+# Each step of an import is a method of its own, which live reloads,
+# expanded sections and comparisons override to change just that step
+class JSBSim:  # pylint: disable=too-many-public-methods
+    action = 'Imported'
 
-class JSBSim:
     def __init__(
         self,
         filepath,
@@ -34,7 +104,17 @@ class JSBSim:
         include_mass_balance,
         include_ground_reactions,
         include_external_reactions,
-        include_propulsion
+        include_propulsion,
+        display_mode='AUTO',
+        include_aerodynamics=False,
+        live_reload=False,
+        fast_import=False,
+        lazy_sections=False,
+        validate=False,
+        validate_tolerance=0.001,
+        fdm=None,
+        cache=None,
+        deferred=False
     ):
         self.filepath = filepath
         self.filename = path.basename(filepath).split('.xml')[0]
@@ -48,41 +128,314 @@ class JSBSim:
         self.include_ground_reactions = include_ground_reactions
         self.include_external_reactions = include_external_reactions
         self.include_propulsion = include_propulsion
+        self.include_aerodynamics = include_aerodynamics
+        self.display_mode = display_mode
+        self.live_reload = live_reload
+        self.fast_import = fast_import
+        self.lazy_sections = lazy_sections
+        self.validate = validate
+        self.validate_tolerance = validate_tolerance
+        self.issues = {}  # by (tag, row), when validating
+        self.pending_objects = {}
+        self.lazy_collections = []  # hidden once the root is in the scene
+        self.collections = {}
         # Parse, display and benchmark
-        self.root = ET.parse(filepath).getroot()
-        self.unique_id, self.collection = self.get_root_collection_and_id()
-        (
-            self.unit_system,
-            self.unit_scale_length,
-            self.unit_rotation_mode,
-        ) = self.get_unit_system()
+        self.profile = Profile()
+        self.elapsed_start = time.perf_counter()
+        self.cache_hit = None  # None when no parse cache was consulted
+        self.source_stat = self.read_source_stat()
+        if fdm is None:
+            fdm, self.cache_hit = load_fdm(filepath, self.get_included_tags(), cache)
+            if cache is None:
+                self.cache_hit = None
+        self.profile.merge(fdm.profile)
+        self.fdm = fdm
+        with self.profile.phase('setup'):
+            self.unique_id, self.collection = self.get_root_collection_and_id()
+            (
+                self.unit_system,
+                self.unit_scale_length,
+                self.unit_rotation_mode,
+            ) = self.get_unit_system()
         self.elapsed_start_import = time.perf_counter()
+        self.import_ok = False
+        if deferred:
+            return  # the caller drives plot_steps() and finish_import()
         self.begin_parsing()
+        self.finish_import()
+
+    def finish_import(self):
         self.elapsed_finish_import = time.perf_counter()
         self.elapsed_import_ms = (
             self.elapsed_finish_import - self.elapsed_start_import
         ) * 1000
+        self.profile.add(
+            'total', (self.elapsed_finish_import - self.elapsed_start) * 1000
+        )
+        self.store_profile()
+        markerindex.forget(self.collection)  # its markers may have changed
+        attach_to_flight(self.collection)  # new objects fly along too
+        self.store_source()
+        if self.live_reload or LAZY_PROPERTY in self.collection:
+            self.store_settings()
+        if self.live_reload:
+            self.store_live_reload(self.fdm.digests)
+        cache_status = ''
+        if self.cache_hit is not None:
+            cache_status = f' (parse cache {"hit" if self.cache_hit else "miss"})'
         print(
-            f'Imported JSBSim FDM from file: {filepath} '
-            f'in {self.elapsed_import_ms:.3f} ms'
+            f'{self.action} JSBSim FDM from file: {self.filepath} '
+            f'in {self.elapsed_import_ms:.3f} ms{cache_status}'
         )
+        self.fdm = None  # drop the parsed model once plotted
         self.import_ok = True
 
-    def plot(self, name, position, collection_name, mesh_type='SPHERE'):
-        bpy.ops.object.empty_add(type=mesh_type, location=position)
-        active_object = bpy.context.active_object
-        active_object.name = f'{name} - {self.unique_id}'
-        active_object.scale = (self.plot_scale, self.plot_scale, self.plot_scale)
-        active_object.show_name = self.plot_names
-        active_object.show_axis = self.plot_axes
-        # cone must be pointing forward. later it could point to the
-        # actual orientation of the engine
-        if mesh_type == 'CONE':
-            active_object.rotation_euler = (0, 0, 1.5707963267948966)
-        active_object.users_collection[0].objects.unlink(active_object)
+    def remove(self):
+        '''Remove everything this import created, e.g. when it is cancelled.'''
+        for objects in self.pending_objects.values():
+            self.remove_objects(objects)
+        self.pending_objects.clear()
+        for collection in self.collections.values():
+            self.remove_objects(collection.objects)
+        self.remove_objects(self.collection.objects)
+        bpy.data.batch_remove([*self.collections.values(), self.collection])
+        self.collections.clear()
+
+    def store_profile(self):
+        # Kept in the .blend, so a slow import can be looked into later
+        self.collection['jsbsim_profile'] = self.profile.as_dict()
+
+    def read_source_stat(self):
+        # Taken before reading, so a write while importing isn't missed
+        return get_source_stat(self.filepath)
+
+    def store_source(self):
+        '''Keep where the file is, and its stat when it was read.
+
+        An export streams the file again, and knows from the stat whether
+        the markers still match it.
+        '''
+        self.collection['jsbsim_source'] = path.abspath(self.filepath)
+        if self.collection.get('jsbsim_stat') != self.source_stat:
+            # Stored by an export of the file as it was before
+            self.collection.pop(LOCATIONS_PROPERTY, None)
+        self.collection['jsbsim_stat'] = self.source_stat
+
+    def store_settings(self):
+        # What later reloads and expanded sections are plotted with
+        self.collection['jsbsim_id'] = self.unique_id
+        self.collection['jsbsim_settings'] = {
+            name: getattr(self, name) for name in SETTINGS
+        }
+
+    def store_live_reload(self, digests):
+        # Kept in the .blend too, so watching resumes when it is reopened
+        self.collection['jsbsim_live_reload'] = True
+        self.collection['jsbsim_digests'] = digests
+
+    def get_summary(self):
+        timings = self.profile.timings
+        counters = self.profile.counters
+        return (
+            f'{self.action} {self.filename}: {counters.get("objects", 0)} objects, '
+            f'{counters.get("collections", 0)} collections '
+            f'in {timings["total"]:.1f} ms ({self.profile.summary()})'
+        )
+
+    def get_included_tags(self):
+        return get_parsed_tags({name: getattr(self, name) for name in SETTINGS})
+
+    def get_plotted_tags(self):
+        return self.get_included_tags()
+
+    def find_issues(self, sections):
+        '''Return the duplicate and outlier locations of sections.'''
+        issues = find_issues(sections, self.validate_tolerance)
+        for issue in issues.values():
+            print('JSBSim warning:', self.filename, issue.label, '-', issue.text)
+        return issues
+
+    def get_issues(self, tag):
+        '''Return the issues of a section by row.'''
+        return {
+            row: issue for (issue_tag, row), issue in self.issues.items()
+            if issue_tag == tag
+        }
+
+    def is_lazy(self, _tag):
+        '''Tell if a section is stored rather than plotted, until shown.'''
+        return self.lazy_sections
+
+    def store_section(self, section, collection_name):
+        '''Keep a section on the root collection, to be plotted once shown.
+
+        Its collection is created empty and hidden, see lazysections.py.
+        '''
+        with self.profile.phase('store_sections'):
+            if LAZY_PROPERTY not in self.collection:
+                self.collection[LAZY_PROPERTY] = {}
+            stored = {
+                'items': dump_items(section.items),
+                'coords': section.coords.ravel().tolist(),
+                'sources': section.sources.tolist(),
+            }
+            if self.validate:
+                stored['issues'] = {
+                    str(row): issue.text
+                    for row, issue in self.get_issues(section.tag).items()
+                }
+            self.collection[LAZY_PROPERTY][section.tag] = stored
         collection = self.get_collection(collection_name)
-        collection.objects.link(active_object)
-        return active_object
+        self.remove_objects(collection.objects)
+        self.lazy_collections.append(collection)
+        self.profile.count('stored', len(section.items))
+
+    def unstore_section(self, tag):
+        stored = self.collection.get(LAZY_PROPERTY)
+        if stored is not None and tag in stored:
+            del stored[tag]
+            if not stored:
+                del self.collection[LAZY_PROPERTY]
+
+    def hide_lazy_collections(self):
+        view_layer = bpy.context.view_layer
+        for collection in self.lazy_collections:
+            layer_collection = find_layer_collection(
+                view_layer.layer_collection, collection
+            )
+            if layer_collection is not None:
+                layer_collection.hide_viewport = True
+        self.lazy_collections.clear()
+
+    def use_point_cloud(self, section):
+        return self.display_mode == 'POINT_CLOUD' or (
+            self.display_mode == 'AUTO'
+            and len(section.items) > POINT_CLOUD_THRESHOLD
+        )
+
+    def plot(
+        self,
+        name,
+        position,
+        collection_name,
+        mesh_type='SPHERE',
+        rotation=None,
+        display_size=None,
+        key=None
+    ):
+        # Objects are created straight in bpy.data, bypassing the operator,
+        # and queued so each section is linked to its collection in one pass
+        plotted_object = bpy.data.objects.new(f'{name} - {self.unique_id}', None)
+        plotted_object.scale = (self.plot_scale, self.plot_scale, self.plot_scale)
+        plotted_object.show_name = self.plot_names
+        plotted_object.show_axis = self.plot_axes
+        self.place(plotted_object, position, mesh_type, rotation, display_size)
+        if key is not None:
+            plotted_object['jsbsim_key'] = key
+        self.pending_objects.setdefault(collection_name, []).append(plotted_object)
+        return plotted_object
+
+    def place(self, plotted_object, position, mesh_type, rotation, display_size):
+        plotted_object.empty_display_type = mesh_type
+        plotted_object.location = position
+        if rotation is not None:
+            plotted_object.rotation_mode = 'YXZ'
+            plotted_object.rotation_euler = rotation
+        if display_size is not None:
+            # True size in scene units, regardless of the plot scale
+            plotted_object.empty_display_size = (
+                display_size / self.unit_scale_length / self.plot_scale
+            )
+
+    def update_object(self, plotted_object, item, position):
+        name = f'{item.label} - {self.unique_id}'
+        if plotted_object.name != name:
+            plotted_object.name = name
+        if self.is_placed(plotted_object, item, position):
+            return  # untouched, skip the writes and depsgraph updates
+        plotted_object.parent = None  # parented again once placed
+        plotted_object.rotation_euler = (0.0, 0.0, 0.0)
+        plotted_object.empty_display_size = 1.0
+        self.place(
+            plotted_object,
+            position,
+            item.mesh_type,
+            item.rotation,
+            item.display_size
+        )
+
+    def set_properties(self, plotted_object, item, section, created=False):
+        '''Keep the item's values as typed custom properties.
+
+        They are what the marker index queries, the weights are what the
+        loaded CG is computed from, and the location number is where an
+        export writes the object's position back to.
+        '''
+        tag = section.tag
+        properties = {
+            FIELD_PREFIX + field: value for field, value in item.fields.items()
+        }
+        properties[SECTION_PROPERTY] = tag
+        source = int(section.sources[item.row])
+        properties[LOCATION_PROPERTY] = source if source >= 0 else None
+        properties[WEIGHT_PROPERTY] = item.weight_kg
+        properties[CAPACITY_PROPERTY] = item.capacity_kg
+        if self.validate:
+            issue = self.issues.get((tag, item.row))
+            properties[ISSUE_PROPERTY] = issue and issue.text
+        if created:
+            # Nothing to compare with or remove on a new object
+            for name, value in properties.items():
+                if value is not None:
+                    plotted_object[name] = value
+            return
+        weights_changed = False
+        for name, value in properties.items():
+            if plotted_object.get(name) == value:
+                continue
+            if value is None:
+                del plotted_object[name]
+            else:
+                plotted_object[name] = value
+            weights_changed = weights_changed or name in (
+                WEIGHT_PROPERTY, CAPACITY_PROPERTY
+            )
+        if weights_changed:
+            # Custom properties alone don't reach the depsgraph handler
+            plotted_object.update_tag()
+
+    def is_placed(self, plotted_object, item, position):
+        '''Tell if an undirected, unparented item's object is already in place.'''
+        if item.rotation is not None or item.display_size is not None:
+            return False
+        return (
+            plotted_object.parent is None
+            and plotted_object.rotation_mode == 'XYZ'
+            and plotted_object.empty_display_type == item.mesh_type
+            and plotted_object.location == Vector(position)
+        )
+
+    def remove_objects(self, objects):
+        removed = list(objects)
+        # Point cloud and table data go along with their only object
+        removed += [
+            removed_object.data
+            for removed_object in removed
+            if isinstance(removed_object.data, (bpy.types.Mesh, bpy.types.Curve))
+            and removed_object.data.users == 1
+        ]
+        if removed:
+            bpy.data.batch_remove(removed)
+
+    def link_pending_objects(self):
+        start = time.perf_counter()
+        for collection_name, objects in self.pending_objects.items():
+            link = self.get_collection(collection_name).objects.link
+            for pending_object in objects:
+                link(pending_object)
+            self.profile.count('objects', len(objects))
+        self.pending_objects.clear()
+        self.profile.add('link_objects', (time.perf_counter() - start) * 1000)
 
     def get_unit_system(self):
         scene = bpy.context.scene
@@ -93,217 +446,327 @@ class JSBSim:
             unit_settings.system_rotation
         )
 
+    def adopt_root_collection(self, root):
+        '''Return the id and root collection of an earlier import to plot into.'''
+        unique_id = root['jsbsim_id']
+        suffix = f' - {unique_id}'
+        for child in root.children:
+            if child.name.endswith(suffix):
+                self.collections[child.name[:-len(suffix)]] = child
+        return unique_id, root
+
     def get_root_collection_and_id(self):
-        scene_collection = bpy.context.scene.collection
-        children = scene_collection.children
-        target_collection_name = None
-        unique_id = None
-
-        def find_children(name, children):
-            for child in children:
-                if child.name == name:
-                    return child
-            return None
-        for index in range(999):
-            name = f'JSBSim - [{self.filename} ({index})]'
-            if find_children(name, children):
-                continue
-            target_collection_name = name
-            unique_id = f'[{self.filename} ({index})]'
-            break
-        new_collection = bpy.data.collections.new(target_collection_name)
-        scene_collection.children.link(new_collection)
+        # Gather every id already taken by this FDM in a single pass, then
+        # allocate the lowest free one. bpy.data is scanned rather than the
+        # scene so orphan collections don't force a '.001' suffix either.
+        id_pattern = re.compile(
+            rf'JSBSim - \[{re.escape(self.filename)} \((\d+)\)\]'
+        )
+        used_ids = set()
+        for collection in bpy.data.collections:
+            match = id_pattern.fullmatch(collection.name)
+            if match:
+                used_ids.add(int(match.group(1)))
+        index = 0
+        while index in used_ids:
+            index += 1
+        unique_id = f'[{self.filename} ({index})]'
+        new_collection = bpy.data.collections.new(f'JSBSim - {unique_id}')
+        if not self.fast_import:  # linked once complete, see plot_batched()
+            bpy.context.scene.collection.children.link(new_collection)
+        self.profile.count('collections')
         return unique_id, new_collection
 
-    def get_collection(self, name):
-        target_collection_name = f'{name} - {self.unique_id}'
-        target_collection = None
-        for collection in self.collection.children:
-            if collection.name == target_collection_name:
-                target_collection = collection
-                break
+    def get_collection(self, name, parent=None):
+        '''Return the collection called name, created in parent or the root.'''
+        target_collection = self.collections.get(name)
         if target_collection is not None:
             return target_collection
-        new_collection = bpy.data.collections.new(target_collection_name)
-        self.collection.children.link(new_collection)
+        new_collection = bpy.data.collections.new(f'{name} - {self.unique_id}')
+        (parent or self.collection).children.link(new_collection)
+        self.collections[name] = new_collection
+        self.profile.count('collections')
         return new_collection
 
-    def get_xyz(self, element):
-        x = float(element.find('x').text.strip())
-        y = float(element.find('y').text.strip())
-        z = float(element.find('z').text.strip())
-        return x, y, z
-
-    def get_locations(self, element):
-        result = {}
-        index = 0
-        for location in element.findall('location'):
-            name = location.get('name')
-            unit = location.get('unit')
-            x, y, z = self.get_xyz(location)
-            x = self.convert_unit(x, unit)
-            y = self.convert_unit(y, unit)
-            z = self.convert_unit(z, unit)
-            result[f'{name} ({str(index)})'] = {
-                'name': name,
-                'unit': unit,
-                'xyz': (x, y, z)
-            }
-            index += 1
-        return result
-
-    def convert_unit(self, value, unit_from):
-        scales = {
-            'IN': 0.0254,
-            'FT': 0.3048,
-            'M': 1.0,
-        }
-        if unit_from not in scales:
-            raise ValueError(f'Unsupported unit: {unit_from}')
-        scale = scales[unit_from]
-        # Convert to meters, then into Blender scene units
-        return (value * scale) / self.unit_scale_length
-
-    def get_tag_if_exists(self, tag_name, collection_name):
-        self.get_collection(collection_name)
-        tag = self.root.find(tag_name)
-        if tag is None:
-            print('JSBSim warning: Missing tag [', tag_name, ']')
-        return tag
-
     def set_object_parent(self, obj, parent_obj, keep_global_transform=False):
         obj.parent = parent_obj
         if keep_global_transform:
-            obj.matrix_parent_inverse = parent_obj.matrix_world.inverted()
+            # matrix_world is only evaluated once the parent is in a scene,
+            # matrix_basis is always built from its own location/rotation/scale
+            obj.matrix_parent_inverse = parent_obj.matrix_basis.inverted()
 
     def begin_parsing(self):
-        if self.include_metrics:
-            self.parse_metrics()
-        if self.include_mass_balance:
-            self.parse_mass_balance()
-        if self.include_ground_reactions:
-            self.parse_ground_reactions()
-        if self.include_external_reactions:
-            self.parse_external_reactions()
-        if self.include_propulsion:
-            self.parse_propulsion()
-
-    def parse_metrics(self):
-        metrics = self.get_tag_if_exists('metrics', 'Metrics')
-        if metrics is None:
-            return
-        locations = self.get_locations(metrics)
-        for _, location in locations.items():
-            self.plot(location['name'], location['xyz'], 'Metrics')
+        for _ in self.plot_steps():
+            pass
 
-    def parse_mass_balance(self):
-        mass_balances = self.get_tag_if_exists('mass_balance', 'Mass Balance')
-        if mass_balances is None:
+    def plot_steps(self):
+        '''Plot the sections a few locations at a time, yielding the share done.'''
+        if self.validate:
+            with self.profile.phase('validate'):
+                self.issues = self.find_issues({
+                    tag: section for tag, section in self.fdm.sections.items()
+                    if tag in self.get_plotted_tags()
+                })
+            self.profile.count('issues', len(self.issues))
+        if self.fast_import:
+            self.plot_batched()
+            yield 1.0
             return
-        for _, location in self.get_locations(mass_balances).items():
-            self.plot(
-                location['name'],
-                location['xyz'],
-                'Mass Balance'
-            )  # get and plot CG
-        for pointmass in mass_balances.findall('pointmass'):
-            pointmass_name = pointmass.get('name')
-            weight_unit = pointmass.find('weight').get('unit')
-            weight = pointmass.find('weight').text.strip()
-            locations = self.get_locations(pointmass)
-            for _, location in locations.items():
-                self.plot(
-                    f"{pointmass_name} ({location['name']} - {weight} {weight_unit})",
-                    location['xyz'],
-                    'Mass Balance'
-                )
-
-    def parse_ground_reactions(self):
-        ground_reactions = self.get_tag_if_exists(
-            'ground_reactions',
-            'Ground Reactions'
+        plotted_tags = self.get_plotted_tags()
+        plotted = [
+            (tag, collection_name, self.fdm.sections.get(tag))
+            for tag, (collection_name, _) in SECTIONS.items()
+            if tag in plotted_tags
+        ]
+        total = sum(
+            len(section.items)
+            for tag, _, section in plotted
+            if section and not self.is_lazy(tag)
         )
-        if ground_reactions is None:
-            return
-        for contact in ground_reactions.findall('contact'):
-            contact_name = contact.get('name')
-            contact_type = contact.get('type')
-            locations = self.get_locations(contact)
-            for _, location in locations.items():
-                self.plot(
-                    f'{contact_name} ({contact_type})',
-                    location['xyz'],
-                    'Ground Reactions'
+        done = 0
+        for tag, collection_name, section in plotted:
+            collection = self.get_collection(collection_name)
+            if section is None:
+                print('JSBSim warning: Missing tag [', tag, ']')
+                self.remove_objects(collection.objects)
+                self.unstore_section(tag)
+                continue
+            if self.is_lazy(tag):
+                self.store_section(section, collection_name)
+                self.hide_lazy_collections()
+                continue
+            if self.use_point_cloud(section):
+                self.plot_point_cloud(section, collection_name)
+            else:
+                for section_done in self.plot_section(section, collection_name):
+                    # Linked as they go, so a stepped import shows progress
+                    self.link_pending_objects()
+                    yield (done + section_done) / total
+            self.link_pending_objects()
+            done += len(section.items)
+            yield done / max(total, 1)
+        self.plot_tables()
+        self.link_pending_objects()
+        self.plot_loaded_cg()
+
+    def plot_section(self, section, collection_name):
+        '''Plot a section, yielding the number of locations plotted so far.'''
+        # Meters into Blender scene units, for the whole section at once
+        with self.profile.phase('convert'):
+            positions = (section.coords / self.unit_scale_length).tolist()
+        start = time.perf_counter()
+        # Objects already plotted under the same key are updated in place
+        existing = {}
+        keys = [None] * len(section.items)
+        if self.live_reload:
+            keys = section.get_keys()
+            for plotted_object in self.get_collection(collection_name).objects:
+                existing[plotted_object.get('jsbsim_key')] = plotted_object
+        plotted_objects = []
+        for index, (item, key, position) in enumerate(
+            zip(section.items, keys, positions), 1
+        ):
+            plotted_object = existing.pop(key, None)
+            created = plotted_object is None
+            if created:
+                plotted_object = self.plot(
+                    item.label,
+                    position,
+                    collection_name,
+                    item.mesh_type,
+                    item.rotation,
+                    item.display_size,
+                    key
                 )
+            else:
+                self.update_object(plotted_object, item, position)
+            self.set_properties(plotted_object, item, section, created)
+            if item.parent is not None and self.thrs_auto_parent:
+                self.set_object_parent(
+                    obj=plotted_object,
+                    parent_obj=plotted_objects[item.parent],
+                    keep_global_transform=True
+                )
+            plotted_objects.append(plotted_object)
+            if not index % PLOT_STEP:
+                # Time spent suspended between steps isn't object creation
+                self.profile.add('create_objects', (time.perf_counter() - start) * 1000)
+                yield index
+                start = time.perf_counter()
+        self.remove_objects(existing.values())
+        self.profile.add('create_objects', (time.perf_counter() - start) * 1000)
+
+    def plot_batched(self):
+        '''Plot every section in one pass, then show the whole tree at once.
 
-    def parse_external_reactions(self):
-        external_reactions = self.get_tag_if_exists(
-            'external_reactions', 'External Reactions'
+        Blender keeps objects sorted by name, walking back from the last one
+        to insert a new object. Created in that same order across sections,
+        every insert is at the end instead of a walk through all the others.
+        '''
+        plotted_tags = self.get_plotted_tags()
+        sections = {}
+        for tag, (collection_name, _) in SECTIONS.items():
+            if tag not in plotted_tags:
+                continue
+            self.get_collection(collection_name)
+            section = self.fdm.sections.get(tag)
+            if section is None:
+                print('JSBSim warning: Missing tag [', tag, ']')
+            elif self.is_lazy(tag):
+                self.store_section(section, collection_name)
+            elif self.use_point_cloud(section):
+                self.plot_point_cloud(section, collection_name)
+            else:
+                sections[collection_name] = section
+        with self.profile.phase('convert'):
+            positions = {
+                collection_name: (section.coords / self.unit_scale_length).tolist()
+                for collection_name, section in sections.items()
+            }
+        start = time.perf_counter()
+        keys = {
+            collection_name: (
+                section.get_keys() if self.live_reload
+                else [None] * len(section.items)
+            )
+            for collection_name, section in sections.items()
+        }
+        order = sorted(
+            (
+                (f'{item.label} - {self.unique_id}'.lower(), collection_name, row)
+                for collection_name, section in sections.items()
+                for row, item in enumerate(section.items)
+            ),
+            key=lambda entry: entry[0]
         )
-        if external_reactions is None:
+        plotted_objects = {
+            collection_name: [None] * len(section.items)
+            for collection_name, section in sections.items()
+        }
+        for _, collection_name, row in order:
+            item = sections[collection_name].items[row]
+            plotted_object = self.plot(
+                item.label,
+                positions[collection_name][row],
+                collection_name,
+                item.mesh_type,
+                item.rotation,
+                item.display_size,
+                keys[collection_name][row]
+            )
+            self.set_properties(
+                plotted_object, item, sections[collection_name], created=True
+            )
+            plotted_objects[collection_name][row] = plotted_object
+        if self.thrs_auto_parent:
+            for collection_name, section in sections.items():
+                objects = plotted_objects[collection_name]
+                for item, plotted_object in zip(section.items, objects):
+                    if item.parent is not None:
+                        self.set_object_parent(
+                            obj=plotted_object,
+                            parent_obj=objects[item.parent],
+                            keep_global_transform=True
+                        )
+        self.profile.add('create_objects', (time.perf_counter() - start) * 1000)
+        self.plot_tables()
+        self.link_pending_objects()
+        self.plot_loaded_cg()
+        bpy.context.scene.collection.children.link(self.collection)
+        self.hide_lazy_collections()
+
+    def plot_tables(self):
+        '''Draw the aerodynamic tables, replacing those drawn before.'''
+        if AERODYNAMICS not in self.get_plotted_tags():
             return
-        for force in external_reactions.findall('force'):
-            force_name = force.get('name')
-            force_frame = force.get('frame')
-            locations = self.get_locations(force)
-            for _, location in locations.items():
-                self.plot(
-                    f'{force_name} ({force_frame})',
-                    location['xyz'],
-                    'External Reactions'
-                )
+        tables = self.fdm.tables
+        if tables is None and AERODYNAMICS in self.fdm.digests:
+            return  # unchanged since the last reload
+        collection = self.get_collection(TABLES_COLLECTION)
+        self.remove_objects(collection.objects)
+        if tables is None:
+            print('JSBSim warning: Missing tag [', AERODYNAMICS, ']')
+            return
+        start = time.perf_counter()
+        self.pending_objects[TABLES_COLLECTION] = [
+            new_table_object(f'{table.name} - {self.unique_id}', table, corner)
+            for table, corner in zip(tables, get_table_corners(len(tables)))
+        ]
+        self.profile.add('create_tables', (time.perf_counter() - start) * 1000)
 
-    def parse_propulsion(self):
-        propulsions = self.get_tag_if_exists('propulsion', 'Propulsion')
-        if propulsions is None:
+    def plot_loaded_cg(self):
+        '''Mark the CG of the empty weight, point masses and fuel together.'''
+        sections = dict(self.fdm.sections)
+        for tag in ('mass_balance', 'propulsion'):
+            if tag not in sections and tag in self.collection.get(LAZY_PROPERTY, {}):
+                sections[tag] = load_stored_section(self.collection, tag)
+        if 'mass_balance' not in sections or (
+            'propulsion' in self.get_included_tags()
+            and 'propulsion' not in sections
+        ):
+            # Left to the depsgraph handler when a reload skipped a section
             return
-        # Draw engines
-        for engine in propulsions.findall('engine'):
-            engine_file = engine.get('file')
-            locations = self.get_locations(engine)
-            engine_object = None
-            if len(locations):
-                for _, location in locations.items():
-                    engine_object = self.plot(
-                        f'ENGINE - {engine_file}',
-                        location['xyz'],
-                        'Propulsion',
-                        'CONE'
-                    )
-            else:
-                engine_object = self.plot(
-                    f'ENGINE - {engine_file} (missing location)',
-                    (0, 0, 0),
-                    'Propulsion',
-                    'CONE'
-                )
-            # Draw engine thrusters
-            thruster = engine.find('thruster')
-            thruster_file = thruster.get('file')
-            locations = self.get_locations(thruster)
-            for _, location in locations.items():
-                thruster_object = self.plot(
-                    f'THRUSTER - {thruster_file}',
-                    location['xyz'],
-                    'Propulsion'
-                )
-                if self.thrs_auto_parent:
-                    self.set_object_parent(
-                        obj=thruster_object,
-                        parent_obj=engine_object,
-                        keep_global_transform=True
-                    )
-        # Draw fuel tanks
-        for tank in propulsions.findall('tank'):
-            tank_type = tank.get('type')
-            tank_number = tank.get('number')
-            locations = self.get_locations(tank)
-            capacity_unit = tank.find('capacity').get('unit')
-            capacity = tank.find('capacity').text.strip()
-            for _, location in locations.items():
-                self.plot(
-                    f'TANK ({tank_number} - {tank_type} - {capacity} {capacity_unit})',
-                    location['xyz'],
-                    'Propulsion',
-                    'CUBE'
-                )
+        with self.profile.phase('loaded_cg'):
+            loaded_cg = get_loaded_cg(sections)
+            marker = next(
+                (obj for obj in self.collection.objects if obj.get(MARKER_PROPERTY)),
+                None
+            )
+            if loaded_cg is None:
+                if marker is not None:
+                    self.remove_objects([marker])
+                return
+            location, total_weight = loaded_cg
+            if marker is None:
+                marker = bpy.data.objects.new(f'LOADED CG - {self.unique_id}', None)
+                marker.empty_display_type = 'PLAIN_AXES'
+                marker.scale = (self.plot_scale, self.plot_scale, self.plot_scale)
+                marker.show_name = self.plot_names
+                marker.show_axis = self.plot_axes
+                marker[MARKER_PROPERTY] = True
+                self.collection.objects.link(marker)
+                self.profile.count('objects')
+            marker.location = (location / self.unit_scale_length).tolist()
+            marker[TOTAL_WEIGHT_PROPERTY] = total_weight
+
+    def plot_point_cloud(self, section, collection_name):
+        with self.profile.phase('convert'):
+            positions = section.coords / self.unit_scale_length
+        start = time.perf_counter()
+        name = f'{collection_name} - {self.unique_id}'
+        collection = self.get_collection(collection_name)
+        point_cloud = next(
+            (obj for obj in collection.objects if obj.type == 'MESH'), None
+        )
+        if point_cloud is None:
+            point_cloud = new_point_cloud(
+                name,
+                section.items,
+                positions,
+                self.plot_scale,
+                self.unit_scale_length
+            )
+            point_cloud.show_name = self.plot_names
+            point_cloud.show_axis = self.plot_axes
+            self.pending_objects.setdefault(collection_name, []).append(point_cloud)
+        else:
+            previous_mesh = point_cloud.data
+            point_cloud.data = new_point_cloud_mesh(
+                name, section.items, positions, self.unit_scale_length
+            )
+            bpy.data.meshes.remove(previous_mesh)
+            point_cloud.data.name = name
+        if self.validate:
+            issues = self.get_issues(section.tag)
+            set_strings(
+                point_cloud.data.attributes.new('issue', 'STRING', 'POINT'),
+                [
+                    issues[row].text if row in issues else ''
+                    for row in range(len(section.items))
+                ]
+            )
+        self.remove_objects(
+            obj for obj in collection.objects if obj != point_cloud
+        )
+        self.profile.count('points', len(section.items))
+        self.profile.add('create_objects', (time.perf_counter() - start) * 1000)
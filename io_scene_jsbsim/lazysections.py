@@ -0,0 +1,233 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+from bpy.app.handlers import persistent
+from bpy.props import StringProperty
+from bpy.types import Operator, Panel
+from bpy.utils import register_class, unregister_class
+
+from .fdm import FDM, SECTIONS
+from .validation import Issue
+from .handlers import add_handlers, remove_handlers
+from .jsbsim import (
+    LAZY_PROPERTY,
+    JSBSim,
+    find_layer_collection,
+    load_stored_section
+)
+
+
+class ExpandSections(JSBSim):
+    '''Plot sections an import stored instead, now that they are wanted.
+
+    The sections are rebuilt from what was stored on the root collection,
+    the FDM file isn't read again.
+    '''
+    action = 'Expanded'
+
+    def __init__(self, collection, tags):
+        self.root = collection
+        self.tags = tags
+        sections = {tag: load_stored_section(collection, tag) for tag in tags}
+        stored = collection[LAZY_PROPERTY]
+        # Checked when imported, the results are stored with the section
+        self.stored_issues = {}
+        for tag in tags:
+            for row, text in stored[tag].get('issues', {}).items():
+                label = sections[tag].items[int(row)].label
+                self.stored_issues[(tag, int(row))] = Issue(tag, int(row), label, text)
+        digests = collection.get('jsbsim_digests')
+        super().__init__(
+            collection['jsbsim_source'],
+            fdm=FDM(
+                collection['jsbsim_id'],
+                sections,
+                digests.to_dict() if digests is not None else None
+            ),
+            live_reload=bool(collection.get('jsbsim_live_reload')),
+            validate=any('issues' in stored[tag] for tag in tags),
+            **collection['jsbsim_settings'].to_dict()
+        )
+        for tag in tags:
+            self.unstore_section(tag)
+
+    def find_issues(self, _sections):
+        return self.stored_issues
+
+    def read_source_stat(self):
+        # The stored sections are as of the last time the file was read
+        return self.root.get('jsbsim_stat')
+
+    def get_plotted_tags(self):
+        return self.tags
+
+    def get_root_collection_and_id(self):
+        return self.adopt_root_collection(self.root)
+
+
+def get_lazy_imports():
+    return [
+        collection
+        for collection in bpy.data.collections
+        if LAZY_PROPERTY in collection and collection.library is None
+    ]
+
+
+def get_section_collection(collection, tag):
+    collection_name = SECTIONS[tag][0]
+    return collection.children.get(f'{collection_name} - {collection["jsbsim_id"]}')
+
+
+def is_shown(view_layer, collection):
+    layer_collection = find_layer_collection(view_layer.layer_collection, collection)
+    return (
+        layer_collection is not None
+        and not layer_collection.exclude
+        and layer_collection.visible_get()
+    )
+
+
+def expand_shown():
+    '''Plot the stored sections whose collection was shown in a window.'''
+    view_layers = [window.view_layer for window in bpy.context.window_manager.windows]
+    for collection in get_lazy_imports():
+        shown = [
+            tag
+            for tag in collection[LAZY_PROPERTY].keys()
+            if any(
+                is_shown(view_layer, get_section_collection(collection, tag))
+                for view_layer in view_layers
+            )
+        ]
+        if shown:
+            ExpandSections(collection, shown)
+
+
+def schedule_expand_shown():
+    # Run from a timer, outside of the depsgraph update that showed them
+    if not bpy.app.timers.is_registered(expand_shown):
+        bpy.app.timers.register(expand_shown, first_interval=0.0)
+
+
+@persistent
+def on_depsgraph_update(_scene, depsgraph):
+    # Showing a collection only reports the scene, including one its parent
+    for update in depsgraph.updates:
+        if isinstance(update.id, (bpy.types.Scene, bpy.types.Collection)):
+            schedule_expand_shown()
+            return
+
+
+@persistent
+def on_file_load(*_args):
+    schedule_expand_shown()
+
+
+HANDLERS = (
+    (bpy.app.handlers.depsgraph_update_post, on_depsgraph_update),
+    (bpy.app.handlers.load_post, on_file_load),
+)
+
+
+class ExpandLazySections(Operator):
+    bl_idname = 'object.jsbsim_expand_sections'
+    bl_label = 'Create Objects'
+    bl_description = 'Create the objects of stored sections and show them'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    collection: StringProperty(
+        name='Import',                                              # noqa: F821
+        description='Root collection of the import'                 # noqa: F722
+    )  # type: ignore
+
+    section: StringProperty(
+        name='Section',                                             # noqa: F821
+        description='Section to create, every stored one when empty'  # noqa: F722
+    )  # type: ignore
+
+    def execute(self, context):
+        collection = bpy.data.collections.get(self.collection)
+        if collection is None or LAZY_PROPERTY not in collection:
+            self.report({'ERROR'}, f'No stored sections in {self.collection}')
+            return {'CANCELLED'}
+        stored = collection[LAZY_PROPERTY]
+        tags = [self.section] if self.section else list(stored.keys())
+        if any(tag not in stored for tag in tags):
+            self.report({'ERROR'}, f'Section {self.section} is not stored')
+            return {'CANCELLED'}
+        section_collections = [get_section_collection(collection, tag) for tag in tags]
+        importer = ExpandSections(collection, tags)
+        for section_collection in section_collections:
+            layer_collection = find_layer_collection(
+                context.view_layer.layer_collection, section_collection
+            )
+            if layer_collection is not None:
+                layer_collection.hide_viewport = False
+        self.report({'INFO'}, importer.get_summary())
+        return {'FINISHED'}
+
+
+class LazySectionsPanel(Panel):
+    bl_idname = 'VIEW3D_PT_jsbsim_lazy_sections'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'JSBSim'
+    bl_label = 'Stored Sections'
+
+    @classmethod
+    def poll(cls, _context):
+        return bool(get_lazy_imports())
+
+    def draw(self, _context):
+        layout = self.layout
+        for collection in get_lazy_imports():
+            box = layout.box()
+            row = box.row()
+            row.label(text=collection.name, icon='OUTLINER_COLLECTION')
+            props = row.operator(ExpandLazySections.bl_idname, text='All')
+            props.collection = collection.name
+            stored = collection[LAZY_PROPERTY]
+            for tag in stored.keys():
+                row = box.row()
+                row.label(
+                    text=f'{SECTIONS[tag][0]}: {len(stored[tag]["coords"]) // 3}'
+                )
+                props = row.operator(ExpandLazySections.bl_idname, text='Create')
+                props.collection = collection.name
+                props.section = tag
+
+
+classes = (
+    ExpandLazySections,
+    LazySectionsPanel,
+)
+
+
+def register():
+    for cls in classes:
+        register_class(cls)
+    add_handlers(HANDLERS)
+
+
+def unregister():
+    remove_handlers(HANDLERS)
+    if bpy.app.timers.is_registered(expand_shown):
+        bpy.app.timers.unregister(expand_shown)
+    for cls in reversed(classes):
+        unregister_class(cls)
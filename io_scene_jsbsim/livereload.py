@@ -0,0 +1,121 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import xml.etree.ElementTree as ET
+import bpy
+
+from .sources import close_archives, get_source_stat
+from .fdm import get_parsed_tags, parse_fdm, resolve_components
+from .export import LOCATIONS_PROPERTY
+from .jsbsim import LAZY_PROPERTY, JSBSim
+
+POLL_INTERVAL = 1.0  # seconds
+
+
+class LiveReload(JSBSim):
+    '''Bring a watched import up to date with the sections that changed.
+
+    Only the changed sections are parsed and replotted. Their objects are
+    matched to the new items by key and updated in place, so names,
+    selections and anything else set on them survive.
+    '''
+    action = 'Reloaded'
+
+    def __init__(self, collection, fdm, changed_tags, source_stat):
+        self.root = collection
+        self.changed_tags = changed_tags
+        super().__init__(
+            collection['jsbsim_source'],
+            fdm=fdm,
+            live_reload=True,
+            **collection['jsbsim_settings'].to_dict()
+        )
+        # The file may have been written again since it was checked
+        self.collection['jsbsim_stat'] = source_stat
+
+    def get_plotted_tags(self):
+        return self.changed_tags
+
+    def is_lazy(self, tag):
+        # Sections not shown yet only have what is stored updated
+        return tag in self.root.get(LAZY_PROPERTY, {})
+
+    def get_root_collection_and_id(self):
+        return self.adopt_root_collection(self.root)
+
+
+def reload_collection(collection):
+    '''Update a watched import if its file changed, return True if it did.'''
+    filepath = collection['jsbsim_source']
+    try:
+        source_stat = get_source_stat(filepath)
+    except OSError:
+        return False  # moved or being replaced, checked again next time
+    if source_stat == collection.get('jsbsim_stat'):
+        return False
+    # Recorded first, so a file saved half-written is only tried once
+    collection['jsbsim_stat'] = source_stat
+    collection.pop(LOCATIONS_PROPERTY, None)
+    settings = collection['jsbsim_settings']
+    tags = get_parsed_tags(settings)
+    previous_digests = collection['jsbsim_digests'].to_dict()
+    # One pass hashes every section and parses the changed ones only
+    fdm = parse_fdm(filepath, tags, unchanged=previous_digests)
+    changed_tags = {
+        tag for tag in tags
+        if fdm.digests.get(tag) != previous_digests.get(tag)
+    }
+    if not changed_tags:
+        return False
+    resolve_components(fdm, filepath)
+    LiveReload(collection, fdm, changed_tags, source_stat)
+    return True
+
+
+def poll_live_reload():
+    watched = [
+        collection
+        for collection in bpy.data.collections
+        if collection.get('jsbsim_live_reload') and collection.library is None
+    ]
+    for collection in watched:
+        try:
+            reload_collection(collection)
+        except (OSError, KeyError, ValueError, ET.ParseError) as error:
+            print(
+                'JSBSim warning: Live reload failed [',
+                collection.name,
+                error,
+                ']'
+            )
+    close_archives()
+    return POLL_INTERVAL
+
+
+def register():
+    if not bpy.app.timers.is_registered(poll_live_reload):
+        bpy.app.timers.register(
+            poll_live_reload,
+            first_interval=POLL_INTERVAL,
+            persistent=True
+        )
+
+
+def unregister():
+    if bpy.app.timers.is_registered(poll_live_reload):
+        bpy.app.timers.unregister(poll_live_reload)
@@ -0,0 +1,219 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+from bpy.app.handlers import persistent
+import numpy as np
+
+from .handlers import add_handlers, get_handlers, remove_handlers
+
+WEIGHT_PROPERTY = 'jsbsim_weight_kg'
+CAPACITY_PROPERTY = 'jsbsim_capacity_kg'
+TOTAL_WEIGHT_PROPERTY = 'jsbsim_total_weight_kg'
+MARKER_PROPERTY = 'jsbsim_loaded_cg'
+# Empty a flight log animates an import with, see flightlog.py
+FLIGHT_PROPERTY = 'jsbsim_flight'
+
+# Trackers by the session_uid of their import's root collection, of every
+# mass object they follow and of the section collections below the root.
+# Names can change, session_uids can't.
+trackers = {}
+tracked_masses = {}
+tracked_collections = {}
+untracked_masses = set()
+
+
+class LoadedCG:
+    '''Running weighted sums over the mass objects of one import.
+
+    Built in one vectorized pass, then each moved or reweighted mass only
+    swaps its own share of the sums.
+    '''
+
+    def __init__(self, collection, children, marker, masses):
+        self.collection_name = collection.name
+        self.children = {child.session_uid for child in children}
+        self.marker_name = marker.name
+        self.rows = {mass.session_uid: row for row, mass in enumerate(masses)}
+        self.weights = np.array([get_weight(mass) for mass in masses])
+        self.positions = np.array(
+            [get_position(mass) for mass in masses]
+        ).reshape(-1, 3)
+        self.moment = self.weights @ self.positions
+        self.total = self.weights.sum()
+
+    def update(self, mass):
+        row = self.rows[mass.session_uid]
+        weight = get_weight(mass)
+        position = np.array(get_position(mass))
+        self.moment += weight * position - self.weights[row] * self.positions[row]
+        self.total += weight - self.weights[row]
+        self.weights[row] = weight
+        self.positions[row] = position
+
+    def place_marker(self):
+        '''Move the marker to the CG, False once the marker is gone.'''
+        # Looked up by name, bpy.data.objects is too long to search
+        collection = bpy.data.collections.get(self.collection_name)
+        marker = collection and collection.objects.get(self.marker_name)
+        if marker is None or not marker.get(MARKER_PROPERTY):
+            return False
+        if self.total > 0.0:
+            location = tuple(self.moment / self.total)
+            if tuple(marker.location) != location:
+                marker.location = location
+        marker[TOTAL_WEIGHT_PROPERTY] = float(self.total)
+        return True
+
+
+def get_weight(mass):
+    try:
+        return float(mass[WEIGHT_PROPERTY])
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
+
+def get_position(mass):
+    '''Return where a mass is in its import, wherever a flight has moved it.'''
+    child = mass
+    while child.parent is not None and not child.parent.get(FLIGHT_PROPERTY):
+        child = child.parent
+    if child.parent is None:
+        return mass.matrix_world.translation
+    flight_frame = child.parent.matrix_world @ child.matrix_parent_inverse
+    return (flight_frame.inverted() @ mass.matrix_world).translation
+
+
+def forget(collection_id):
+    tracker = trackers.pop(collection_id, None)
+    if tracker is None:
+        return
+    for mass_id in tracker.rows:
+        if tracked_masses.get(mass_id) is tracker:
+            del tracked_masses[mass_id]
+    for child_id in tracker.children:
+        if tracked_collections.get(child_id) is tracker:
+            del tracked_collections[child_id]
+
+
+def track(collection):
+    '''Follow the masses of an imported root collection, if it has a marker.'''
+    forget(collection.session_uid)
+    lazy_sections = collection.get('jsbsim_lazy_sections', {})
+    if 'mass_balance' in lazy_sections or 'propulsion' in lazy_sections:
+        return None  # the stored masses can't be followed until plotted
+    marker = None
+    masses = []
+    children = collection.children_recursive
+    # all_objects is much slower to go through on large imports
+    objects = [obj for child in (collection, *children) for obj in child.objects]
+    for obj in objects:
+        if obj.type == 'MESH':
+            return None  # point cloud masses can't be followed one by one
+        if obj.get(MARKER_PROPERTY):
+            marker = obj
+        elif WEIGHT_PROPERTY in obj:
+            masses.append(obj)
+    if marker is None:
+        return None
+    tracker = LoadedCG(collection, children, marker, masses)
+    trackers[collection.session_uid] = tracker
+    for mass in masses:
+        tracked_masses[mass.session_uid] = tracker
+    for child_id in tracker.children:
+        tracked_collections[child_id] = tracker
+    return tracker
+
+
+def retrack(tracker):
+    '''Follow the masses of a tracker's import afresh, None once it is gone.'''
+    collection = bpy.data.collections.get(tracker.collection_name)
+    if collection is None or trackers.get(collection.session_uid) is not tracker:
+        return None
+    return track(collection)
+
+
+def track_all():
+    untracked_masses.clear()
+    for collection in bpy.data.collections:
+        if 'jsbsim_profile' in collection:
+            track(collection)
+
+
+def update_masses(masses):
+    '''Update the sums of edited masses, return the trackers they are in.'''
+    touched = set()
+    retracked = False
+    for mass in masses:
+        mass_id = mass.session_uid
+        if mass_id not in tracked_masses and mass_id not in untracked_masses:
+            if not retracked:
+                track_all()  # e.g. after a file was loaded
+                retracked = True
+            if mass_id not in tracked_masses:
+                untracked_masses.add(mass_id)
+        tracker = tracked_masses.get(mass_id)
+        if tracker is not None:
+            tracker.update(mass)
+            touched.add(tracker)
+    return touched
+
+
+@persistent
+def update_loaded_cg(_scene, depsgraph):
+    '''Update the CG markers of the imports whose masses were edited.'''
+    masses = []
+    stale = set()
+    touched = set()
+    for update in depsgraph.updates:
+        updated = update.id.original
+        if isinstance(updated, bpy.types.Collection):
+            # Objects were added to or removed from an import, or from one
+            # of its section collections
+            if 'jsbsim_profile' in updated:
+                touched.add(track(updated))
+            elif updated.session_uid in tracked_collections:
+                stale.add(tracked_collections[updated.session_uid])
+        elif isinstance(updated, bpy.types.Object) and WEIGHT_PROPERTY in updated:
+            masses.append(updated)
+    for tracker in stale - touched:
+        touched.add(retrack(tracker))
+    touched.update(update_masses(masses))
+    for collection_id, tracker in list(trackers.items()):
+        if tracker in touched and not tracker.place_marker():
+            forget(collection_id)
+
+
+@persistent
+def forget_all(*_args):
+    trackers.clear()
+    tracked_masses.clear()
+    tracked_collections.clear()
+    untracked_masses.clear()
+
+
+HANDLERS = get_handlers(update_loaded_cg, forget_all)
+
+
+def register():
+    add_handlers(HANDLERS)
+
+
+def unregister():
+    remove_handlers(HANDLERS)
+    forget_all()
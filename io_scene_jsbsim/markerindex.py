@@ -0,0 +1,198 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+from bpy.app.handlers import persistent
+import numpy as np
+
+from .handlers import add_handlers, get_handlers, remove_handlers
+from .loadedcg import CAPACITY_PROPERTY, WEIGHT_PROPERTY
+from .validation import ISSUE_PROPERTY
+from .variants import DIFFERENCE_PROPERTY
+
+SECTION_PROPERTY = 'jsbsim_section'
+FIELD_PREFIX = 'jsbsim_'
+
+# Indexes by the session_uid of their import's root collection, built on
+# the first query and dropped when objects are added or removed. Objects
+# are added to and removed from the section collections below the root,
+# whose session_uids map to their root's
+indexes = {}
+indexed_collections = {}
+
+
+class MarkerIndex:
+    '''The typed fields of one import's markers, as columns to query.
+
+    Rows are matched back to objects by session_uid, which survives
+    renames, in a single pass over the import's collections.
+    '''
+
+    def __init__(self, collection):
+        self.collection_name = collection.name
+        self.children = set()
+        object_ids = []
+        sections = []
+        types = []
+        names = []
+        weights = []
+        issues = []
+        differences = []
+        for child in collection.children_recursive:
+            self.children.add(child.session_uid)
+            for obj in child.objects:
+                section = obj.get(SECTION_PROPERTY)
+                if section is None:
+                    continue
+                object_ids.append(obj.session_uid)
+                sections.append(section)
+                types.append(str(obj.get(f'{FIELD_PREFIX}type', '')).lower())
+                names.append(str(obj.get(f'{FIELD_PREFIX}name', '')).lower())
+                # A tank is queried by its size, anything else by its weight
+                weights.append(
+                    obj.get(CAPACITY_PROPERTY, obj.get(WEIGHT_PROPERTY, np.nan))
+                )
+                issues.append(ISSUE_PROPERTY in obj)
+                differences.append(DIFFERENCE_PROPERTY in obj)
+        self.rows = {object_id: row for row, object_id in enumerate(object_ids)}
+        self.sections = np.array(sections, dtype=str)
+        self.types = np.array(types, dtype=str)
+        self.names = np.array(names, dtype=str)
+        self.weights = np.array(weights, dtype=np.float64)
+        self.issues = np.array(issues, dtype=bool)
+        self.differences = np.array(differences, dtype=bool)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def query(
+        self,
+        section='ALL',
+        marker_type='',
+        name='',
+        weight_range=None,
+        issues_only=False,
+        differences_only=False
+    ):
+        '''Return a mask of the rows matching every given filter.
+
+        marker_type matches whole types and name matches part of names,
+        both ignoring case. weight_range is (min, max) in kilograms.
+        issues_only keeps the markers flagged when the import was checked,
+        differences_only those that differ between compared variants.
+        '''
+        mask = np.ones(len(self), dtype=bool)
+        if section != 'ALL':
+            mask &= self.sections == section
+        if marker_type:
+            mask &= self.types == marker_type.strip().lower()
+        if name:
+            mask &= np.char.find(self.names, name.strip().lower()) >= 0
+        if weight_range is not None:
+            low, high = weight_range
+            # NaN, no weight, never matches
+            mask &= (self.weights >= low) & (self.weights <= high)
+        if issues_only:
+            mask &= self.issues
+        if differences_only:
+            mask &= self.differences
+        return mask
+
+    def get_objects(self, mask=None):
+        '''Return the indexed objects, only those in mask if given.'''
+        collection = bpy.data.collections.get(self.collection_name)
+        if collection is None:
+            return []
+        objects = []
+        for child in collection.children_recursive:
+            for obj in child.objects:
+                row = self.rows.get(obj.session_uid)
+                if row is not None and (mask is None or mask[row]):
+                    objects.append(obj)
+        return objects
+
+
+def get_imports():
+    '''Return the root collections of every import in the file.'''
+    return [
+        collection
+        for collection in bpy.data.collections
+        if 'jsbsim_profile' in collection
+    ]
+
+
+def find_import(name):
+    '''Return the import called name, or the only one in the file if no name.'''
+    imports = get_imports()
+    if name:
+        collection = bpy.data.collections.get(name)
+        return collection if collection in imports else None
+    return imports[0] if len(imports) == 1 else None
+
+
+def get_index(collection):
+    index = indexes.get(collection.session_uid)
+    if index is None or index.collection_name != collection.name:
+        drop(collection.session_uid)
+        index = indexes[collection.session_uid] = MarkerIndex(collection)
+        for child_id in index.children:
+            indexed_collections[child_id] = collection.session_uid
+    return index
+
+
+def drop(collection_id):
+    index = indexes.pop(collection_id, None)
+    if index is None:
+        return
+    for child_id in index.children:
+        if indexed_collections.get(child_id) == collection_id:
+            del indexed_collections[child_id]
+
+
+def forget(collection):
+    drop(collection.session_uid)
+
+
+@persistent
+def forget_changed(_scene, depsgraph):
+    '''Drop the indexes of imports that objects were added to or removed from.'''
+    if not indexes or not depsgraph.id_type_updated('COLLECTION'):
+        return
+    for update in depsgraph.updates:
+        updated = update.id.original
+        if isinstance(updated, bpy.types.Collection):
+            collection_id = updated.session_uid
+            drop(indexed_collections.get(collection_id, collection_id))
+
+
+@persistent
+def forget_all(*_args):
+    indexes.clear()
+    indexed_collections.clear()
+
+
+HANDLERS = get_handlers(forget_changed, forget_all)
+
+
+def register():
+    add_handlers(HANDLERS)
+
+
+def unregister():
+    remove_handlers(HANDLERS)
+    forget_all()
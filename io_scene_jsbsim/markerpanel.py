@@ -0,0 +1,243 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import bpy
+from bpy.props import (
+    BoolProperty,
+    EnumProperty,
+    FloatProperty,
+    PointerProperty,
+    StringProperty
+)
+from bpy.types import Operator, Panel, PropertyGroup
+from bpy.utils import register_class, unregister_class
+
+from .fdm import SECTIONS, WEIGHT_SCALES
+from . import markerindex
+
+SECTION_ITEMS = [('ALL', 'All Sections', '')] + [
+    (tag, collection_name, '') for tag, (collection_name, _) in SECTIONS.items()
+]
+WEIGHT_UNIT_ITEMS = [(unit, unit, '') for unit in WEIGHT_SCALES]
+
+
+def query_markers(query):
+    '''Return (index, mask) pairs of the markers matching query.'''
+    weight_range = None
+    if query.use_weight:
+        scale = WEIGHT_SCALES[query.weight_unit]
+        weight_range = (query.weight_min * scale, query.weight_max * scale)
+    results = []
+    for collection in markerindex.get_imports():
+        if query.target not in ('', collection.name):
+            continue
+        index = markerindex.get_index(collection)
+        mask = index.query(
+            query.section,
+            query.marker_type,
+            query.name,
+            weight_range,
+            query.issues_only,
+            query.differences_only
+        )
+        results.append((index, mask))
+    return results
+
+
+class JSBSimMarkerQuery(PropertyGroup):
+    target: StringProperty(
+        name='Import',                                              # noqa: F821
+        description='Collection of the imported FDM to look in, '  # noqa: F722
+                    'every import when empty',                      # noqa: F722
+    )  # type: ignore
+
+    section: EnumProperty(
+        name='Section',                                         # noqa: F821
+        description='Section the markers belong to',            # noqa: F722
+        items=SECTION_ITEMS,
+        default='ALL'                                           # noqa: F821
+    )  # type: ignore
+
+    marker_type: StringProperty(
+        name='Type',                                                    # noqa: F821
+        description='Contact, tank, engine or thruster type, such as '  # noqa: F722
+                    'BOGEY or FUEL',                                    # noqa: F722
+    )  # type: ignore
+
+    name: StringProperty(
+        name='Name',                                            # noqa: F821
+        description='Part of the marker name',                  # noqa: F722
+    )  # type: ignore
+
+    use_weight: BoolProperty(
+        name='Weight',                                                      # noqa: F821
+        description='Only point masses and tanks, by weight or capacity',   # noqa: F722
+        default=False
+    )  # type: ignore
+
+    weight_min: FloatProperty(
+        name='Min',                                             # noqa: F821
+        default=0.0,
+        min=0.0
+    )  # type: ignore
+
+    weight_max: FloatProperty(
+        name='Max',                                             # noqa: F821
+        default=1000.0,
+        min=0.0
+    )  # type: ignore
+
+    weight_unit: EnumProperty(
+        name='Unit',                                            # noqa: F821
+        items=WEIGHT_UNIT_ITEMS,
+        default='LBS'                                           # noqa: F821
+    )  # type: ignore
+
+    issues_only: BoolProperty(
+        name='Issues only',                                                 # noqa: F722
+        description='Only markers flagged as duplicates or outliers when '  # noqa: F722
+                    'the import was checked',                               # noqa: F722
+        default=False
+    )  # type: ignore
+
+    differences_only: BoolProperty(
+        name='Differences only',                                            # noqa: F722
+        description='Only markers that differ between the variants of a '   # noqa: F722
+                    'comparison',                                           # noqa: F821
+        default=False
+    )  # type: ignore
+
+
+class SelectMarkers(Operator):
+    bl_idname = 'object.jsbsim_select_markers'
+    bl_label = 'Select'
+    bl_description = 'Select the markers matching the query'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        for obj in context.selected_objects:
+            obj.select_set(False)
+        selected = None
+        for index, mask in query_markers(context.scene.jsbsim_marker_query):
+            for obj in index.get_objects(mask):
+                if obj.visible_get():
+                    obj.select_set(True)
+                    selected = obj
+        if selected is None:
+            self.report({'WARNING'}, 'No visible marker matches')
+            return {'CANCELLED'}
+        context.view_layer.objects.active = selected
+        return {'FINISHED'}
+
+
+class IsolateMarkers(Operator):
+    bl_idname = 'object.jsbsim_isolate_markers'
+    bl_label = 'Isolate'
+    bl_description = 'Select the markers matching the query and show only them'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return space is not None and space.type == 'VIEW_3D'
+
+    def execute(self, context):
+        # Local view hides everything else in one go, hiding objects one
+        # by one gets slower with every object in the scene
+        if context.space_data.local_view:
+            bpy.ops.view3d.localview(frame_selected=False)
+        if bpy.ops.object.jsbsim_select_markers() != {'FINISHED'}:
+            return {'CANCELLED'}
+        return bpy.ops.view3d.localview(frame_selected=False)
+
+
+class ShowMarkers(Operator):
+    bl_idname = 'object.jsbsim_show_markers'
+    bl_label = 'Show All'
+    bl_description = 'Show everything again after isolating markers'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    @classmethod
+    def poll(cls, context):
+        space = context.space_data
+        return (
+            space is not None
+            and space.type == 'VIEW_3D'
+            and space.local_view is not None
+        )
+
+    def execute(self, _context):
+        return bpy.ops.view3d.localview(frame_selected=False)
+
+
+class MarkersPanel(Panel):
+    bl_idname = 'VIEW3D_PT_jsbsim_markers'
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = 'JSBSim'
+    bl_label = 'Markers'
+
+    @classmethod
+    def poll(cls, _context):
+        return bool(markerindex.get_imports())
+
+    def draw(self, context):
+        query = context.scene.jsbsim_marker_query
+        layout = self.layout
+        layout.use_property_split = True
+        layout.prop_search(query, 'target', bpy.data, 'collections')
+        layout.prop(query, 'section')
+        layout.prop(query, 'marker_type')
+        layout.prop(query, 'name')
+        layout.prop(query, 'use_weight')
+        column = layout.column(align=True)
+        column.active = query.use_weight
+        column.prop(query, 'weight_min')
+        column.prop(query, 'weight_max')
+        column.prop(query, 'weight_unit')
+        layout.prop(query, 'issues_only')
+        layout.prop(query, 'differences_only')
+        matches = sum(int(mask.sum()) for _, mask in query_markers(query))
+        layout.label(text=f'{matches} matching markers')
+        row = layout.row(align=True)
+        row.operator(SelectMarkers.bl_idname, icon='RESTRICT_SELECT_OFF')
+        row.operator(IsolateMarkers.bl_idname, icon='HIDE_OFF')
+        row.operator(ShowMarkers.bl_idname)
+
+
+classes = (
+    JSBSimMarkerQuery,
+    SelectMarkers,
+    IsolateMarkers,
+    ShowMarkers,
+    MarkersPanel,
+)
+
+
+def register():
+    for cls in classes:
+        register_class(cls)
+    bpy.types.Scene.jsbsim_marker_query = PointerProperty(type=JSBSimMarkerQuery)
+    markerindex.register()
+
+
+def unregister():
+    markerindex.unregister()
+    del bpy.types.Scene.jsbsim_marker_query
+    for cls in reversed(classes):
+        unregister_class(cls)
@@ -0,0 +1,201 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import math
+import bpy
+import numpy as np
+from mathutils import Euler
+
+NODE_GROUP_NAME = 'JSBSim Glyphs'
+# Values of the glyph attribute, in the shapes of the matching empties
+GLYPHS = ('SPHERE', 'CONE', 'CUBE', 'CIRCLE')
+# Item fields stored as point attributes, when a section has them
+ITEM_ATTRIBUTES = (
+    ('type', 'STRING'),
+    ('weight', 'FLOAT'),
+    ('weight_unit', 'STRING'),
+    ('capacity', 'FLOAT'),
+    ('capacity_unit', 'STRING'),
+)
+
+
+def new_glyph(nodes, links, glyph):
+    '''Add nodes building a glyph mesh the size of the empty it stands for.'''
+    if glyph == 'SPHERE':
+        mesh = nodes.new('GeometryNodeMeshUVSphere')
+        mesh.inputs['Segments'].default_value = 16
+        mesh.inputs['Rings'].default_value = 8
+        mesh.inputs['Radius'].default_value = 1.0
+        return mesh.outputs['Mesh']
+    if glyph == 'CUBE':
+        mesh = nodes.new('GeometryNodeMeshCube')
+        mesh.inputs['Size'].default_value = (2.0, 2.0, 2.0)
+        return mesh.outputs['Mesh']
+    transform = nodes.new('GeometryNodeTransform')
+    if glyph == 'CONE':
+        # Base on the origin and tip along +Y, like a cone empty
+        mesh = nodes.new('GeometryNodeMeshCone')
+        mesh.inputs['Vertices'].default_value = 16
+        mesh.inputs['Radius Top'].default_value = 0.0
+        mesh.inputs['Radius Bottom'].default_value = 1.0
+        mesh.inputs['Depth'].default_value = 2.0
+        transform.inputs['Rotation'].default_value = (-math.pi / 2, 0.0, 0.0)
+        transform.inputs['Translation'].default_value = (0.0, 1.0, 0.0)
+    else:
+        # In the XZ plane, like a circle empty
+        mesh = nodes.new('GeometryNodeMeshCircle')
+        mesh.inputs['Vertices'].default_value = 32
+        mesh.inputs['Radius'].default_value = 1.0
+        transform.inputs['Rotation'].default_value = (math.pi / 2, 0.0, 0.0)
+    links.new(mesh.outputs['Mesh'], transform.inputs['Geometry'])
+    return transform.outputs['Geometry']
+
+
+def new_named_attribute(nodes, name, data_type):
+    attribute = nodes.new('GeometryNodeInputNamedAttribute')
+    attribute.data_type = data_type
+    attribute.inputs['Name'].default_value = name
+    return attribute.outputs['Attribute']
+
+
+def get_node_group():
+    '''Return the node group instancing glyphs on points, built on first use.
+
+    Each point gets the glyph of its glyph attribute, turned by its rotation
+    attribute. It is scaled by the Scale input, or drawn at the size given
+    by its size attribute when that is positive.
+    '''
+    node_group = bpy.data.node_groups.get(NODE_GROUP_NAME)
+    if node_group is not None:
+        return node_group
+    node_group = bpy.data.node_groups.new(NODE_GROUP_NAME, 'GeometryNodeTree')
+    interface = node_group.interface
+    interface.new_socket('Geometry', in_out='INPUT', socket_type='NodeSocketGeometry')
+    scale = interface.new_socket('Scale', in_out='INPUT', socket_type='NodeSocketFloat')
+    scale.default_value = 0.25
+    scale.min_value = 0.0
+    interface.new_socket('Geometry', in_out='OUTPUT', socket_type='NodeSocketGeometry')
+    nodes = node_group.nodes
+    links = node_group.links
+    group_input = nodes.new('NodeGroupInput')
+    group_output = nodes.new('NodeGroupOutput')
+    join = nodes.new('GeometryNodeJoinGeometry')
+    links.new(join.outputs['Geometry'], group_output.inputs['Geometry'])
+    # Points with a size of their own ignore the Scale input
+    size = new_named_attribute(nodes, 'size', 'FLOAT')
+    has_size = nodes.new('FunctionNodeCompare')
+    has_size.data_type = 'FLOAT'
+    has_size.operation = 'GREATER_THAN'
+    links.new(size, has_size.inputs['A'])
+    switch = nodes.new('GeometryNodeSwitch')
+    switch.input_type = 'FLOAT'
+    links.new(has_size.outputs['Result'], switch.inputs['Switch'])
+    links.new(group_input.outputs['Scale'], switch.inputs['False'])
+    links.new(size, switch.inputs['True'])
+    rotation = new_named_attribute(nodes, 'rotation', 'QUATERNION')
+    glyph_index = new_named_attribute(nodes, 'glyph', 'INT')
+    for index, glyph in enumerate(GLYPHS):
+        selection = nodes.new('FunctionNodeCompare')
+        selection.data_type = 'INT'
+        selection.operation = 'EQUAL'
+        links.new(glyph_index, selection.inputs['A'])
+        selection.inputs['B'].default_value = index
+        instancer = nodes.new('GeometryNodeInstanceOnPoints')
+        links.new(group_input.outputs['Geometry'], instancer.inputs['Points'])
+        links.new(selection.outputs['Result'], instancer.inputs['Selection'])
+        links.new(new_glyph(nodes, links, glyph), instancer.inputs['Instance'])
+        links.new(rotation, instancer.inputs['Rotation'])
+        links.new(switch.outputs['Output'], instancer.inputs['Scale'])
+        links.new(instancer.outputs['Instances'], join.inputs['Geometry'])
+    return node_group
+
+
+def set_strings(attribute, values):
+    # foreach_set doesn't take strings, and string attributes hold bytes
+    for datum, value in zip(attribute.data, values):
+        datum.value = (value or '').encode()
+
+
+def set_glyph_attributes(attributes, items, unit_scale_length):
+    count = len(items)
+    glyphs = np.fromiter(
+        (GLYPHS.index(item.mesh_type) for item in items), np.int32, count
+    )
+    rotations = np.zeros((count, 4), dtype=np.float32)
+    rotations[:, 0] = 1.0
+    sizes = np.zeros(count, dtype=np.float32)
+    for row, item in enumerate(items):
+        if item.rotation is not None:
+            rotations[row] = Euler(item.rotation, 'YXZ').to_quaternion()
+        if item.display_size is not None:
+            sizes[row] = item.display_size / unit_scale_length
+    attributes.new('glyph', 'INT', 'POINT').data.foreach_set('value', glyphs)
+    attributes.new('rotation', 'QUATERNION', 'POINT').data.foreach_set(
+        'value', rotations.ravel()
+    )
+    attributes.new('size', 'FLOAT', 'POINT').data.foreach_set('value', sizes)
+
+
+def set_item_attributes(attributes, items):
+    set_strings(
+        attributes.new('name', 'STRING', 'POINT'),
+        [item.label for item in items]
+    )
+    # Typed like the markers' custom properties, unreadable numbers are None
+    fields = [item.fields for item in items]
+    for field, data_type in ITEM_ATTRIBUTES:
+        values = [item_fields.get(field) for item_fields in fields]
+        if all(value is None for value in values):
+            continue
+        attribute = attributes.new(field, data_type, 'POINT')
+        if data_type == 'STRING':
+            set_strings(attribute, values)
+        else:
+            attribute.data.foreach_set('value', np.array(
+                [math.nan if value is None else value for value in values],
+                dtype=np.float32
+            ))
+
+
+def new_point_cloud_mesh(name, items, positions, unit_scale_length):
+    '''Return a mesh with a point per item, at positions in scene units.
+
+    Labels and item fields are kept as point attributes, so they can be
+    inspected in the spreadsheet.
+    '''
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(items))
+    mesh.vertices.foreach_set(
+        'co', np.asarray(positions, dtype=np.float32).ravel()
+    )
+    set_glyph_attributes(mesh.attributes, items, unit_scale_length)
+    set_item_attributes(mesh.attributes, items)
+    return mesh
+
+
+def new_point_cloud(name, items, positions, plot_scale, unit_scale_length):
+    '''Return an object drawing a glyph on each item's point.'''
+    point_cloud = bpy.data.objects.new(
+        name, new_point_cloud_mesh(name, items, positions, unit_scale_length)
+    )
+    point_cloud.display_type = 'WIRE'
+    modifier = point_cloud.modifiers.new(NODE_GROUP_NAME, 'NODES')
+    node_group = get_node_group()
+    modifier.node_group = node_group
+    modifier[node_group.interface.items_tree['Scale'].identifier] = plot_scale
+    return point_cloud
@@ -0,0 +1,189 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from contextlib import contextmanager
+import gzip
+import os
+import zipfile
+import zlib
+
+from .xmlstream import read_root_tag
+
+# Where FDM and component files are read from: plain files, gzipped files
+# and members of zip archives, named like pkg.zip/c172/c172.xml
+ARCHIVE_SUFFIX = '.zip'
+# FDM and component files, plain or gzipped
+XML_SUFFIXES = ('.xml', '.xml.gz')
+# Raised reading unreadable or damaged files, a truncated gzip stream
+# raising EOFError, corrupt compressed data zlib.error and an archive
+# member failing its CRC check BadZipFile
+READ_ERRORS = (OSError, EOFError, zlib.error, zipfile.BadZipFile)
+
+# Open archives by path, with the stat they were opened at. Their central
+# directory is read once and reused for every member, until closed.
+archives = {}
+
+
+def is_archive(filepath):
+    return filepath.lower().endswith(ARCHIVE_SUFFIX)
+
+
+def is_xml(filepath):
+    return filepath.lower().endswith(XML_SUFFIXES)
+
+
+def split_archive_path(filepath):
+    '''Split an archive member path like pkg.zip/c172/c172.xml.
+
+    Return the archive path and the member name, or filepath and None if
+    filepath doesn't point into an archive.
+    '''
+    lower = filepath.lower()
+    start = 0
+    while True:
+        index = lower.find(ARCHIVE_SUFFIX, start) + len(ARCHIVE_SUFFIX)
+        if index < len(ARCHIVE_SUFFIX):
+            return filepath, None
+        if lower[index:index + 1] in ('/', os.sep) and os.path.isfile(
+            filepath[:index]
+        ):
+            member = filepath[index + 1:].replace(os.sep, '/')
+            return filepath[:index], os.path.normpath(member).replace(os.sep, '/')
+        start = index
+
+
+def get_archive(archive):
+    '''Return the open ZipFile of archive, opening it again if it changed.'''
+    stat = os.stat(archive)
+    key = (stat.st_mtime_ns, stat.st_size)
+    opened = archives.get(archive)
+    if opened is not None:
+        if opened[0] == key:
+            return opened[1]
+        opened[1].close()
+    try:
+        zip_file = zipfile.ZipFile(archive)  # pylint: disable=consider-using-with
+    except zipfile.BadZipFile as error:
+        raise OSError(f'Not a zip archive: {archive}') from error
+    archives[archive] = (key, zip_file)
+    return zip_file
+
+
+def close_archives():
+    '''Close the archives opened so far, so they can be changed on disk.'''
+    for _, zip_file in archives.values():
+        zip_file.close()
+    archives.clear()
+
+
+def get_member(archive, member):
+    '''Return the ZipFile of archive and the ZipInfo of its member.'''
+    zip_file = get_archive(archive)
+    try:
+        return zip_file, zip_file.getinfo(member)
+    except KeyError as error:
+        raise FileNotFoundError(f'No {member} in {archive}') from error
+
+
+def stat_source(filepath):
+    '''Return (mtime_ns, size) of a file or archive member, OSError if missing.
+
+    A member has the mtime of its archive, so it changes whenever the
+    archive is written to.
+    '''
+    archive, member = split_archive_path(filepath)
+    if member is None:
+        stat = os.stat(filepath)
+        return stat.st_mtime_ns, stat.st_size
+    _, info = get_member(archive, member)
+    mtime_ns, _ = archives[archive][0]
+    return mtime_ns, info.file_size
+
+
+def get_source_stat(filepath):
+    '''Return a string that changes whenever filepath is written to.'''
+    mtime_ns, size = stat_source(filepath)
+    return f'{mtime_ns}:{size}'
+
+
+@contextmanager
+def open_source(filepath):
+    '''Open a file or archive member for streaming, gzip decompressed.'''
+    archive, member = split_archive_path(filepath)
+    if member is None:
+        stream = open(filepath, 'rb')  # pylint: disable=consider-using-with
+    else:
+        zip_file, info = get_member(archive, member)
+        stream = zip_file.open(info)
+    with stream:
+        if filepath.lower().endswith('.gz'):
+            with gzip.GzipFile(fileobj=stream, mode='rb') as gzip_stream:
+                yield gzip_stream
+        else:
+            yield stream
+
+
+def list_archive(archive):
+    '''Return the member paths of the XML files in archive.'''
+    return [
+        os.path.join(archive, info.filename)
+        for info in get_archive(archive).infolist()
+        if not info.is_dir() and is_xml(info.filename)
+    ]
+
+
+def is_fdm_file(filepath):
+    '''Tell FDM files apart from engine, system and other JSBSim XML files.'''
+    with open_source(filepath) as stream:
+        return read_root_tag(stream) == 'fdm_config'
+
+
+def find_archive_fdm_files(archive):
+    '''Return the FDM files in a zip archive, like FlightGear packages.
+
+    Damaged members are skipped with a warning.
+    '''
+    filepaths = []
+    for filepath in list_archive(archive):
+        try:
+            if is_fdm_file(filepath):
+                filepaths.append(filepath)
+        except READ_ERRORS as error:
+            print('JSBSim warning: Unreadable archive member [', filepath, error, ']')
+    return sorted(filepaths)
+
+
+def find_fdm_files(directory, recursive=False):
+    filepaths = []
+    for root, dirs, files in os.walk(directory):
+        for name in files:
+            filepath = os.path.join(root, name)
+            if is_archive(name):
+                try:
+                    filepaths.extend(find_archive_fdm_files(filepath))
+                except OSError as error:
+                    print('JSBSim warning: Unreadable archive [', filepath, error, ']')
+            elif is_xml(name):
+                try:
+                    if is_fdm_file(filepath):
+                        filepaths.append(filepath)
+                except READ_ERRORS as error:
+                    print('JSBSim warning: Unreadable file [', filepath, error, ']')
+        if not recursive:
+            dirs.clear()
+    return sorted(filepaths)
@@ -0,0 +1,150 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import math
+import bpy
+import numpy as np
+
+from .markerindex import FIELD_PREFIX
+
+# Each table is fitted in a cube of this size, in scene units
+TABLE_SIZE = 1.0
+# Distance between the cubes of two neighbouring tables
+TABLE_SPACING = 1.5
+
+
+def get_grid_points(rows, columns, values):
+    '''Return a (rows * columns, 3) array of row, column and value.'''
+    grid_rows, grid_columns = np.meshgrid(rows, columns, indexing='ij')
+    return np.column_stack((grid_rows.ravel(), grid_columns.ravel(), values.ravel()))
+
+
+def get_grid_quads(row_count, column_count, first=0):
+    '''Return the (n, 4) vertex indexes of the quads of a vertex grid.'''
+    rows, columns = np.meshgrid(
+        np.arange(row_count - 1), np.arange(column_count - 1), indexing='ij'
+    )
+    corners = (rows * column_count + columns).ravel() + first
+    return np.stack(
+        (corners, corners + column_count, corners + column_count + 1, corners + 1),
+        axis=1
+    )
+
+
+def get_slices(table):
+    '''Return the (rows, columns, values) of each 2D slice of a table.'''
+    if table.dimensions == 2:
+        return [(table.rows, table.columns, table.values)]
+    return list(zip(table.rows, table.columns, table.values))
+
+
+def new_table_curve(name, table):
+    '''Return a curve through a 1D table, breakpoints along X and values along Z.'''
+    curve = bpy.data.curves.new(name, 'CURVE')
+    curve.dimensions = '3D'
+    spline = curve.splines.new('POLY')
+    spline.points.add(len(table.rows) - 1)
+    points = np.zeros((len(table.rows), 4), dtype=np.float32)
+    points[:, 0] = table.rows
+    points[:, 2] = table.values
+    points[:, 3] = 1.0  # weight
+    spline.points.foreach_set('co', points.ravel())
+    return curve
+
+
+def new_table_mesh(name, table):
+    '''Return the surface of a 2D table, or one per breakpoint of a 3D table.
+
+    Rows go along X, columns along Y and values along Z. Each point of a 3D
+    table keeps its breakpoint in the breakpoint point attribute.
+    '''
+    slices = get_slices(table)
+    points = []
+    quads = []
+    sizes = []
+    for rows, columns, values in slices:
+        quads.append(get_grid_quads(len(rows), len(columns), sum(sizes)))
+        points.append(get_grid_points(rows, columns, values))
+        sizes.append(len(points[-1]))
+    points = np.concatenate(points).astype(np.float32)
+    quads = np.concatenate(quads).astype(np.int32)
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(points))
+    mesh.vertices.foreach_set('co', points.ravel())
+    mesh.loops.add(quads.size)
+    mesh.loops.foreach_set('vertex_index', quads.ravel())
+    mesh.polygons.add(len(quads))
+    mesh.polygons.foreach_set(
+        'loop_start', np.arange(0, quads.size, 4, dtype=np.int32)
+    )
+    mesh.update(calc_edges=True)
+    if table.breakpoints is not None:
+        mesh.attributes.new('breakpoint', 'FLOAT', 'POINT').data.foreach_set(
+            'value', np.repeat(table.breakpoints, sizes).astype(np.float32)
+        )
+    return mesh
+
+
+def get_extent(axis):
+    '''Return the lowest and highest number of an array, or of a list of them.'''
+    if isinstance(axis, list):
+        axis = np.concatenate([part.ravel() for part in axis])
+    return axis.min(), axis.max()
+
+
+def get_bounds(table):
+    '''Return the lowest and highest row, column and value of a table.'''
+    extents = [
+        get_extent(table.rows),
+        (0.0, 0.0) if table.columns is None else get_extent(table.columns),
+        get_extent(table.values),
+    ]
+    low, high = np.array(extents).T
+    return low, high
+
+
+def new_table_object(name, table, corner):
+    '''Return an object drawing a table, fitted in the cube at corner.
+
+    Its points keep the table's own numbers, the object's scale and
+    location fit them in the cube.
+    '''
+    data = new_table_curve if table.dimensions == 1 else new_table_mesh
+    table_object = bpy.data.objects.new(name, data(name, table))
+    low, high = get_bounds(table)
+    span = high - low
+    span[span == 0.0] = 1.0
+    scale = TABLE_SIZE / span
+    table_object.scale = scale.tolist()
+    table_object.location = (np.asarray(corner) - low * scale).tolist()
+    table_object[f'{FIELD_PREFIX}table'] = table.name
+    for field in ('function', 'axis'):
+        if getattr(table, field) is not None:
+            table_object[f'{FIELD_PREFIX}{field}'] = getattr(table, field)
+    for lookup, variable in table.variables.items():
+        table_object[f'{FIELD_PREFIX}{lookup}_variable'] = variable
+    return table_object
+
+
+def get_table_corners(count):
+    '''Return the corners of count table cubes, laid out in a square grid.'''
+    columns = max(math.ceil(math.sqrt(count)), 1)
+    return [
+        (index % columns * TABLE_SPACING, index // columns * TABLE_SPACING, 0.0)
+        for index in range(count)
+    ]
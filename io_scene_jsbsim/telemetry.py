@@ -0,0 +1,176 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import math
+import re
+import numpy as np
+
+from .fdm import ANGLE_SCALES, LENGTH_SCALES
+
+# The unit of a column, as JSBSim writes it: 'Psi (deg)' or 'attitude/psi-deg'
+COLUMN_UNIT = re.compile(r'\((\w+)\)\s*$|-(\w+)$')
+# WGS84 semi-major axis in meters and first eccentricity squared
+WGS84_A = 6378137.0
+WGS84_E2 = 6.69437999014e-3
+SQRT_HALF = math.sqrt(0.5)
+# Blender's world, X east, Y north and Z up, from JSBSim's local NED frame
+WORLD_FROM_NED = np.array((0.0, SQRT_HALF, SQRT_HALF, 0.0))
+# JSBSim's body frame, X forward and Z down, from the structural frame of
+# the plotted markers, X aft and Z up
+BODY_FROM_STRUCTURAL = np.array((0.0, 0.0, 1.0, 0.0))
+# Samples always kept when decimating, bounding how long a span can be
+DECIMATE_WINDOW = 4096
+
+
+def read_columns(filepath, names):
+    '''Read the columns called names out of a JSBSim CSV or tab separated log.
+
+    Only those columns are converted, by NumPy's C reader streaming the
+    file. Return a (rows, len(names)) float array.
+    '''
+    with open(filepath, 'r', encoding='utf-8', newline='') as stream:
+        header = stream.readline()
+        delimiter = ',' if ',' in header else '\t'
+        headers = [name.strip() for name in header.split(delimiter)]
+        missing = [name for name in names if name not in headers]
+        if missing:
+            raise ValueError(f'Missing columns: {", ".join(missing)}')
+        return np.loadtxt(
+            stream,
+            delimiter=delimiter,
+            usecols=[headers.index(name) for name in names],
+            dtype=np.float64,
+            ndmin=2
+        )
+
+
+def get_scale(name, scales, default):
+    '''Return the scale into SI units of a column, from the unit in its name.'''
+    match = COLUMN_UNIT.search(name)
+    unit = match and (match.group(1) or match.group(2))
+    if unit is None or unit.upper() not in scales:
+        return scales[default]
+    return scales[unit.upper()]
+
+
+def get_angles(data, names):
+    '''Return columns of data in radians, scaled by the units in their names.'''
+    return data * [get_scale(name, ANGLE_SCALES, 'DEG') for name in names]
+
+
+def get_lengths(data, names):
+    '''Return columns of data in meters, scaled by the units in their names.'''
+    return data * [get_scale(name, LENGTH_SCALES, 'FT') for name in names]
+
+
+def geodetic_to_local(latitude, longitude, altitude):
+    '''Return (n, 3) east, north and up positions in meters.
+
+    East and north are measured from the first position, on the plane
+    tangent to the WGS84 ellipsoid there. Up is the altitude itself.
+    Latitude and longitude are in radians, altitude in meters.
+    '''
+    longitude = np.unwrap(longitude)  # across the antimeridian
+    sin_latitude = math.sin(latitude[0])
+    w = math.sqrt(1.0 - WGS84_E2 * sin_latitude ** 2)
+    north_radius = WGS84_A * (1.0 - WGS84_E2) / w ** 3 + altitude[0]
+    east_radius = (WGS84_A / w + altitude[0]) * math.cos(latitude[0])
+    return np.column_stack((
+        (longitude - longitude[0]) * east_radius,
+        (latitude - latitude[0]) * north_radius,
+        altitude
+    ))
+
+
+def multiply_quaternions(first, second):
+    '''Return the Hamilton products of (..., 4) w, x, y, z quaternions.'''
+    w1, x1, y1, z1 = np.moveaxis(np.asarray(first), -1, 0)
+    w2, x2, y2, z2 = np.moveaxis(np.asarray(second), -1, 0)
+    return np.stack((
+        w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+        w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+        w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+        w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+    ), axis=-1)
+
+
+def get_axis_quaternions(angles, axis):
+    quaternions = np.zeros((len(angles), 4))
+    quaternions[:, 0] = np.cos(angles / 2)
+    quaternions[:, axis] = np.sin(angles / 2)
+    return quaternions
+
+
+def attitude_to_world(roll, pitch, yaw):
+    '''Return (n, 4) quaternions turning the structural frame to its attitude.
+
+    Roll, pitch and yaw are JSBSim's Euler angles in radians, applied in
+    yaw, pitch, roll order. Consecutive quaternions are kept in the same
+    hemisphere, so interpolating between keyframes takes the short way.
+    '''
+    quaternions = multiply_quaternions(
+        multiply_quaternions(
+            multiply_quaternions(WORLD_FROM_NED, get_axis_quaternions(yaw, 3)),
+            get_axis_quaternions(pitch, 2)
+        ),
+        multiply_quaternions(get_axis_quaternions(roll, 1), BODY_FROM_STRUCTURAL)
+    )
+    flips = np.einsum('ij,ij->i', quaternions[1:], quaternions[:-1]) < 0.0
+    signs = np.concatenate(((1.0,), np.where(flips, -1.0, 1.0))).cumprod()
+    return quaternions * signs[:, np.newaxis]
+
+
+def decimate(times, values, tolerance):
+    '''Return the indexes of the samples to keep as keyframes.
+
+    Ramer-Douglas-Peucker on (n, k) values over times: a sample is dropped
+    when linear interpolation between the kept ones is off by at most
+    tolerance in every column. Every span still off is split in the same
+    NumPy pass, so a pass costs the same for one span or thousands. Long
+    logs are decimated in windows of DECIMATE_WINDOW samples, otherwise a
+    curve going round and round takes a pass for every few samples.
+    '''
+    count = len(times)
+    if tolerance <= 0.0 or count < 3:
+        return np.arange(count)
+    keep = np.zeros(count, dtype=bool)
+    keep[::DECIMATE_WINDOW] = True
+    keep[-1] = True
+    checked = np.flatnonzero(~keep)  # samples of the spans to split
+    while len(checked):
+        kept = np.flatnonzero(keep)
+        spans = np.searchsorted(kept, checked) - 1
+        first = kept[spans]
+        last = kept[spans + 1]
+        durations = times[last] - times[first]
+        durations[durations == 0.0] = 1.0
+        shares = (times[checked] - times[first]) / durations
+        chords = values[first] + shares[:, np.newaxis] * (values[last] - values[first])
+        errors = np.abs(values[checked] - chords).max(axis=1)
+        # checked is sorted, so the samples of a span are contiguous
+        starts = np.flatnonzero(np.diff(spans, prepend=-1))
+        worst_errors = np.maximum.reduceat(errors, starts)
+        is_worst = errors == np.repeat(worst_errors, np.diff(starts, append=len(spans)))
+        worst = np.flatnonzero(is_worst)
+        worst = worst[np.diff(spans[worst], prepend=-1) != 0]  # first of ties
+        split = worst[errors[worst] > tolerance]
+        keep[checked[split]] = True
+        is_split = np.zeros(len(kept), dtype=bool)
+        is_split[spans[split]] = True
+        checked = checked[is_split[spans] & ~keep[checked]]
+    return np.flatnonzero(keep)
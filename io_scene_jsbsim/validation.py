@@ -0,0 +1,131 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from collections import namedtuple
+from mathutils.kdtree import KDTree
+import numpy as np
+
+ISSUE_PROPERTY = 'jsbsim_issue'
+# Modified z-score above which a location is an outlier, as recommended
+# by Iglewicz and Hoaglin. 0.6745 scales the MAD to a standard deviation.
+OUTLIER_THRESHOLD = 3.5
+MAD_SCALE = 0.6745
+# Too few locations don't make a distribution to compare against
+OUTLIER_MIN_LOCATIONS = 8
+# Issues listed in the operator report, the rest only in the console
+REPORTED_ISSUES = 10
+
+Issue = namedtuple('Issue', ('tag', 'row', 'label', 'text'))
+
+
+def is_pair(items, row, other_row):
+    '''Tell if two items sit together by design, like an engine and its thruster.'''
+    return items[row].parent == other_row or items[other_row].parent == row
+
+
+def find_duplicates(sections, tolerance):
+    '''Yield an Issue per location within tolerance of an earlier one.
+
+    A single KD-tree holds every location, but only locations of the same
+    section count as duplicates: a CG on the reference point is fine.
+    Every cluster is looked up once, from its first location.
+    '''
+    tags = list(sections)
+    coords = np.concatenate([sections[tag].coords for tag in tags]).reshape(-1, 3)
+    owners = [(tag, row) for tag in tags for row in range(len(sections[tag].items))]
+    tree = KDTree(len(coords))
+    for index, co in enumerate(coords.tolist()):
+        tree.insert(co, index)
+    tree.balance()
+    found = np.zeros(len(coords), dtype=bool)
+    for index, co in enumerate(coords.tolist()):
+        if found[index]:
+            continue
+        tag, row = owners[index]
+        items = sections[tag].items
+        for _, other, distance in tree.find_range(co, tolerance):
+            other_tag, other_row = owners[other]
+            if (
+                other <= index
+                or found[other]
+                or other_tag != tag
+                or is_pair(items, row, other_row)
+            ):
+                continue
+            found[other] = True
+            yield Issue(
+                tag,
+                other_row,
+                items[other_row].label,
+                f'duplicate of {items[row].label}, {distance * 1000:.1f} mm away'
+            )
+
+
+def find_outliers(sections):
+    '''Yield an Issue per location far out of the others, like a unit mistake.
+
+    Distances to the median location are scored against their median
+    absolute deviation, which the outliers themselves barely move.
+    '''
+    tags = list(sections)
+    coords = np.concatenate([sections[tag].coords for tag in tags]).reshape(-1, 3)
+    if len(coords) < OUTLIER_MIN_LOCATIONS:
+        return
+    distances = np.linalg.norm(coords - np.median(coords, axis=0), axis=1)
+    median = np.median(distances)
+    mad = np.median(np.abs(distances - median))
+    if mad == 0.0:
+        return
+    scores = MAD_SCALE * (distances - median) / mad
+    owners = [(tag, row) for tag in tags for row in range(len(sections[tag].items))]
+    for index in np.flatnonzero(scores > OUTLIER_THRESHOLD):
+        tag, row = owners[index]
+        yield Issue(
+            tag,
+            row,
+            sections[tag].items[row].label,
+            f'outlier, {distances[index]:.2f} m from the median location'
+        )
+
+
+def find_issues(sections, tolerance):
+    '''Return the duplicate and outlier Issues of sections, by (tag, row).'''
+    sections = {tag: section for tag, section in sections.items() if section.items}
+    if not sections:
+        return {}
+    issues = {}
+    for issue in (*find_duplicates(sections, tolerance), *find_outliers(sections)):
+        key = (issue.tag, issue.row)
+        if key in issues:
+            issue = issue._replace(text=f'{issues[key].text}; {issue.text}')
+        issues[key] = issue
+    return issues
+
+
+def get_report_lines(issues):
+    '''Return a line per issue, the first REPORTED_ISSUES of them.'''
+    lines = [
+        f'{issue.label}: {issue.text}'
+        for issue in list(issues.values())[:REPORTED_ISSUES]
+    ]
+    if len(issues) > REPORTED_ISSUES:
+        lines.append(
+            f'...and {len(issues) - REPORTED_ISSUES} more, '
+            'listed in the system console'
+        )
+    return lines
@@ -0,0 +1,134 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from operator import attrgetter
+from os import path
+import numpy as np
+
+from .fdm import ITEM_TYPES, get_slots
+
+DIFFERENCE_PROPERTY = 'jsbsim_difference'
+# Root collection property listing the files of a comparison's variants
+VARIANTS_PROPERTY = 'jsbsim_variants'
+# Everything an item was parsed into but its row and its parent's row, which
+# differ between variants with an item more or less earlier in the section
+VALUES = {
+    item_type: attrgetter(*(
+        slot for slot in get_slots(item_type) if slot not in ('row', 'parent')
+    ))
+    for item_type in ITEM_TYPES.values()
+}
+
+
+def get_values(item):
+    return type(item), VALUES[type(item)](item)
+
+
+def get_variant_names(filepaths, reserved=()):
+    '''Return a name per variant, its file name numbered if already taken.'''
+    names = []
+    for filepath in filepaths:
+        name = base = path.basename(filepath).split('.xml')[0]
+        count = 1
+        while name in names or name in reserved:
+            count += 1
+            name = f'{base} ({count})'
+        names.append(name)
+    return names
+
+
+def diff_section(sections, tolerance):
+    '''Compare one section across variants, matching its items by key.
+
+    sections holds the section of each variant, None where it is missing.
+    An item is shared when every variant has its key, with the same values
+    and locations within tolerance meters of the first variant's. Return
+    the rows of the shared items in the first section, and for each
+    variant the rows of its other items with what differs about them.
+    '''
+    differences = [{} for _ in sections]
+    keys = [[] if section is None else section.get_keys() for section in sections]
+    rows = [{key: row for row, key in enumerate(section_keys)} for section_keys in keys]
+    shared = [key for key in keys[0] if all(key in other for other in rows[1:])]
+    indexes = np.array(
+        [[section_rows[key] for key in shared] for section_rows in rows],
+        dtype=np.int64
+    ).reshape(len(sections), len(shared))
+    changed = np.zeros(len(shared), dtype=bool)
+    spreads = np.zeros(len(shared))
+    if shared:
+        coords = np.stack([
+            section.coords[section_indexes]
+            for section, section_indexes in zip(sections, indexes)
+        ])
+        spreads = np.linalg.norm(coords - coords[0], axis=2).max(axis=0)
+        values = [get_values(item) for item in sections[0].items]
+        for section, section_indexes in zip(sections[1:], indexes[1:]):
+            changed |= [
+                get_values(section.items[row]) != values[first_row]
+                for row, first_row in zip(section_indexes.tolist(), indexes[0].tolist())
+            ]
+    is_common = ~changed & (spreads <= tolerance)
+    paired = unshare_pairs(sections, indexes, is_common)
+    for column in np.flatnonzero(~is_common).tolist():
+        texts = ['values differ'] if changed[column] else []
+        if spreads[column] > tolerance:
+            texts.append(f'moved up to {spreads[column] * 1000:.1f} mm')
+        if paired[column] and not texts:
+            texts.append('parent or child differs')
+        for variant, row in enumerate(indexes[:, column].tolist()):
+            differences[variant][row] = ', '.join(texts)
+    shared = set(shared)
+    for variant, section_keys in enumerate(keys):
+        for row, key in enumerate(section_keys):
+            if key not in shared:
+                count = sum(key in other for other in rows)
+                differences[variant][row] = f'in {count} of {len(sections)} variants'
+    return indexes[0][is_common], differences
+
+
+def unshare_pairs(sections, indexes, is_common):
+    '''Unshare the items whose parent or children aren't shared, in place.
+
+    An engine and its thrusters are then shared together or not at all,
+    so they can always be parented to each other. Return which of the
+    shared keys were unshared for it.
+    '''
+    paired = np.zeros(len(is_common), dtype=bool)
+    # (column of the child, column of the parent), None for unshared keys
+    pairs = []
+    for section, section_indexes in zip(sections, indexes):
+        if section is None:
+            continue
+        columns = {row: column for column, row in enumerate(section_indexes.tolist())}
+        pairs += [
+            (columns.get(item.row), columns.get(item.parent))
+            for item in section.items
+            if item.parent is not None
+        ]
+    unshared = True
+    while unshared:
+        unshared = False
+        for pair in pairs:
+            if all(column is not None and is_common[column] for column in pair):
+                continue
+            for column in pair:
+                if column is not None and is_common[column]:
+                    is_common[column] = False
+                    paired[column] = unshared = True
+    return paired
@@ -0,0 +1,176 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import os
+import re
+import shutil
+import tempfile
+
+from .fdm import LENGTH_SCALES
+from .sources import open_source
+from .xmlstream import SectionFilter
+
+# A <location> and its body, found in document order. Comments, CDATA
+# and processing instructions are matched first so nothing in them counts.
+LOCATION = re.compile(
+    rb'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>'
+    rb'|<location(?=[\s/>])(?P<attributes>[^>]*?)'
+    rb'(?:/>|>(?P<body>.*?)</location\s*>)',
+    re.S
+)
+COORDINATE = re.compile(
+    rb'<!--.*?-->|<(?P<axis>[xyz])(?:\s[^>]*)?>(?P<value>[^<]*)</(?P=axis)\s*>',
+    re.S
+)
+UNIT = re.compile(rb'\bunit\s*=\s*(["\'])(?P<unit>.*?)\1')
+AXES = (b'x', b'y', b'z')
+# Coordinates closer than this in meters to the file's are left alone
+MOVED_TOLERANCE = 1e-4
+# Decimals written at least, so a rewritten number is within the tolerance
+MIN_DECIMALS = 4
+
+
+def format_number(value, text):
+    '''Return value as bytes, with at least the decimals of text it replaces.'''
+    if b'.' not in text and float(value).is_integer():
+        return str(int(value)).encode()
+    decimals = len(text.partition(b'.')[2]) if b'e' not in text.lower() else 0
+    # Adding zero turns -0.0 into 0.0
+    return repr(round(value, max(decimals, MIN_DECIMALS)) + 0.0).encode()
+
+
+def edit_location(body, unit, position, tolerance):
+    '''Return the (start, end, number) splices moving a <location> body.
+
+    position is in meters, only the coordinates it moves are rewritten.
+    '''
+    scale = LENGTH_SCALES[unit]
+    splices = []
+    for match in COORDINATE.finditer(body):
+        if match.group('axis') is None:
+            continue
+        text = match.group('value').strip()
+        try:
+            previous = float(text)
+        except ValueError:
+            continue
+        meters = float(position[AXES.index(match.group('axis'))])
+        if abs(meters - previous * scale) <= tolerance:
+            continue
+        start = match.start('value') + match.group('value').index(text)
+        splices.append(
+            (start, start + len(text), format_number(meters / scale, text))
+        )
+    return splices
+
+
+class LocationEditor(SectionFilter):
+    '''Stream an FDM document through, with some of its locations moved.
+
+    Everything but the rewritten numbers is passed on byte for byte.
+    Sections before the last edited one are only searched for their end
+    tag, an edited section is only scanned up to its last edited location,
+    and the rest of the file is copied as is.
+    '''
+
+    def __init__(self, stream, edits, tolerance=MOVED_TOLERANCE):
+        super().__init__(stream, set(edits))
+        # tag -> {location number: (x, y, z) in meters}
+        self.edits = edits
+        self.tolerance = tolerance
+        self.edited = set()  # tags done, later sections of a tag aren't parsed
+        self.changed = 0  # numbers rewritten
+        self.missing = []  # (tag, location number) not found or not editable
+
+    def __iter__(self):
+        if self.edits:
+            for chunk in super().__iter__():
+                yield chunk
+                # Only ever true right after an edited section, once the
+                # buffer holds nothing but what follows it
+                if self.edited == set(self.edits):
+                    break
+        for tag in set(self.edits) - self.edited:
+            self.missing += [(tag, number) for number in sorted(self.edits[tag])]
+        yield self.buffer
+        self.buffer = b''
+        while chunk := self.stream.read(self.chunk_size):
+            yield chunk
+
+    def top_section(self, match, name):
+        tag = name.decode()
+        if tag not in self.edits or tag in self.edited:
+            yield from self.section(match, name, True)
+            return
+        self.edited.add(tag)
+        yield self.edit_section(tag, b''.join(self.section(match, name, True)))
+
+    def edit_section(self, tag, section):
+        edits = self.edits[tag]
+        last = max(edits)
+        pieces = []
+        done = 0
+        number = -1
+        found = set()
+        for match in LOCATION.finditer(section):
+            if match.group('attributes') is None:
+                continue
+            number += 1
+            if number in edits and match.group('body') is not None:
+                unit = UNIT.search(match.group('attributes'))
+                unit = unit and unit.group('unit').decode()
+                if unit in LENGTH_SCALES:
+                    found.add(number)
+                    body_start = match.start('body')
+                    for start, end, text in edit_location(
+                        match.group('body'), unit, edits[number], self.tolerance
+                    ):
+                        pieces += (section[done:body_start + start], text)
+                        done = body_start + end
+                        self.changed += 1
+            if number >= last:
+                break
+        self.missing += [(tag, number) for number in sorted(set(edits) - found)]
+        pieces.append(section[done:])
+        return b''.join(pieces)
+
+
+def write_edits(source, filepath, edits, tolerance=MOVED_TOLERANCE):
+    '''Write source to filepath with the locations in edits moved.
+
+    The file is written next to filepath and then moved over it, so source
+    and filepath may be the same file. Return the LocationEditor, which
+    counts what was changed and what wasn't found.
+    '''
+    directory = os.path.dirname(os.path.abspath(filepath))
+    with open_source(source) as stream:
+        editor = LocationEditor(stream, edits, tolerance)
+        with tempfile.NamedTemporaryFile(
+            'wb', dir=directory, suffix='.xml', delete=False
+        ) as output:
+            try:
+                for chunk in editor:
+                    output.write(chunk)
+            except BaseException:
+                output.close()
+                os.remove(output.name)
+                raise
+    if os.path.exists(filepath):
+        shutil.copymode(filepath, output.name)
+    os.replace(output.name, filepath)
+    return editor
@@ -0,0 +1,233 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import hashlib
+import re
+import xml.etree.ElementTree as ET
+
+
+CHUNK_SIZE = 1 << 16
+MARKUP = re.compile(
+    rb'<(?:(?P<comment>!--)|(?P<cdata>!\[CDATA\[)|(?P<pi>\?)|(?P<decl>!)'
+    rb'|(?P<close>/)|(?P<name>[A-Za-z_][\w.:-]*))'
+)
+MARKUP_ENDS = {
+    'comment': re.compile(rb'-->'),
+    'cdata': re.compile(rb'\]\]>'),
+    'pi': re.compile(rb'\?>'),
+}
+# Runs a tag or declaration end can't occur in, by the token opening them
+SKIPPED = {
+    b'"': re.compile(rb'"'),
+    b"'": re.compile(rb"'"),
+    b'<!--': MARKUP_ENDS['comment'],
+    b'<?': MARKUP_ENDS['pi'],
+}
+TAG_END = re.compile(rb'["\']|/?>')
+DECL_END = re.compile(rb'["\'\[\]>]|<!--|<\?')
+
+
+class SectionFilter:
+    '''Stream an FDM document minus the top-level sections that are not needed.
+
+    Only the prolog, the root element and the sections listed in tags are
+    passed on, so skipped sections such as <aerodynamics> or <system> cost
+    a few C-level searches instead of being parsed into elements.
+    '''
+
+    def __init__(self, stream, tags, chunk_size=CHUNK_SIZE, unchanged=None):
+        self.stream = stream
+        self.tags = tags
+        # tag -> digest of sections to drop if their bytes still hash to it
+        self.unchanged = unchanged
+        self.chunk_size = chunk_size
+        self.buffer = b''
+        self.eof = False
+        self.digests = {}  # tag -> hash of the kept section's bytes
+
+    def fill(self):
+        chunk = self.stream.read(self.chunk_size)
+        if chunk:
+            self.buffer += chunk
+        else:
+            self.eof = True
+
+    def take(self, size, keep):
+        while len(self.buffer) < size and not self.eof:
+            self.fill()
+        if keep:
+            yield self.buffer[:size]
+        self.buffer = self.buffer[size:]
+
+    def until(self, pattern, keep, tail=64):
+        '''Advance the buffer to the next match of pattern and return it.
+
+        A match is only trusted once tail bytes past its start are buffered,
+        so a token split across chunks is never mistaken for a shorter one.
+        '''
+        while True:
+            match = pattern.search(self.buffer)
+            if match is not None and (self.eof or (
+                match.end() < len(self.buffer)
+                and match.start() + tail <= len(self.buffer)
+            )):
+                yield from self.take(match.start(), keep)
+                return pattern.match(self.buffer)
+            if self.eof:
+                raise ET.ParseError('JSBSim error: unexpected end of file')
+            cut = len(self.buffer) - tail if match is None else match.start()
+            if cut > 0:
+                yield from self.take(cut, keep)
+            self.fill()
+
+    def token(self, pattern, keep):
+        '''Pass over the next match of pattern and return it.
+
+        Quoted values, and comments or processing instructions where pattern
+        finds them, are passed over whole, so a '>' inside one is not a match.
+        '''
+        while True:
+            match = yield from self.until(pattern, keep)
+            token = match.group()
+            yield from self.take(match.end(), keep)
+            if token not in SKIPPED:
+                return token
+            end = yield from self.until(SKIPPED[token], keep)
+            yield from self.take(end.end(), keep)
+
+    def skip_markup(self, match, keep):
+        kind = match.lastgroup
+        yield from self.take(match.end(), keep)
+        if kind == 'decl':
+            yield from self.declaration(keep)
+            return
+        end = yield from self.until(MARKUP_ENDS[kind], keep)
+        yield from self.take(end.end(), keep)
+
+    def declaration(self, keep):
+        '''Pass over the rest of a declaration such as <!DOCTYPE ... [ ... ]>.'''
+        depth = 0  # inside the [ ... ] internal subset
+        while True:
+            token = yield from self.token(DECL_END, keep)
+            if token == b'[':
+                depth += 1
+            elif token == b']':
+                depth -= 1
+            elif not depth:
+                return
+
+    def start_tag(self, keep):
+        '''Pass over the rest of a start tag, returning True if self-closing.'''
+        return (yield from self.token(TAG_END, keep)) == b'/>'
+
+    def element(self, name, keep):
+        pattern = re.compile(
+            rb'<(?:(?P<comment>!--)|(?P<cdata>!\[CDATA\[)|(?P<close>/)?'
+            + re.escape(name) + rb'(?=[\s/>]))'
+        )
+        depth = 1
+        while depth:
+            match = yield from self.until(pattern, keep, tail=len(name) + 16)
+            if match.group('comment') or match.group('cdata'):
+                yield from self.skip_markup(match, keep)
+            elif match.group('close'):
+                depth -= 1
+                yield from self.start_tag(keep)
+            else:
+                yield from self.take(match.end(), keep)
+                self_closing = yield from self.start_tag(keep)
+                depth += not self_closing
+
+    def section(self, match, name, keep):
+        yield from self.take(match.end(), keep)
+        if not (yield from self.start_tag(keep)):
+            yield from self.element(name, keep)
+
+    def digest(self, tag, chunks):
+        '''Pass chunks on, hashing them into digests[tag].
+
+        A section that may be unchanged is held back until its digest is
+        known, and dropped if it matches.
+        '''
+        digest = hashlib.blake2b(digest_size=16)
+        if self.unchanged is None or tag not in self.unchanged:
+            for chunk in chunks:
+                digest.update(chunk)
+                yield chunk
+            self.digests.setdefault(tag, digest.hexdigest())
+            return
+        held = []
+        for chunk in chunks:
+            digest.update(chunk)
+            held.append(chunk)
+        self.digests.setdefault(tag, digest.hexdigest())
+        if self.digests[tag] != self.unchanged[tag]:
+            yield from held
+
+    def top_section(self, match, name):
+        '''Pass a top-level section on if its tag is wanted, else drop it.'''
+        tag = name.decode()
+        if tag in self.tags:
+            yield from self.digest(tag, self.section(match, name, True))
+        else:
+            yield from self.section(match, name, False)
+
+    def prolog(self, keep):
+        '''Pass over the prolog, returning the match of the first tag.'''
+        while True:
+            match = yield from self.until(MARKUP, keep)
+            if match.lastgroup in ('name', 'close'):
+                return match
+            yield from self.skip_markup(match, keep)
+
+    def __iter__(self):
+        # Prolog and root start tag are passed on untouched
+        match = yield from self.prolog(True)
+        yield from self.take(match.end(), True)
+        if (yield from self.start_tag(True)):
+            return
+        # Top-level sections, kept or dropped as a whole
+        while True:
+            match = yield from self.until(MARKUP, True)
+            if match.lastgroup == 'close':
+                break
+            if match.lastgroup != 'name':
+                yield from self.skip_markup(match, True)
+                continue
+            yield from self.top_section(match, match.group('name'))
+        # Root end tag and epilog
+        while not self.eof:
+            self.fill()
+        yield self.buffer
+        self.buffer = b''
+
+
+def read_root_tag(stream, chunk_size=4096):
+    '''Return the root element name of an XML stream, None if there is none.
+
+    Only the prolog is read, however long its comments and declarations.
+    '''
+    prolog = SectionFilter(stream, (), chunk_size).prolog(False)
+    try:
+        while True:
+            next(prolog)  # nothing is kept, so nothing is passed on
+    except StopIteration as stop:
+        match = stop.value
+        return match.group('name').decode() if match.lastgroup == 'name' else None
+    except ET.ParseError:
+        return None
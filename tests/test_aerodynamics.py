@@ -0,0 +1,86 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import xml.etree.ElementTree as ET
+
+import numpy as np
+import pytest
+
+from io_scene_jsbsim.aerodynamics import parse_aerodynamics
+
+
+def table(variables, *table_datas):
+    lookups = ''.join(
+        f'<independentVar lookup="{lookup}">{name}</independentVar>'
+        for lookup, name in variables
+    )
+    return f'<table>{lookups}{"".join(table_datas)}</table>'
+
+
+def parse(*tables):
+    aerodynamics = ET.fromstring(
+        '<aerodynamics><axis name="LIFT"><function name="aero/CL">'
+        + ''.join(tables)
+        + '</function></axis></aerodynamics>'
+    )
+    return parse_aerodynamics(aerodynamics)
+
+
+ALPHA = ('row', 'aero/alpha-rad')
+FLAPS = ('column', 'fcs/flap-pos-deg')
+MACH = ('table', 'velocities/mach')
+
+
+def test_tables_of_each_dimension():
+    tables = parse(
+        table([ALPHA], '<tableData> -0.1 -0.2\n 0.0 0.3\n 0.2 1.5 </tableData>'),
+        table([ALPHA, FLAPS], '<tableData>\n 0 10\n -0.1 0 0.1\n 0.2 1 1.2\n'
+              '</tableData>'),
+        table(
+            [ALPHA, FLAPS, MACH],
+            '<tableData breakPoint="0.2">\n 0 10\n 0 1 2\n</tableData>',
+            '<tableData breakPoint="0.8">\n 0 10\n 0 3 4\n 1 5 6\n</tableData>'
+        ),
+    )
+    assert [t.name for t in tables] == ['aero/CL', 'aero/CL #2', 'aero/CL #3']
+    assert all(t.axis == 'LIFT' for t in tables)
+    assert tables[0].rows.tolist() == [-0.1, 0.0, 0.2]
+    assert tables[0].values.tolist() == [-0.2, 0.3, 1.5]
+    assert tables[1].columns.tolist() == [0.0, 10.0]
+    assert np.array_equal(tables[1].values, [[0.0, 0.1], [1.0, 1.2]])
+    assert tables[2].breakpoints.tolist() == [0.2, 0.8]
+    assert [len(rows) for rows in tables[2].rows] == [1, 2]
+
+
+@pytest.mark.parametrize('variables, table_datas', [
+    ([ALPHA], ['<tableData></tableData>']),
+    ([ALPHA], ['<tableData>  \n  </tableData>']),
+    ([ALPHA, FLAPS], ['<tableData> </tableData>']),
+    ([ALPHA, FLAPS], ['<tableData>\n 0 10\n</tableData>']),
+    ([ALPHA, FLAPS, MACH], [
+        '<tableData breakPoint="0.2">\n 0 10\n 0 1 2\n</tableData>',
+        '<tableData breakPoint="0.8">\n</tableData>',
+    ]),
+])
+def test_empty_tables_skipped(variables, table_datas):
+    '''Empty tables are left out, the tables after them still read.'''
+    tables = parse(
+        table(variables, *table_datas),
+        table([ALPHA], '<tableData> 0 1 </tableData>'),
+    )
+    assert [t.name for t in tables] == ['aero/CL #2']
@@ -0,0 +1,153 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import json
+import os
+
+from io_scene_jsbsim import cache as cache_module
+from io_scene_jsbsim.cache import ENTRY_SUFFIX, INDEX_NAME, ParseCache
+from io_scene_jsbsim.fdm import load_fdm, parse_fdm, parse_fdm_files
+
+TAGS = {'mass_balance'}
+
+
+def write_fdm(path, weight):
+    path.write_text(
+        '<fdm_config name="test"><mass_balance>'
+        f'<pointmass name="PILOT"><weight unit="LBS"> {weight} </weight>'
+        '<location unit="IN"><x> 36 </x><y> -14 </y><z> 24 </z></location>'
+        '</pointmass></mass_balance></fdm_config>\n'
+    )
+    return str(path)
+
+
+def get_weight(fdm):
+    return fdm.sections['mass_balance'].items[0].weight
+
+
+def get_entries(directory):
+    return sorted(path for path in os.listdir(directory) if path.endswith(ENTRY_SUFFIX))
+
+
+def test_miss_then_hit(tmp_path):
+    filepath = write_fdm(tmp_path / 'a.xml', 180)
+    cache = ParseCache(str(tmp_path / 'cache'), 1 << 20)
+    os.makedirs(cache.directory)
+    assert cache.load(filepath, TAGS) is None
+    cache.store(filepath, TAGS, parse_fdm(filepath, TAGS))
+    assert get_weight(cache.load(filepath, TAGS)) == get_weight(
+        parse_fdm(filepath, TAGS)
+    )
+    assert cache.load(filepath, {'metrics'}) is None  # other sections
+
+
+def test_changed_file_misses(tmp_path):
+    filepath = write_fdm(tmp_path / 'a.xml', 180)
+    cache = ParseCache(str(tmp_path), 1 << 20)
+    cache.store(filepath, TAGS, parse_fdm(filepath, TAGS))
+    write_fdm(tmp_path / 'a.xml', 1800)
+    assert cache.load(filepath, TAGS) is None
+
+
+def test_version_bump_misses(tmp_path, monkeypatch):
+    filepath = write_fdm(tmp_path / 'a.xml', 180)
+    cache = ParseCache(str(tmp_path), 1 << 20)
+    cache.store(filepath, TAGS, parse_fdm(filepath, TAGS))
+    monkeypatch.setattr(cache_module, 'CACHE_VERSION', cache_module.CACHE_VERSION + 1)
+    assert cache.load(filepath, TAGS) is None
+
+
+def test_broken_entry_misses(tmp_path):
+    filepath = write_fdm(tmp_path / 'a.xml', 180)
+    cache = ParseCache(str(tmp_path), 1 << 20)
+    cache.store(filepath, TAGS, parse_fdm(filepath, TAGS))
+    entry_path = cache.get_entry_path(filepath, TAGS)
+    with open(entry_path, 'rb') as stream:
+        data = stream.read()
+    for broken in (b'', data[:len(data) // 2], b'garbage'):
+        with open(entry_path, 'wb') as stream:
+            stream.write(broken)
+        assert cache.load(filepath, TAGS) is None
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    directory = tmp_path / 'cache'
+    directory.mkdir()
+    filepaths = [write_fdm(tmp_path / f'{name}.xml', 100 + index)
+                 for index, name in enumerate('abc')]
+    cache = ParseCache(str(directory), 1 << 20)
+    for filepath in filepaths[:2]:
+        cache.store(filepath, TAGS, parse_fdm(filepath, TAGS))
+    entry_size = os.path.getsize(cache.get_entry_path(filepaths[0], TAGS))
+    # a was used last, so b goes first
+    os.utime(cache.get_entry_path(filepaths[1], TAGS), ns=(1, 1))
+    assert cache.load(filepaths[0], TAGS) is not None
+    cache.max_bytes = 2 * entry_size + entry_size // 2
+    cache.store(filepaths[2], TAGS, parse_fdm(filepaths[2], TAGS))
+    assert len(get_entries(directory)) == 2
+    with open(directory / INDEX_NAME, encoding='utf-8') as stream:
+        index = json.load(stream)
+    assert set(index) == {filepaths[0], filepaths[2]}
+    assert cache.load(filepaths[1], TAGS) is None
+    assert cache.load(filepaths[0], TAGS) is not None
+
+
+def test_unwritable_cache_only_warns(tmp_path):
+    '''A cache that can't be written doesn't fail imports, or a batch.'''
+    filepaths = [write_fdm(tmp_path / f'{name}.xml', 180) for name in 'abc']
+    (tmp_path / 'cache').write_text('not a directory')
+    cache = ParseCache(str(tmp_path / 'cache'), 1 << 20)
+    fdm, cache_hit = load_fdm(filepaths[0], TAGS, cache)
+    assert get_weight(fdm) is not None and not cache_hit
+    results = list(parse_fdm_files(filepaths, TAGS, cache, max_workers=2))
+    assert [result.filepath for result in results] == filepaths
+    assert all(result.error is None for result in results)
+
+
+class CountingJson:
+    '''Stands in for the json module, counting the index writes.'''
+    load = staticmethod(json.load)
+
+    def __init__(self):
+        self.dumps = 0
+
+    def dump(self, *args, **kwargs):
+        self.dumps += 1
+        json.dump(*args, **kwargs)
+
+
+def test_index_written_once_per_batch(tmp_path, monkeypatch):
+    filepaths = [write_fdm(tmp_path / f'{name}.xml', 180) for name in 'abc']
+    cache = ParseCache(str(tmp_path), 1 << 20)
+    counting = CountingJson()
+    monkeypatch.setattr(cache_module, 'json', counting)
+    results = list(parse_fdm_files(filepaths, TAGS, cache, max_workers=2))
+    assert not any(result.cache_hit for result in results)
+    assert counting.dumps == 1
+    results = list(parse_fdm_files(filepaths, TAGS, cache, max_workers=2))
+    assert all(result.cache_hit for result in results)
+    assert counting.dumps == 1  # nothing new to write
+
+
+def test_relative_and_absolute_paths_share_entries(tmp_path, monkeypatch):
+    filepath = write_fdm(tmp_path / 'a.xml', 180)
+    cache = ParseCache(str(tmp_path), 1 << 20)
+    cache.store(filepath, TAGS, parse_fdm(filepath, TAGS))
+    monkeypatch.chdir(tmp_path)
+    assert cache.load('a.xml', TAGS) is not None
+    assert list(cache.load_index()) == [filepath]
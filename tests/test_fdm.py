@@ -0,0 +1,55 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import pytest
+
+from io_scene_jsbsim.fdm import load_fdm
+
+FDM = '''<fdm_config name="test">
+  <propulsion>
+    <engine file="engine">
+      <location unit="IN"><x> 10 </x><y> 0 </y><z> 0 </z></location>
+      <thruster file="prop">
+        <location unit="IN"><x> 0 </x><y> 0 </y><z> 0 </z></location>
+      </thruster>
+    </engine>
+  </propulsion>
+</fdm_config>
+'''
+
+
+@pytest.mark.parametrize('diameter, expected', [
+    ('<diameter unit="IN"> 75 </diameter>', 1.905),
+    ('<diameter> 6 </diameter>', 1.8288),
+    ('<diameter unit="FURLONG"> 75 </diameter>', None),
+    ('<diameter unit="IN"> large </diameter>', None),
+    ('<diameter unit="IN"/>', None),
+    ('', None),
+])
+def test_thruster_diameter(tmp_path, diameter, expected):
+    '''Unreadable diameters fall back to no diameter instead of failing.'''
+    (tmp_path / 'test.xml').write_text(FDM)
+    (tmp_path / 'Engines').mkdir()
+    (tmp_path / 'Engines' / 'engine.xml').write_text('<piston_engine name="e"/>')
+    (tmp_path / 'Engines' / 'prop.xml').write_text(
+        f'<propeller name="p">{diameter}</propeller>'
+    )
+    fdm, _ = load_fdm(str(tmp_path / 'test.xml'), {'propulsion'})
+    thruster = fdm.sections['propulsion'].items[1]
+    assert thruster.component.kind == 'propeller'
+    assert thruster.diameter == pytest.approx(expected)
@@ -0,0 +1,120 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import gzip
+import zipfile
+
+from io_scene_jsbsim.fdm import parse_fdm_files
+from io_scene_jsbsim.sources import (
+    close_archives, find_archive_fdm_files, find_fdm_files
+)
+
+
+def write_fdm(pointmasses):
+    '''Return the text of an FDM with pointmasses numbered point masses.'''
+    masses = ''.join(
+        f'<pointmass name="MASS {index}"><weight unit="LBS"> {index} </weight>'
+        f'<location unit="IN"><x> {index * 0.5} </x><y> {index % 7} </y>'
+        f'<z> {index % 5} </z></location></pointmass>\n'
+        for index in range(pointmasses)
+    )
+    return (
+        '<?xml version="1.0"?>\n<fdm_config name="test">\n'
+        f'<mass_balance>\n{masses}</mass_balance>\n</fdm_config>\n'
+    )
+
+
+def test_archive_members_parsed_in_pool(tmp_path):
+    '''Members of one zip parsed by several workers all come back intact.'''
+    archive = tmp_path / 'fleet.zip'
+    with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+        for member in range(48):
+            zip_file.writestr(f'fdm{member}/fdm{member}.xml', write_fdm(500 + member))
+    try:
+        # Opened here first, like an import does, before the pool starts
+        filepaths = find_archive_fdm_files(str(archive))
+        assert len(filepaths) == 48
+        for result in parse_fdm_files(filepaths, {'mass_balance'}, max_workers=8):
+            assert result.error is None, result.error
+            member = int(result.filepath.rsplit('fdm', 1)[1].split('.')[0])
+            assert len(result.fdm.sections['mass_balance'].items) == 500 + member
+    finally:
+        close_archives()
+
+
+def test_fdm_files_found_past_long_prolog(tmp_path):
+    '''Only root <fdm_config> elements count, however long the prolog.'''
+    header = '<!--' + 'Revision history. ' * 1000 + '-->\n'
+    files = {
+        'long.xml': '<?xml version="1.0"?>\n' + header + write_fdm(1),
+        'doctype.xml': '<!DOCTYPE fdm_config>\n<?xml-stylesheet href="a"?>\n'
+                       + write_fdm(1),
+        'engine.xml': header + '<!-- <fdm_config> --><piston_engine/>',
+        'empty.xml': header,
+        'text.xml': 'not XML at all',
+    }
+    for name, text in files.items():
+        (tmp_path / name).write_text(text)
+    assert find_fdm_files(str(tmp_path)) == [
+        str(tmp_path / 'doctype.xml'), str(tmp_path / 'long.xml')
+    ]
+
+
+def test_unreadable_files_skipped(tmp_path):
+    '''Damaged files in a directory are skipped, the FDMs still found.'''
+    compressed = gzip.compress(write_fdm(100).encode())
+    (tmp_path / 'fdm.xml.gz').write_bytes(compressed)
+    (tmp_path / 'truncated.xml.gz').write_bytes(compressed[:14])
+    (tmp_path / 'not_gzip.xml.gz').write_bytes(b'<fdm_config/>')
+    (tmp_path / 'corrupt.xml.gz').write_bytes(compressed[:10] + b'\xff' * 40)
+    (tmp_path / 'fdm.xml').write_text(write_fdm(1))
+    assert find_fdm_files(str(tmp_path)) == [
+        str(tmp_path / 'fdm.xml'), str(tmp_path / 'fdm.xml.gz')
+    ]
+
+
+def damage_member(archive, name, share):
+    '''Overwrite a member's data in archive, share of the way into it.'''
+    with zipfile.ZipFile(archive) as zip_file:
+        info = zip_file.getinfo(name)
+    with open(archive, 'r+b') as stream:
+        stream.seek(info.header_offset + 26)
+        name_length, extra_length = (
+            int.from_bytes(stream.read(2), 'little') for _ in range(2)
+        )
+        stream.seek(
+            info.header_offset + 30 + name_length + extra_length
+            + int(info.compress_size * share)
+        )
+        stream.write(b'\xff' * 8)
+
+
+def test_damaged_archive_members_skipped(tmp_path):
+    '''Members failing their CRC or inflating are skipped, not fatal.'''
+    archive = tmp_path / 'fleet.zip'
+    with zipfile.ZipFile(archive, 'w') as zip_file:
+        zip_file.writestr('crc.xml', write_fdm(1), zipfile.ZIP_STORED)
+        zip_file.writestr('deflate.xml', write_fdm(50), zipfile.ZIP_DEFLATED)
+        zip_file.writestr('fdm.xml', write_fdm(1), zipfile.ZIP_DEFLATED)
+    damage_member(archive, 'crc.xml', 0.5)
+    damage_member(archive, 'deflate.xml', 0.0)
+    try:
+        assert find_archive_fdm_files(str(archive)) == [str(archive / 'fdm.xml')]
+        assert find_fdm_files(str(tmp_path)) == [str(archive / 'fdm.xml')]
+    finally:
+        close_archives()
@@ -0,0 +1,67 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import numpy as np
+
+from io_scene_jsbsim.telemetry import DECIMATE_WINDOW, decimate
+
+
+def get_errors(times, values, keep):
+    '''Return how far interpolating the kept samples is off, per column.'''
+    return np.array([
+        np.abs(np.interp(times, times[keep], column[keep]) - column).max()
+        for column in values.T
+    ])
+
+
+def test_decimated_within_tolerance():
+    rng = np.random.default_rng(1)
+    count = 3 * DECIMATE_WINDOW + 100
+    times = np.cumsum(rng.uniform(0.001, 0.1, count))
+    values = np.column_stack((
+        np.cumsum(rng.normal(0.0, 0.0002, count)),
+        np.sin(times),
+        100.0 * np.cos(3.0 * times),
+    ))
+    for tolerance in (0.001, 0.05, 1.0):
+        keep = decimate(times, values, tolerance)
+        assert keep[0] == 0 and keep[-1] == count - 1
+        assert (np.diff(keep) > 0).all()
+        assert len(keep) < count
+        assert (get_errors(times, values, keep) <= tolerance).all()
+
+
+def test_repeated_times_kept():
+    times = np.array([0.0, 1.0, 1.0, 1.0, 2.0])
+    values = np.array([[0.0], [0.0], [5.0], [0.0], [0.0]])
+    keep = decimate(times, values, 0.1)
+    assert 2 in keep
+
+
+def test_straight_line_keeps_window_ends():
+    count = 2 * DECIMATE_WINDOW + 10
+    times = np.linspace(0.0, 10.0, count)
+    values = np.column_stack((times, -2.0 * times))
+    keep = decimate(times, values, 1e-6)
+    assert keep.tolist() == [0, DECIMATE_WINDOW, 2 * DECIMATE_WINDOW, count - 1]
+
+
+def test_no_tolerance_keeps_every_sample():
+    times = np.arange(10.0)
+    values = np.zeros((10, 2))
+    assert decimate(times, values, 0.0).tolist() == list(range(10))
@@ -0,0 +1,109 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+from io_scene_jsbsim.fdm import parse_fdm
+from io_scene_jsbsim.variants import diff_section, get_variant_names
+
+
+def location(x, y=0.0, z=0.0):
+    return f'<location unit="M"><x> {x} </x><y> {y} </y><z> {z} </z></location>'
+
+
+def pointmass(name, weight, x):
+    return (
+        f'<pointmass name="{name}"><weight unit="KG"> {weight} </weight>'
+        f'{location(x)}</pointmass>'
+    )
+
+
+def engine(x, thruster_x):
+    return (
+        f'<engine file="piston">{location(x)}'
+        f'<thruster file="prop">{location(thruster_x)}</thruster></engine>'
+    )
+
+
+def parse_variants(tmp_path, tag, bodies):
+    sections = []
+    for index, body in enumerate(bodies):
+        filepath = tmp_path / f'variant{index}.xml'
+        filepath.write_text(f'<fdm_config><{tag}>{body}</{tag}></fdm_config>')
+        sections.append(parse_fdm(str(filepath), {tag}).sections.get(tag))
+    return sections
+
+
+def test_shared_and_differing_items(tmp_path):
+    sections = parse_variants(tmp_path, 'mass_balance', [
+        pointmass('PILOT', 80, 1.0) + pointmass('BAGS', 20, 3.0)
+        + pointmass('FUEL', 50, 2.0) + pointmass('SEAT', 10, 1.5),
+        pointmass('PILOT', 80, 1.0005) + pointmass('BAGS', 20, 3.2)
+        + pointmass('FUEL', 60, 2.0) + pointmass('SEAT', 10, 1.5),
+        pointmass('SEAT', 10, 1.5) + pointmass('PILOT', 80, 1.0)
+        + pointmass('BAGS', 20, 3.0) + pointmass('FUEL', 50, 2.0),
+    ])
+    common, differences = diff_section(sections, tolerance=0.001)
+    labels = [sections[0].items[row].name for row in common.tolist()]
+    # Within tolerance, and matched by key whatever the order
+    assert labels == ['PILOT', 'SEAT']
+    assert differences[0] == {1: 'moved up to 200.0 mm', 2: 'values differ'}
+    assert differences[1] == {1: 'moved up to 200.0 mm', 2: 'values differ'}
+    assert differences[2] == {2: 'moved up to 200.0 mm', 3: 'values differ'}
+
+
+def test_tolerance_decides_what_moved(tmp_path):
+    sections = parse_variants(tmp_path, 'mass_balance', [
+        pointmass('PILOT', 80, 1.0), pointmass('PILOT', 80, 1.01)
+    ])
+    common, differences = diff_section(sections, tolerance=0.001)
+    assert common.tolist() == [] and differences[1] == {0: 'moved up to 10.0 mm'}
+    common, differences = diff_section(sections, tolerance=0.02)
+    assert common.tolist() == [0] and differences == [{}, {}]
+
+
+def test_missing_items_and_sections(tmp_path):
+    sections = parse_variants(tmp_path, 'mass_balance', [
+        pointmass('PILOT', 80, 1.0) + pointmass('BAGS', 20, 3.0),
+        pointmass('PILOT', 80, 1.0),
+    ])
+    common, differences = diff_section([*sections, None], tolerance=0.001)
+    assert common.tolist() == []
+    assert differences[0] == {0: 'in 2 of 3 variants', 1: 'in 1 of 3 variants'}
+    assert differences[2] == {}
+
+
+def test_thruster_shared_with_its_engine(tmp_path):
+    sections = parse_variants(tmp_path, 'propulsion', [
+        engine(-0.5, -1.0), engine(-0.5, -1.1)
+    ])
+    common, differences = diff_section(sections, tolerance=0.001)
+    assert common.tolist() == []
+    assert differences[1] == {
+        0: 'parent or child differs', 1: 'moved up to 100.0 mm'
+    }
+    sections = parse_variants(tmp_path, 'propulsion', [
+        engine(-0.5, -1.0), engine(-0.5, -1.0)
+    ])
+    common, differences = diff_section(sections, tolerance=0.001)
+    assert common.tolist() == [0, 1] and differences == [{}, {}]
+
+
+def test_variant_names_are_unique():
+    names = get_variant_names(
+        ['/a/c172.xml', '/b/c172.xml', '/c/Common.xml'], reserved=('Common',)
+    )
+    assert names == ['c172', 'c172 (2)', 'Common (2)']
@@ -0,0 +1,91 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import xml.etree.ElementTree as ET
+
+from io_scene_jsbsim.fdm import LENGTH_SCALES, parse_fdm
+from io_scene_jsbsim.xmledit import write_edits
+
+DOCUMENT = b'''<?xml version="1.0"?>
+<fdm_config name="test">
+  <metrics>
+    <location name="AERORP" unit="IN"><x> 43.2 </x><y> 0 </y><z> 59.4 </z></location>
+  </metrics>
+  <mass_balance>
+    <!-- <location unit="M"><x> 1 </x></location> -->
+    <location name="CG" unit="FT">
+      <x>3.5</x>  <y>0</y>
+      <z>1.25</z>
+    </location>
+    <pointmass name="PILOT"><weight unit="LBS"> 180 </weight>
+      <location unit="IN"><x> 36 </x><y> -14 </y><z> 24 </z></location>
+    </pointmass>
+  </mass_balance>
+</fdm_config>
+'''
+
+
+def write(tmp_path, edits):
+    source = tmp_path / 'test.xml'
+    source.write_bytes(DOCUMENT)
+    editor = write_edits(str(source), str(tmp_path / 'out.xml'), edits)
+    return editor, (tmp_path / 'out.xml').read_bytes()
+
+
+def test_no_edits_copy_byte_for_byte(tmp_path):
+    editor, written = write(tmp_path, {})
+    assert written == DOCUMENT
+    assert editor.changed == 0 and not editor.missing
+
+
+def test_unmoved_location_is_left_alone(tmp_path):
+    inch = LENGTH_SCALES['IN']
+    _, written = write(
+        tmp_path, {'mass_balance': {1: (36 * inch, -14 * inch, 24 * inch)}}
+    )
+    assert written == DOCUMENT
+
+
+def test_moved_coordinate_keeps_its_unit(tmp_path):
+    inch = LENGTH_SCALES['IN']
+    editor, written = write(
+        tmp_path, {'mass_balance': {1: (40 * inch, -14 * inch, 24 * inch)}}
+    )
+    assert editor.changed == 1
+    assert written == DOCUMENT.replace(b'<x> 36 </x>', b'<x> 40 </x>')
+    fdm = parse_fdm(str(tmp_path / 'out.xml'), {'mass_balance'})
+    coords = fdm.sections['mass_balance'].coords
+    assert abs(coords[1][0] - 40 * inch) < 1e-9
+
+
+def test_decimals_follow_the_replaced_number(tmp_path):
+    foot = LENGTH_SCALES['FT']
+    editor, written = write(
+        tmp_path, {'mass_balance': {0: (3.75 * foot, 0, 1.25 * foot)}}
+    )
+    assert editor.changed == 1
+    location = ET.fromstring(written).find('mass_balance/location')
+    assert location.get('unit') == 'FT'
+    assert location.find('x').text == '3.75'
+    assert b'<x>3.75</x>  <y>0</y>' in written
+
+
+def test_missing_location_is_reported(tmp_path):
+    editor, written = write(tmp_path, {'mass_balance': {5: (1.0, 2.0, 3.0)}})
+    assert editor.missing == [('mass_balance', 5)]
+    assert written == DOCUMENT
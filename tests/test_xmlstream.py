@@ -0,0 +1,97 @@
+# ##### BEGIN GPL LICENSE BLOCK #####
+#
+#  This program is free software; you can redistribute it and/or
+#  modify it under the terms of the GNU General Public License
+#  as published by the Free Software Foundation; either version 2
+#  of the License, or (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program; if not, write to the Free Software Foundation,
+#  Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ##### END GPL LICENSE BLOCK #####
+
+import io
+import xml.etree.ElementTree as ET
+
+from io_scene_jsbsim.xmlstream import SectionFilter, read_root_tag
+
+DOCUMENT = b'''<?xml version="1.0"?>
+<!-- <metrics> in a comment is not a section -->
+<?xml-stylesheet href="JSBSim.xsl" type="text/xsl"?>
+<!DOCTYPE fdm_config [
+  <!ENTITY note "> <not_root/>">
+  <!ENTITY pilot "PILOT > 'co-pilot' ]">
+  <!-- ]> in a comment -->
+  <?pi ]> in a processing instruction?>
+]>
+<fdm_config name="test > 1" version='2.0'>
+  <fileheader><author>Someone</author><![CDATA[ <mass_balance> ]]></fileheader>
+  <metrics>
+    <wingarea unit="FT2"> 174.0 </wingarea>
+    <location name="AERORP/>" unit='IN>'><x> 43.2 </x><y> 0 </y><z> 59.4 </z></location>
+  </metrics>
+  <system name="a/>b" note='>'><system><!-- </system> --></system></system>
+  <mass_balance>
+    <!-- </mass_balance> -->
+    <pointmass name="&pilot;"><weight unit="LBS"> 180 </weight>
+      <location unit="IN"><x> 36 </x><y> -14 </y><z> 24 </z></location>
+    </pointmass>
+  </mass_balance>
+  <aerodynamics/>
+  <propulsion file="engine/>"/>
+</fdm_config>
+'''
+
+
+def canonical(root):
+    return ET.canonicalize(ET.tostring(root), strip_text=True)
+
+
+def expected(tags):
+    root = ET.fromstring(DOCUMENT)
+    for element in list(root):
+        if element.tag not in tags:
+            root.remove(element)
+    return canonical(root)
+
+
+def test_split_chunks_match_element_tree():
+    '''Any chunk size keeps the same sections as ElementTree finds.'''
+    tags = {'metrics', 'mass_balance', 'propulsion'}
+    for chunk_size in (*range(1, 40), 4096):
+        kept = b''.join(SectionFilter(io.BytesIO(DOCUMENT), tags, chunk_size))
+        assert canonical(ET.fromstring(kept)) == expected(tags), chunk_size
+
+
+def test_root_tag_after_doctype():
+    for chunk_size in (*range(1, 40), 4096):
+        assert read_root_tag(io.BytesIO(DOCUMENT), chunk_size) == 'fdm_config'
+
+
+def test_kept_sections_are_byte_exact():
+    kept = b''.join(SectionFilter(io.BytesIO(DOCUMENT), {'mass_balance'}, 7))
+    start = DOCUMENT.index(b'  <mass_balance>')
+    end = DOCUMENT.index(b'  </mass_balance>') + len(b'  </mass_balance>')
+    assert DOCUMENT[start:end] in kept
+    body = kept.partition(b'<fdm_config')[2]
+    assert b'<metrics>' not in body and b'<system' not in body
+
+
+def test_unchanged_sections_are_dropped():
+    '''A section whose digest is unchanged isn't passed on again.'''
+    first = SectionFilter(io.BytesIO(DOCUMENT), {'metrics', 'mass_balance'})
+    b''.join(first)
+    edited = DOCUMENT.replace(b'> 180 <', b'> 190 <')
+    second = SectionFilter(
+        io.BytesIO(edited), {'metrics', 'mass_balance'}, unchanged=first.digests
+    )
+    kept = ET.fromstring(b''.join(second))
+    assert [element.tag for element in kept] == ['mass_balance']
+    assert second.digests['metrics'] == first.digests['metrics']
+    assert second.digests['mass_balance'] != first.digests['mass_balance']